@@ -0,0 +1,117 @@
+// Protocole WebSocket binaire (MessagePack) : clés compactées et chaînes internées par le serveur.
+// Le client envoie toujours du JSON texte ; seules les trames reçues sont binaires.
+
+export const BINARY_SUBPROTOCOL = "cemantix.msgpack.v1";
+
+const textDecoder = new TextDecoder();
+
+function decodeMsgpack(bytes) {
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    let offset = 0;
+
+    const readString = (length) => {
+        const value = textDecoder.decode(bytes.subarray(offset, offset + length));
+        offset += length;
+        return value;
+    };
+    const readArray = (length) => {
+        const result = new Array(length);
+        for (let i = 0; i < length; i++) result[i] = read();
+        return result;
+    };
+    const readMap = (length) => {
+        const result = new Map();
+        for (let i = 0; i < length; i++) {
+            const key = read();
+            result.set(key, read());
+        }
+        return result;
+    };
+
+    function read() {
+        const type = bytes[offset++];
+        if (type <= 0x7f) return type;
+        if (type >= 0xe0) return type - 0x100;
+        if ((type & 0xf0) === 0x80) return readMap(type & 0x0f);
+        if ((type & 0xf0) === 0x90) return readArray(type & 0x0f);
+        if ((type & 0xe0) === 0xa0) return readString(type & 0x1f);
+
+        let value;
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: value = view.getUint8(offset); offset += 1; break;
+            case 0xc5: value = view.getUint16(offset); offset += 2; break;
+            case 0xc6: value = view.getUint32(offset); offset += 4; break;
+            case 0xca: value = view.getFloat32(offset); offset += 4; return value;
+            case 0xcb: value = view.getFloat64(offset); offset += 8; return value;
+            case 0xcc: value = view.getUint8(offset); offset += 1; return value;
+            case 0xcd: value = view.getUint16(offset); offset += 2; return value;
+            case 0xce: value = view.getUint32(offset); offset += 4; return value;
+            case 0xcf: value = Number(view.getBigUint64(offset)); offset += 8; return value;
+            case 0xd0: value = view.getInt8(offset); offset += 1; return value;
+            case 0xd1: value = view.getInt16(offset); offset += 2; return value;
+            case 0xd2: value = view.getInt32(offset); offset += 4; return value;
+            case 0xd3: value = Number(view.getBigInt64(offset)); offset += 8; return value;
+            case 0xd9: value = view.getUint8(offset); offset += 1; return readString(value);
+            case 0xda: value = view.getUint16(offset); offset += 2; return readString(value);
+            case 0xdb: value = view.getUint32(offset); offset += 4; return readString(value);
+            case 0xdc: value = view.getUint16(offset); offset += 2; return readArray(value);
+            case 0xdd: value = view.getUint32(offset); offset += 4; return readArray(value);
+            case 0xde: value = view.getUint16(offset); offset += 2; return readMap(value);
+            case 0xdf: value = view.getUint32(offset); offset += 4; return readMap(value);
+            default: throw new Error(`Type MessagePack non supporté : 0x${type.toString(16)}`);
+        }
+        // Données binaires brutes (bin 8/16/32)
+        const raw = bytes.slice(offset, offset + value);
+        offset += value;
+        return raw;
+    }
+
+    return read();
+}
+
+// Retourne une fonction qui transforme chaque trame binaire en message JSON classique.
+// Elle garde l'état de la connexion (schéma des clés, table des chaînes internées).
+export function createBinaryDecoder() {
+    let keys = [];
+    const internedKeys = new Set(["type", "word", "player_name", "winner", "initiator", "game_type", "mode"]);
+    const strings = [];
+
+    const expand = (value, key = null) => {
+        if (value instanceof Map) {
+            const result = {};
+            value.forEach((item, rawKey) => {
+                const name = typeof rawKey === "number" ? keys[rawKey] : rawKey;
+                if (name === "strings") return;
+                result[name] = expand(item, name);
+            });
+            return result;
+        }
+        if (Array.isArray(value)) return value.map(item => expand(item));
+        if (typeof value === "number" && internedKeys.has(key)) return strings[value];
+        return value;
+    };
+
+    const learnStrings = (value) => {
+        // Les définitions de chaînes peuvent se trouver dans chaque événement d'un batch
+        if (!(value instanceof Map)) return;
+        const stringsKey = keys.indexOf("strings");
+        const definitions = value.get(stringsKey);
+        if (definitions instanceof Map) definitions.forEach((text, id) => { strings[id] = text; });
+        const events = value.get(keys.indexOf("events"));
+        if (Array.isArray(events)) events.forEach(learnStrings);
+    };
+
+    return (buffer) => {
+        const decoded = decodeMsgpack(new Uint8Array(buffer));
+        if (decoded instanceof Map && decoded.get("type") === "schema") {
+            keys = decoded.get("keys") || [];
+            (decoded.get("strings") || []).forEach((text, id) => { strings[id] = text; });
+            return { type: "schema" };
+        }
+        learnStrings(decoded);
+        return expand(decoded);
+    };
+}
@@ -4,6 +4,7 @@ import { addHistoryMessage, setRoomInfo, showModal, closeModal } from "./ui.js";
 import { addEntry, renderHistory, renderScoreboard, triggerConfetti } from "./rendering.js";
 import { StatusBar, Style } from '@capacitor/status-bar';
 import { App } from '@capacitor/app';
+import { BINARY_SUBPROTOCOL, createBinaryDecoder } from "./binary_protocol.js";
 
 // --- GESTION DE SESSION ---
 const STORAGE_KEY = "arcade_user_pseudo";
@@ -254,14 +255,17 @@ function initGameConnection(roomId, playerName) {
 
     const protocol = window.location.protocol === "https:" ? "wss" : "ws";
     const wsUrl = `${protocol}://${window.location.host}/rooms/${roomId}/ws?player_name=${encodeURIComponent(playerName)}`;
-    const ws = new WebSocket(wsUrl);
+    // Trames binaires compactes (MessagePack) : moins de données et de parsing sur mobile
+    const ws = new WebSocket(wsUrl, [BINARY_SUBPROTOCOL]);
+    ws.binaryType = "arraybuffer";
+    const decodeBinary = createBinaryDecoder();
     
     state.websocket = ws; // Stockage global pour le chat
 
     ws.onopen = () => { console.log("WS Connecté"); };
     
     ws.onmessage = (event) => {
-        const data = JSON.parse(event.data);
+        const data = typeof event.data === "string" ? JSON.parse(event.data) : decodeBinary(event.data);
 
         if (data.error) {
             showModal("Erreur", data.message || "Erreur inconnue");
@@ -269,6 +273,11 @@ function initGameConnection(roomId, playerName) {
         }
 
         switch (data.type) {
+            case "ping":
+                // Heartbeat serveur : sans réponse, la connexion est considérée comme morte
+                if (ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify({ type: "pong" }));
+                return;
+
             case "state_sync":
                 initGameUI(data);
                 renderHistory(data.history || []);
@@ -1,7 +1,7 @@
 import asyncio
 import uvicorn
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Request, status
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import BaseModel
@@ -10,14 +10,13 @@ from starlette.staticfiles import StaticFiles
 from typing import Dict, List, Any, Optional
 import time
 from datetime import date, datetime
-import httpx
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 from core.models import User
-from core.database import engine, Base, get_db
-from core.auth import get_password_hash, verify_password, create_access_token, SECRET_KEY, ALGORITHM
+from core.database import engine, Base, get_db, AsyncSessionLocal
+from core.auth import create_access_token, SECRET_KEY, ALGORITHM, Principal, principal_cache, password_hasher, HasherOverloaded
 from sqlalchemy import select
 from pydantic import BaseModel, field_validator
 from sqlalchemy import update
@@ -50,28 +49,70 @@ else:
 
 # Configurez l'URL du webhook Discord ici ou via une variable d'environnement
 DISCORD_WEBHOOK_URL = webhook_url
-waiting_duel_room_id: Optional[str] = None
 
 from core.model_loader import ModelLoader
 from core.rooms import RoomManager, RoomState
+from core.connections import RoomConnectionManager, ClientConnection, encode_message
+from core import binary_protocol, metrics
+from core.stats import StatsAggregator
+from core.leaderboard import BOARDS, LeaderboardService
+from core import tycoon_save
+from core.static_assets import FingerprintedStaticFiles, MemoryAsset
+from core.bug_log import BugLogStore, format_record
+from core.notifications import WebhookDispatcher
+from core.timers import TimerWheel
+from core.matchmaking import Matchmaker, MatchmakingError, TicketConflict
+from core.executor import engine_executor
+from core.puzzle_packs import load_packs
+from core.difficulty import DIFFICULTY_LEVELS, load_tables
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    stats_aggregator.start()
+    try:
+        await asyncio.to_thread(bug_log.import_legacy)
+    except Exception as e:
+        print(f"[BUGLOG] Import de l'ancien journal impossible : {e}")
+    try:
+        async with AsyncSessionLocal() as session:
+            await leaderboard.seed(session)
+    except Exception as e:
+        print(f"[LEADERBOARD] Chargement initial impossible : {e}")
     yield
+    await connections.stop_heartbeat()
+    await game_timers.stop()
+    await matchmaker.stop()
+    await stats_aggregator.stop()
+    await bug_log.stop()
+    await bug_notifier.stop()
+    password_hasher.shutdown()
+    engine_executor.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
-LOG_FILE_PATH = Path("bugs.log")
+bug_log = BugLogStore()
+bug_notifier = WebhookDispatcher(DISCORD_WEBHOOK_URL, content="🐛 **Nouveau Rapport de Bug !**")
 
 class UserAuth(BaseModel):
     username: str
     password: str
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return metrics.REGISTRY.render()
+
+# Servi depuis la mémoire ; le navigateur le redemande rarement grâce au cache d'un jour
+favicon_asset = None
+if Path("favicon.ico").exists():
+    favicon_asset = MemoryAsset.from_file("favicon.ico", "image/x-icon", cache_control="public, max-age=86400")
+
 @app.get("/favicon.ico")
-async def favicon():
-    return FileResponse("favicon.ico")
+async def favicon(request: Request):
+    if favicon_asset is None:
+        return Response(status_code=404)
+    return favicon_asset.response(request.headers)
 
 # Chargement du modèle avec gestion d'erreur si le fichier est absent
 try:
@@ -82,8 +123,56 @@ except Exception as e:
     print(f"Attention: Modèle non chargé ({e}). Seul le mode 'definition' fonctionnera.")
     model = None
 
-room_manager = RoomManager(model)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+room_manager = RoomManager(
+    model,
+    packs=load_packs() if model is not None else None,
+    targets=load_tables() if model is not None else None,
+)
+
+game_guess_seconds = metrics.histogram("game_guess_seconds", "Traitement d'un essai (process_guess)", ["game_type"])
+game_unknown_words = metrics.counter("game_unknown_words_total", "Essais refusés : mot absent du modèle", ["game_type"])
+game_rooms = metrics.gauge("game_rooms", "Rooms ouvertes", ["game_type"])
+game_room_players = metrics.gauge("game_room_players", "Joueurs connectés par room", ["stat"])
+
+
+def _room_stats():
+    counts: Dict[tuple, int] = {}
+    for room in room_manager.rooms.values():
+        counts[(room.game_type,)] = counts.get((room.game_type,), 0) + 1
+    return counts
+
+
+def _room_player_stats():
+    # Calculé au moment du scrape seulement : rien à maintenir sur le chemin des joueurs
+    players = [len(room.active_players) for room in room_manager.rooms.values()]
+    total = sum(players)
+    return {
+        ("total",): total,
+        ("mean",): total / len(players) if players else 0,
+        ("max",): max(players, default=0),
+    }
+
+
+game_rooms.set_function(_room_stats)
+game_room_players.set_function(_room_player_stats)
+static_files = FingerprintedStaticFiles(directory="static")
+app.mount("/static", static_files, name="static")
+
+# Pages HTML lues une fois au démarrage, avec les URLs à empreinte déjà insérées
+PAGE_FILES = {"hub": "static/hub.html", "game": "static/index.html", "logs": "static/logs.html"}
+pages = {
+    name: MemoryAsset.from_file(path, "text/html; charset=utf-8", transform=static_files.fingerprint_html)
+    for name, path in PAGE_FILES.items()
+    if Path(path).exists()
+}
+# Modèles 3D chargés depuis JS : leurs URLs à empreinte passent par ce manifeste (cache immuable)
+model_manifest = MemoryAsset(
+    encode_message(static_files.manifest("models")).encode("utf-8"), "application/json"
+)
+
+@app.get("/static-manifest/models.json")
+def models_manifest(request: Request):
+    return model_manifest.response(request.headers)
 # Rendre la playlist musicale disponible côté client pour éviter le hardcode des liens
 app.mount("/music", StaticFiles(directory="music"), name="music")
 
@@ -97,6 +186,13 @@ class CreateRoomRequest(BaseModel):
     mode: str = "coop"
     game_type: str = "cemantix"
     duration: int = 0
+    difficulty: Optional[str] = None
+
+
+class JoinRandomRequest(BaseModel):
+    player_name: str
+    # Jeton tiré par le client pour sa recherche : exigé pour la relancer ou l'annuler
+    search_token: str
 
 
 class GuessRequest(BaseModel):
@@ -109,6 +205,10 @@ class ResetRequest(BaseModel):
 
 class AdminLogRequest(BaseModel):
     password: str
+    # Filtres optionnels de la page des logs
+    player_name: Optional[str] = None
+    context: Optional[str] = None
+    limit: int = 200
 
 class SurrenderRequest(BaseModel):
     player_name: str
@@ -123,33 +223,35 @@ class Token(BaseModel):
     token_type: str
 
 class SaveGameRequest(BaseModel):
-    save_data: Dict[str, Any]
-
-class RoomConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-        self.lock = asyncio.Lock()
+    # Version sur laquelle le client a calculé ses modifications (concurrence optimiste)
+    version: int = 0
+    # Soit des opérations façon JSON Patch, soit la sauvegarde complète
+    ops: Optional[List[Dict[str, Any]]] = None
+    save_data: Optional[Dict[str, Any]] = None
+
+def stamp_room_event(room_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
+    # Chaque événement reçoit un numéro de séquence et part dans le tampon de reprise
+    room = room_manager.get_room(room_id)
+    if room:
+        return room.events.record(message)
+    return message
 
-    async def connect(self, room_id: str, websocket: WebSocket):
-        await websocket.accept()
-        async with self.lock:
-            self.active_connections.setdefault(room_id, []).append(websocket)
 
-    def disconnect(self, room_id: str, websocket: WebSocket):
-        if room_id in self.active_connections:
-            if websocket in self.active_connections[room_id]:
-                self.active_connections[room_id].remove(websocket)
+def on_connection_evicted(client: ClientConnection):
+    # Un joueur fantôme ne doit plus bloquer les votes de reset ou d'abandon
+    room = room_manager.get_room(client.room_id)
+    if room and client.player_name and not connections.player_connected(client.room_id, client.player_name):
+        room.active_players.discard(client.player_name)
 
-    async def broadcast(self, room_id: str, message: Dict[str, Any]):
-        connections = list(self.active_connections.get(room_id, []))
-        for connection in connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                self.disconnect(room_id, connection)
 
+stats_aggregator = StatsAggregator(AsyncSessionLocal)
+leaderboard = LeaderboardService(AsyncSessionLocal)
+connections = RoomConnectionManager(prepare_message=stamp_room_event, on_evict=on_connection_evicted)
+# Fins de manche Blitz / Duel, toutes rooms confondues
+game_timers = TimerWheel()
 
-connections = RoomConnectionManager()
+# Au-delà, l'historique de la synchro complète est envoyé en plusieurs trames
+HISTORY_CHUNK_SIZE = int(os.environ.get("HISTORY_CHUNK_SIZE", "200"))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -159,6 +261,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         detail="Impossible de valider les identifiants",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         # Correction de l'erreur de type : on laisse Python inférer le type ou on cast si besoin
@@ -173,9 +279,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     user = result.scalars().first()
     if user is None:
         raise credentials_exception
-    return user
 
-async def get_current_admin_user(current_user: User = Depends(get_current_user)):
+    principal = Principal(id=user.id, username=user.username, is_admin=bool(user.is_admin))
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
+
+async def get_current_admin_user(current_user: Principal = Depends(get_current_user)):
     # Correction de l'erreur Column[bool] : on vérifie que current_user est bien une instance
     if not current_user.is_admin:
         raise HTTPException(
@@ -185,6 +294,10 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
     return current_user
 
 def build_scoreboard(room: RoomState):
+    # Recalculé seulement quand un joueur arrive ou qu'un essai est enregistré
+    if room.scoreboard_cache is not None:
+        return room.scoreboard_cache
+
     scoreboard = [
         {
             "player_name": name,
@@ -195,9 +308,44 @@ def build_scoreboard(room: RoomState):
     ]
     # Tri : meilleure similarité d'abord, puis nombre d'essais croissant
     scoreboard.sort(key=lambda x: (-x["best_similarity"], x["attempts"]))
+    room.scoreboard_cache = scoreboard
     return scoreboard
 
 
+def build_history_payload(room: RoomState) -> List[Dict[str, Any]]:
+    # L'historique ne fait que grandir entre deux resets : on ne convertit que les nouvelles entrées
+    history_payload = room.history_payload_cache
+    for entry in room.history[len(history_payload):]:
+        progression = int(round(entry.similarity * 1000)) if entry.similarity is not None else 0
+        history_payload.append(
+            {
+                "word": entry.word,
+                "player_name": entry.player_name,
+                "temperature": entry.temperature,
+                "progression": progression,
+                "feedback": entry.feedback,
+                "game_type": room.game_type
+            }
+        )
+    return history_payload
+
+
+def encoded_history_chunk(room: RoomState, index: int) -> str:
+    """Morceau d'historique encodé en JSON, mis en cache une fois complet."""
+    history_payload = build_history_payload(room)
+    start = index * HISTORY_CHUNK_SIZE
+    chunk = history_payload[start:start + HISTORY_CHUNK_SIZE]
+    if len(chunk) < HISTORY_CHUNK_SIZE:
+        # Dernier morceau encore incomplet : il changera au prochain essai
+        return encode_message(chunk)
+
+    key = (HISTORY_CHUNK_SIZE, index)
+    encoded = room.encoded_history_chunks.get(key)
+    if encoded is None:
+        encoded = room.encoded_history_chunks[key] = encode_message(chunk)
+    return encoded
+
+
 def build_victory_message(room: RoomState, player_name: str):
     return {
         "type": "victory",
@@ -208,10 +356,47 @@ def build_victory_message(room: RoomState, player_name: str):
     }
 
 
-def process_guess(room: RoomState, word: str, player_name: str) -> Dict[str, Any]:
+def schedule_round_end(room: RoomState):
+    """Arme la fin de manche côté serveur (Blitz et Duel), remplaçant l'échéance précédente."""
+    if room.mode != "blitz" or room.end_time <= 0 or room.locked:
+        return
+    room_id, end_time = room.room_id, room.end_time
+    game_timers.schedule(room_id, end_time, lambda: end_round(room_id, end_time))
+
+
+async def end_round(room_id: str, end_time: float):
+    room = room_manager.get_room(room_id)
+    # Room détruite ou manche relancée entre-temps : l'échéance n'est plus valable
+    if room is None or room.end_time != end_time or room.locked:
+        return
+    room.locked = True
+
+    scoreboard = build_scoreboard(room)
+    winner = None
+    if room.game_type == "duel" and scoreboard:
+        best = scoreboard[0]
+        tied = len(scoreboard) > 1 and scoreboard[1]["best_similarity"] == best["best_similarity"]
+        if not tied and best["best_similarity"] > 0:
+            winner = best["player_name"]
+
+    print(f"[TIMERS] Fin de manche pour la room {room_id}")
+    await connections.broadcast(room_id, {
+        "type": "game_over",
+        "game_type": room.game_type,
+        "mode": room.mode,
+        "team_score": room.team_score,
+        "scoreboard": scoreboard,
+        "winner": winner,
+        "end_time": end_time,
+    })
+
+
+async def process_guess(room: RoomState, word: str, player_name: str) -> Dict[str, Any]:
     if room.mode == "blitz" and room.end_time > 0:
         if time.time() > room.end_time:
-            room.locked = True
+            # Essai arrivé avant le tic de la roue : c'est lui qui clôt la manche (game_over diffusé)
+            game_timers.cancel(room.room_id)
+            await end_round(room.room_id, room.end_time)
             return {"error": "time_up", "message": "Le temps est écoulé !"}
 
     if room.locked:
@@ -248,7 +433,8 @@ def process_guess(room: RoomState, word: str, player_name: str) -> Dict[str, Any
         if room.mode == "blitz":
             # En Blitz : On incrémente le score et on change de mot
             room.team_score += 1
-            room.engine.next_word() 
+            # Tirage du mot suivant hors de la boucle : les autres rooms continuent de jouer
+            await engine_executor.next_word(room.engine)
             
             # ON STOCKE LES INFOS POUR LE PAYLOAD
             blitz_data = {
@@ -290,15 +476,57 @@ def process_guess(room: RoomState, word: str, player_name: str) -> Dict[str, Any
         "victory": victory and room.mode != "blitz",
     }
 
+# Colonnes renvoyées à l'administration : jamais le mot de passe ni la sauvegarde tycoon
+ADMIN_USER_COLUMNS = (
+    User.id, User.username, User.games_played, User.cemantix_wins, User.cemantix_surrenders,
+    User.hangman_wins, User.daily_challenges_validated, User.is_admin,
+)
+ADMIN_USERS_MAX_LIMIT = 500
+ADMIN_EXPORT_PAGE_SIZE = 1000
+
+
+async def fetch_users_page(db: AsyncSession, after: int, limit: int, prefix: Optional[str] = None):
+    """Page d'utilisateurs par curseur sur l'id (keyset) : coût constant quelle que soit la page."""
+    query = select(*ADMIN_USER_COLUMNS).where(User.id > after).order_by(User.id).limit(limit)
+    if prefix:
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.where(User.username.like(escaped + "%", escape="\\"))
+    result = await db.execute(query)
+    return [dict(row._mapping) for row in result]
+
+
 @app.get("/admin/users")
-async def get_all_users(admin: User = Depends(get_current_admin_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return users
+async def get_all_users(after: int = 0, limit: int = 50, prefix: Optional[str] = None,
+                        admin: Principal = Depends(get_current_admin_user), db: AsyncSession = Depends(get_db)):
+    limit = max(1, min(limit, ADMIN_USERS_MAX_LIMIT))
+    users = await fetch_users_page(db, after, limit, prefix)
+    next_cursor = users[-1]["id"] if len(users) == limit else None
+    return {"users": users, "next_cursor": next_cursor}
+
+
+@app.get("/admin/users/export")
+async def export_users(prefix: Optional[str] = None, admin: Principal = Depends(get_current_admin_user)):
+    async def ndjson_lines():
+        # Une session courte par page : pas de transaction ouverte pendant tout l'export
+        after = 0
+        while True:
+            async with AsyncSessionLocal() as session:
+                users = await fetch_users_page(session, after, ADMIN_EXPORT_PAGE_SIZE, prefix)
+            for user in users:
+                yield encode_message(user) + "\n"
+            if len(users) < ADMIN_EXPORT_PAGE_SIZE:
+                break
+            after = users[-1]["id"]
+
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
 
 
 @app.delete("/admin/users/{user_id}")
-async def delete_user(user_id: int, admin: User = Depends(get_current_admin_user), db: AsyncSession = Depends(get_db)):
+async def delete_user(user_id: int, admin: Principal = Depends(get_current_admin_user), db: AsyncSession = Depends(get_db)):
     # 1. On cherche l'utilisateur dans la base de données
     result = await db.execute(select(User).where(User.id == user_id))
     user_to_delete = result.scalars().first()
@@ -314,6 +542,9 @@ async def delete_user(user_id: int, admin: User = Depends(get_current_admin_user
     # 4. Suppression et validation
     await db.delete(user_to_delete)
     await db.commit()
+    # Les jetons encore valides de ce compte ne doivent plus passer par le cache
+    principal_cache.invalidate_user(user_to_delete.username)
+    leaderboard.remove_user(user_to_delete.username)
 
     return {"status": "User deleted", "username": user_to_delete.username}
 
@@ -341,22 +572,93 @@ async def get_user_stats(username: str, db: AsyncSession = Depends(get_db)):
         "daily_wins": user.daily_challenges_validated
     }
 
+@app.get("/tycoon/save")
+async def get_tycoon_save(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(User.tycoon_save).where(User.id == current_user.id))
+    version, data = tycoon_save.unpack(result.scalar())
+    return {"version": version, "save_data": data}
+
+
+@app.put("/tycoon/save")
+async def put_tycoon_save(payload: SaveGameRequest, current_user: Principal = Depends(get_current_user),
+                          db: AsyncSession = Depends(get_db)):
+    if payload.ops is None and payload.save_data is None:
+        raise HTTPException(status_code=400, detail="ops ou save_data requis")
+
+    # Verrou de ligne : deux sauvegardes simultanées ne peuvent pas partir de la même version
+    result = await db.execute(select(User.tycoon_save).where(User.id == current_user.id).with_for_update())
+    version, data = tycoon_save.unpack(result.scalar())
+    if payload.version != version:
+        await db.rollback()
+        return JSONResponse(status_code=409, content={"error": "version_conflict", "version": version})
+
+    try:
+        new_data = payload.save_data if payload.ops is None else tycoon_save.apply_patch(data, payload.ops)
+        stored = tycoon_save.pack(version + 1, new_data)
+    except tycoon_save.PatchError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=str(e))
+
+    await db.execute(update(User).where(User.id == current_user.id).values(tycoon_save=stored))
+    await db.commit()
+    return {"version": version + 1}
+
+
+LEADERBOARD_MAX_LIMIT = 100
+
+
+@app.get("/leaderboards/{board}")
+async def get_leaderboard(board: str, request: Request, limit: int = 10):
+    if board not in BOARDS:
+        return JSONResponse(status_code=404, content={"error": "leaderboard_not_found"})
+    limit = max(1, min(limit, LEADERBOARD_MAX_LIMIT))
+
+    # Le classement n'a pas bougé depuis la dernière visite : rien à renvoyer
+    etag = leaderboard.etag(board, f"-top{limit}")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(
+        encode_message(leaderboard.top(board, limit)),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/leaderboards/{board}/players/{username}")
+async def get_leaderboard_rank(board: str, username: str, request: Request):
+    if board not in BOARDS:
+        return JSONResponse(status_code=404, content={"error": "leaderboard_not_found"})
+
+    etag = leaderboard.etag(board, f"-{username}")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(leaderboard.player_rank(board, username), headers={"ETag": etag, "Cache-Control": "no-cache"})
+
 print("Chargement de la route /surrender...")
 @app.post("/rooms/{room_id}/surrender")
-async def surrender_room(room_id: str, payload: SurrenderRequest, db: AsyncSession = Depends(get_db)):    
+async def surrender_room(room_id: str, payload: SurrenderRequest):
     room = room_manager.get_room(room_id)
     if not room:
         return JSONResponse(status_code=404, content={"error": "room_not_found"})
 
+    status_code, body = await submit_surrender(room, payload.player_name, payload.vote)
+    if status_code != 200:
+        return JSONResponse(status_code=status_code, content=body)
+    return body
+
+
+async def submit_surrender(room: RoomState, player_name: str, vote: bool):
+    """Vote d'abandon, partagé entre la route HTTP et la WebSocket. Retourne (code, corps)."""
+    room_id = room.room_id
     if room.mode == "daily":
-        return JSONResponse(status_code=403, content={"message": "Impossible d'abandonner le défi quotidien !"})
+        return 403, {"message": "Impossible d'abandonner le défi quotidien !"}
 
     current_time = time.time()
     if room.surrender_cooldown > current_time:
         remaining = int(room.surrender_cooldown - current_time)
-        return JSONResponse(status_code=429, content={"message": f"Attendez {remaining}s avant de redemander."})
+        return 429, {"message": f"Attendez {remaining}s avant de redemander."}
 
-    if not payload.vote:
+    if not vote:
 
         room.surrender_votes.clear()
         room.surrender_active = False
@@ -364,12 +666,12 @@ async def surrender_room(room_id: str, payload: SurrenderRequest, db: AsyncSessi
         
         await connections.broadcast(room_id, {
             "type": "surrender_cancel",
-            "message": f"{payload.player_name} a refusé l'abandon.",
+            "message": f"{player_name} a refusé l'abandon.",
             "cooldown": 30
         })
-        return {"status": "cancelled"}
+        return 200, {"status": "cancelled"}
 
-    room.surrender_votes.add(payload.player_name)
+    room.surrender_votes.add(player_name)
     room.surrender_active = True
     
     active_count = len(room.active_players) if room.active_players else 1
@@ -377,14 +679,7 @@ async def surrender_room(room_id: str, payload: SurrenderRequest, db: AsyncSessi
 
     if vote_count >= active_count:
 
-        for p_name in room.active_players:
-            res = await db.execute(select(User).where(User.username == p_name))
-            u = res.scalars().first()
-            if u:
-                u.games_played += 1
-                if room.game_type == "cemantix":
-                    u.cemantix_surrenders += 1
-            await db.commit()
+        save_surrender_stats(room)
 
         target_word = getattr(room.engine, "target_word", "Inconnu")
         room.locked = True
@@ -394,20 +689,34 @@ async def surrender_room(room_id: str, payload: SurrenderRequest, db: AsyncSessi
         await connections.broadcast(room_id, {
             "type": "surrender_success",
             "word": target_word,
-            "player_name": payload.player_name
+            "player_name": player_name
         })
-        return {"status": "success"}
+        return 200, {"status": "success"}
 
     else:
         await connections.broadcast(room_id, {
             "type": "surrender_vote_start",
-            "initiator": payload.player_name,
+            "initiator": player_name,
             "current_votes": vote_count,
             "total_players": active_count
         })
-        return {"status": "vote_pending"}
+        return 200, {"status": "vote_pending"}
+
+
+def save_surrender_stats(room: RoomState):
+    # Écriture différée : l'agrégateur regroupe les incréments en un seul UPDATE périodique
+    surrendered = 1 if room.game_type == "cemantix" else 0
+    for p_name in room.active_players:
+        stats_aggregator.increment(p_name, games_played=1, cemantix_surrenders=surrendered)
     
 
+def auth_overloaded_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Trop de connexions en cours, réessayez dans un instant.",
+        headers={"Retry-After": "1"},
+    )
+
 @app.post("/auth/register")
 async def register(user_data: UserAuth, db = Depends(get_db)):
     # Vérifie si l'utilisateur existe déjà
@@ -416,12 +725,16 @@ async def register(user_data: UserAuth, db = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Ce pseudo est déjà pris.")
     
     # Création du compte
-    hashed_pw = get_password_hash(user_data.password)
+    try:
+        hashed_pw = await password_hasher.hash(user_data.password)
+    except HasherOverloaded:
+        raise auth_overloaded_exception()
     new_user = User(username=user_data.username, hashed_password=hashed_pw)
     db.add(new_user)
     try:
         await db.commit()
         await db.refresh(new_user)
+        leaderboard.add_user(new_user.username)
         # On connecte directement l'utilisateur après inscription
         access_token = create_access_token(data={"sub": new_user.username})
         return {"access_token": access_token, "token_type": "bearer", "username": new_user.username}
@@ -435,7 +748,11 @@ async def login(user_data: UserAuth, db = Depends(get_db)):
     result = await db.execute(select(User).where(User.username == user_data.username))
     user = result.scalars().first()
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    try:
+        valid = bool(user) and await password_hasher.verify(user_data.password, user.hashed_password)
+    except HasherOverloaded:
+        raise auth_overloaded_exception()
+    if not valid:
         raise HTTPException(status_code=401, detail="Pseudo ou mot de passe incorrect.")
     
     access_token = create_access_token(data={"sub": user.username})
@@ -445,103 +762,75 @@ async def login(user_data: UserAuth, db = Depends(get_db)):
             "is_admin": user.is_admin
         }
 
-@app.post("/rooms/join_random")
-def join_random_duel(payload: CreateRoomRequest):
-    global waiting_duel_room_id
-    
-    if waiting_duel_room_id:
-        room = room_manager.get_room(waiting_duel_room_id)
-        if room and len(room.players) < 2:
-            joined_room_id = waiting_duel_room_id
-            waiting_duel_room_id = None
-            return {
-                "room_id": joined_room_id,
-                "mode": room.mode,
-                "game_type": room.game_type,
-                "is_new": False
-            }
-        else:
-            waiting_duel_room_id = None
+async def create_duel_room(players: List[str]) -> Dict[str, Any]:
+    # Chargement du moteur (modèle) hors de la boucle asyncio
+    room = await engine_executor.run("create_room", room_manager.create_room, "duel", "blitz", players[0])
+    room.duration = 60
+    return {"room_id": room.room_id, "mode": room.mode, "game_type": room.game_type}
 
-    try:
-        room = room_manager.create_room("duel", "blitz", payload.player_name)
-        room.duration = 60
-        waiting_duel_room_id = room.room_id
-        
-        return {
-            "room_id": room.room_id,
-            "mode": room.mode,
-            "game_type": room.game_type,
-            "is_new": True
-        }
-    except Exception as exc:
-        print(f"Erreur Duel: {exc}")
-        return JSONResponse(status_code=503, content={"message": "Erreur création duel", "detail": str(exc)})
 
-@app.post("/report-bug")
-async def report_bug(report: BugReportRequest):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] User: {report.player_name} | Context: {report.context} | Bug: {report.description}\n"
+matchmaker = Matchmaker(create_duel_room)
+
 
+@app.post("/rooms/join_random")
+async def join_random_duel(payload: JoinRandomRequest):
+    wins = leaderboard.player_rank("wins", payload.player_name)["score"]
     try:
-        with LOG_FILE_PATH.open("a", encoding="utf-8") as f:
-            f.write(log_entry)
-    except Exception as e:
-        print(f"Erreur écriture log: {e}")
-
-    if DISCORD_WEBHOOK_URL:
-        async with httpx.AsyncClient() as client:
-            try:
-                discord_payload = {
-                    "content": f"🐛 **Nouveau Rapport de Bug !**",
-                    "embeds": [{
-                        "title": f"Contexte : {report.context}",
-                        "color": 15158332, # Rouge
-                        "fields": [
-                            {"name": "Joueur", "value": report.player_name, "inline": True},
-                            {"name": "Description", "value": report.description}
-                        ],
-                        "footer": {"text": timestamp}
-                    }]
-                }
-                print(f"Tentative d'envoi vers {DISCORD_WEBHOOK_URL}...")
-                response = await client.post(DISCORD_WEBHOOK_URL, json=discord_payload)
-                if response.status_code in [200, 204]:
-                    print("✅ Message Discord envoyé !")
-                else:
-                    print(f"⚠️ Erreur Discord: {response.status_code} - {response.text}")
-            except Exception as e:
-                print(f"Erreur envoi Discord: {e}")
+        match = await matchmaker.join(payload.player_name, wins, payload.search_token)
+    except TicketConflict as exc:
+        return JSONResponse(status_code=409, content={"message": str(exc)})
+    except MatchmakingError as exc:
+        return JSONResponse(status_code=503, content={"message": "Erreur création duel", "detail": str(exc)})
+    if match is None:
+        # Pas encore d'adversaire : le client relance la recherche, sa place en file est gardée
+        return JSONResponse(status_code=202, content={"status": "searching"})
+    return match
 
-    return {"message": "Signalement reçu, merci !"}
 
-def _get_log_content() -> str:
-    if not LOG_FILE_PATH.exists():
-        return "Aucun log disponible pour le moment."
+@app.delete("/rooms/join_random")
+async def leave_random_duel(player_name: str, search_token: str):
+    return {"left": matchmaker.leave(player_name, search_token)}
 
-    lines = LOG_FILE_PATH.read_text(encoding="utf-8").splitlines()
-    tail = lines[-200:] if len(lines) > 200 else lines
-    return "\n".join(tail)
+@app.post("/report-bug")
+async def report_bug(report: BugReportRequest):
+    # Écriture disque différée et groupée par le store, hors de la boucle asyncio
+    record = bug_log.append(report.player_name, report.context, report.description)
+    timestamp = record["timestamp"]
+
+    # Envoi Discord en tâche de fond : le joueur n'attend pas le webhook
+    bug_notifier.notify({
+        "title": f"Contexte : {report.context}",
+        "color": 15158332, # Rouge
+        "fields": [
+            {"name": "Joueur", "value": report.player_name, "inline": True},
+            {"name": "Description", "value": report.description}
+        ],
+        "footer": {"text": timestamp}
+    })
 
+    return {"message": "Signalement reçu, merci !"}
 
 @app.post("/admin/logs")
-def get_admin_logs(payload: AdminLogRequest):
+async def get_admin_logs(payload: AdminLogRequest):
     if not ADMIN_LOG_PASSWORD:
         return JSONResponse(status_code=503, content={"message": "Mot de passe admin non configuré sur le serveur."})
 
     if payload.password != ADMIN_LOG_PASSWORD:
         return JSONResponse(status_code=401, content={"message": "Accès refusé : mot de passe incorrect."})
 
-    return {"logs": _get_log_content()}
+    limit = max(1, min(payload.limit, 1000))
+    entries = await bug_log.tail(limit, payload.player_name or None, payload.context or None)
+    logs = "\n".join(format_record(entry) for entry in entries) or "Aucun log disponible pour le moment."
+    return {"logs": logs, "entries": entries}
 
 
 @app.get("/logs", response_class=HTMLResponse)
-def logs_page():
-    log_page = Path("static/logs.html")
-    if not log_page.exists():
+def logs_page(request: Request):
+    log_page = pages.get("logs")
+    if log_page is None:
         return JSONResponse(status_code=404, content={"message": "Page des logs manquante."})
 
-    return log_page.read_text(encoding="utf-8")
+    return log_page.response(request.headers)
 
 @app.get("/rooms/{room_id}/check")
 def check_room_exists(room_id: str):
@@ -551,19 +840,17 @@ def check_room_exists(room_id: str):
     return JSONResponse(status_code=404, content={"exists": False, "message": "Room introuvable"})
 
 @app.get("/", response_class=HTMLResponse)
-def hub_page():
-    with open("static/hub.html", "r", encoding="utf-8") as f:
-        return f.read()
+def hub_page(request: Request):
+    return pages["hub"].response(request.headers)
 
 
 @app.get("/game", response_class=HTMLResponse)
-def game_page():
-    with open("static/index.html", "r", encoding="utf-8") as f:
-        return f.read()
+def game_page(request: Request):
+    return pages["game"].response(request.headers)
 
 
 @app.post("/rooms")
-def create_room(payload: CreateRoomRequest):
+async def create_room(payload: CreateRoomRequest):
 
     needs_model = payload.game_type in ["cemantix", "dictionnario", "intruder", "hangman", "duel"]
     
@@ -575,8 +862,10 @@ def create_room(payload: CreateRoomRequest):
         return JSONResponse(status_code=500, content={"message": "Le modèle Cémantix n'est pas chargé sur le serveur."})
 
     mode = payload.mode if payload.mode in {"coop", "race", "blitz", "daily"} else "coop"
+    difficulty = payload.difficulty if payload.difficulty in DIFFICULTY_LEVELS else None
     try:
-        room = room_manager.create_room(payload.game_type, mode, payload.player_name)
+        room = await engine_executor.run("create_room", room_manager.create_room, payload.game_type, mode,
+                                         payload.player_name, difficulty)
     except Exception as exc:
         error_message = "Impossible de créer une partie de définition pour le moment." if payload.game_type == "definition" else "Erreur lors de la création de la partie."
         return JSONResponse(status_code=503, content={"message": error_message, "detail": str(exc)})
@@ -585,6 +874,7 @@ def create_room(payload: CreateRoomRequest):
         room.duration = payload.duration
         if payload.game_type != "duel":
             room.end_time = time.time() + payload.duration
+            schedule_round_end(room)
     
     return {
         "room_id": room.room_id, 
@@ -595,42 +885,35 @@ def create_room(payload: CreateRoomRequest):
 
 
 @app.post("/rooms/{room_id}/guess")
-@app.post("/rooms/{room_id}/guess")
-async def guess(room_id: str, payload: GuessRequest, db: AsyncSession = Depends(get_db)):
+async def guess(room_id: str, payload: GuessRequest):
     room = room_manager.get_room(room_id)
     if not room:
         return JSONResponse(status_code=404, content={"error": "room_not_found", "message": "Room inconnue"})
 
-    result_data = process_guess(room, payload.word.strip().lower(), payload.player_name)
+    status_code, body = await submit_guess(room, payload.word, payload.player_name)
+    if status_code != 200:
+        return JSONResponse(status_code=status_code, content=body)
+    return body
+
+
+async def submit_guess(room: RoomState, word: str, player_name: str):
+    """Traite un essai puis diffuse le résultat. Retourne (code, corps) pour HTTP comme pour la WebSocket."""
+    room_id = room.room_id
+    # Un seul essai à la fois par room : le moteur peut changer de mot pendant l'attente
+    async with room.engine_lock:
+        start = time.perf_counter()
+        result_data = await process_guess(room, word.strip().lower(), player_name)
+        game_guess_seconds.observe(time.perf_counter() - start, game_type=room.game_type)
     
     if result_data.get("error"):
-        return JSONResponse(status_code=400, content=result_data)
+        if result_data["error"] == "unknown_word":
+            game_unknown_words.inc(game_type=room.game_type)
+        return 400, result_data
 
     # Broadcast du résultat
     await connections.broadcast(room_id, result_data["guess_payload"])
     
     victory = result_data.get("victory", False)
-    
-    # --- LOGIQUE DE SAUVEGARDE DB ---
-    if victory:
-        # On cherche l'utilisateur dans la DB
-        result = await db.execute(select(User).where(User.username == payload.player_name))
-        user = result.scalars().first()
-        
-        if user:
-            user.games_played += 1
-            
-            if room.mode == "daily":
-                user.daily_challenges_validated += 1
-            
-            if room.game_type == "cemantix":
-                user.cemantix_wins += 1
-            elif room.game_type == "hangman":
-                user.hangman_wins += 1
-            
-            await db.commit()
-            print(f"Stats mises à jour pour {user.username}")
-    # -------------------------------
 
     # Mise à jour du scoreboard pour tout le monde
     await connections.broadcast(
@@ -641,38 +924,61 @@ async def guess(room_id: str, payload: GuessRequest, db: AsyncSession = Depends(
             "mode": room.mode,
             "locked": room.locked,
             "victory": victory,
-            "winner": payload.player_name if victory else None,
+            "winner": player_name if victory else None,
         },
     )
     
     if victory:
-        victory_msg = build_victory_message(room, payload.player_name)
+        victory_msg = build_victory_message(room, player_name)
         await connections.broadcast(room_id, victory_msg)
+        save_victory_stats(room, player_name)
 
-    return {
+    return 200, {
         **result_data["result"],
         "scoreboard": result_data["scoreboard"],
         "mode": room.mode,
         "locked": room.locked,
     }
 
+
+def save_victory_stats(room: RoomState, player_name: str):
+    # Les joueurs sans compte ne correspondent à aucune ligne : l'UPDATE les ignore
+    counters = {
+        "games_played": 1,
+        "daily_challenges_validated": 1 if room.mode == "daily" else 0,
+        "cemantix_wins": 1 if room.game_type == "cemantix" else 0,
+        "hangman_wins": 1 if room.game_type == "hangman" else 0,
+    }
+    stats_aggregator.increment(player_name, **counters)
+    leaderboard.increment(player_name, **counters)
+
+
 @app.post("/rooms/{room_id}/reset")
 async def reset_room(room_id: str, payload: ResetRequest):
     room = room_manager.get_room(room_id)
     if not room:
         return JSONResponse(status_code=404, content={"error": "room_not_found"})
 
+    _, body = await submit_reset(room, payload.player_name)
+    return body
+
+
+async def submit_reset(room: RoomState, player_name: str):
+    room_id = room.room_id
     # On enregistre le vote
-    all_ready = room.vote_reset(payload.player_name)
+    all_ready = room.vote_reset(player_name)
 
     if all_ready:
-        # Tout le monde est prêt : on relance !
-        room.reset_game()
+        # Tout le monde est prêt : on relance ! Le nouveau tirage se fait hors de la boucle
+        async with room.engine_lock:
+            await engine_executor.new_game(room.engine, **room.new_game_kwargs())
+            room.clear_game_state()
 
         # --- AJOUT BLITZ : On relance le chrono ---
         if room.mode == "blitz" and room.duration > 0:
             room.end_time = time.time() + room.duration
             room.team_score = 0 # On remet le score d'équipe à 0
+            schedule_round_end(room)
         # ------------------------------------------
         
         # On récupère le nouvel état public
@@ -686,7 +992,7 @@ async def reset_room(room_id: str, payload: ResetRequest):
             "scoreboard": build_scoreboard(room),
             "end_time": room.end_time
         })
-        return {"status": "reset_done"}
+        return 200, {"status": "reset_done"}
     else:
         # On attend encore des joueurs
         # On calcule qui on attend
@@ -698,7 +1004,7 @@ async def reset_room(room_id: str, payload: ResetRequest):
             "total_players": len(room.players),
             "waiting_for": waiting_for
         })
-        return {"status": "waiting"}
+        return 200, {"status": "waiting"}
     
 
 @app.get("/rooms/{room_id}/check_pseudo")
@@ -718,6 +1024,63 @@ def check_pseudo_availability(room_id: str, player_name: str):
     
     return {"available": True}
 
+def queue_full_sync(client: ClientConnection, room: RoomState):
+    # Récupération de l'état initial spécifique au jeu (ex: définition)
+    public_state = room.engine.get_public_state()
+
+    # Reconstruction de l'historique pour le nouveau venu, découpé si trop long
+    history_payload = build_history_payload(room)
+    inline = len(history_payload) <= HISTORY_CHUNK_SIZE
+
+    # Envoi de l'état initial (Sync)
+    client.enqueue(
+        {
+            "type": "state_sync",
+            "seq": room.events.seq,
+            "history": history_payload if inline else [],
+            "history_total": len(history_payload),
+            "history_complete": inline,
+            "scoreboard": build_scoreboard(room),
+            "mode": room.mode,
+            "locked": room.locked,
+            "game_type": room.game_type,
+            "public_state": public_state,
+            "end_time": room.end_time,
+            "duration": room.duration,
+        }
+    )
+    if inline:
+        return
+
+    chunk_count = (len(history_payload) + HISTORY_CHUNK_SIZE - 1) // HISTORY_CHUNK_SIZE
+    for index in range(chunk_count):
+        last = "true" if index == chunk_count - 1 else "false"
+        client.enqueue_frame(
+            f'{{"type":"history_chunk","index":{index},"last":{last},"entries":{encoded_history_chunk(room, index)}}}'
+        )
+
+
+async def handle_ws_action(room_id: str, player_name: str, data: Dict[str, Any]):
+    # Le pseudo est celui de la connexion, pas celui annoncé dans le message
+    room = room_manager.get_room(room_id)
+    if not room:
+        return 404, {"error": "room_not_found", "message": "Room inconnue"}
+
+    action = data.get("type")
+    try:
+        if action == "guess":
+            word = data.get("word")
+            if not isinstance(word, str) or not word.strip():
+                return 422, {"error": "invalid_word", "message": "Mot manquant"}
+            return await submit_guess(room, word, player_name)
+        if action == "reset":
+            return await submit_reset(room, player_name)
+        return await submit_surrender(room, player_name, bool(data.get("vote", True)))
+    except Exception as e:
+        print(f"Erreur action WS {action}: {e}")
+        return 500, {"error": "internal_error", "message": "Erreur serveur"}
+
+
 @app.websocket("/rooms/{room_id}/ws")
 async def websocket_endpoint(websocket: WebSocket, room_id: str):
     player_name = websocket.query_params.get("player_name")
@@ -736,14 +1099,22 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
         return
     
     if room.game_type == "duel":
-        if len(room.active_players) >= 2:
+        if len(room.active_players) >= 2 and player_name not in room.active_players:
             await websocket.accept()
             await websocket.send_json({"error": "room_full", "message": "Ce duel est complet (2 joueurs max)."})
             await websocket.close()
             return
 
 
-    await connections.connect(room_id, websocket)
+    # Protocole binaire compact si le client le demande et que msgpack est installé (JSON sinon)
+    binary = binary_protocol.is_available() and binary_protocol.SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+    client = await connections.connect(
+        room_id,
+        websocket,
+        batching=websocket.query_params.get("batch") == "1",
+        binary=binary,
+        player_name=player_name,
+    )
     room.add_player(player_name)
     room.active_players.add(player_name)
 
@@ -751,40 +1122,36 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
     if room.game_type == "duel" and len(room.players) == 2 and room.end_time == 0:
         room.end_time = time.time() + room.duration
         just_started = True
+    # Le chrono d'un duel démarre à l'arrivée du second joueur ; reprogrammer la même échéance est sans effet
+    schedule_round_end(room)
     
-    # Récupération de l'état initial spécifique au jeu (ex: définition)
-    public_state = room.engine.get_public_state()
-
-    # Reconstruction de l'historique pour le nouveau venu
-    history_payload = []
-    for entry in room.history:
-        progression = int(round(entry.similarity * 1000)) if entry.similarity is not None else 0
-        history_payload.append(
-            {
-                "word": entry.word,
-                "player_name": entry.player_name,
-                "temperature": entry.temperature,
-                "progression": progression,
-                "feedback": entry.feedback,
-                "game_type": room.game_type
-            }
-        )
+    # Reprise après une courte coupure : on ne renvoie que les événements manqués
+    missed_events = None
+    since_param = websocket.query_params.get("since")
+    if since_param is not None:
+        try:
+            missed_events = room.events.since(int(since_param))
+        except ValueError:
+            missed_events = None
 
-    # Envoi de l'état initial (Sync)
     try:
-        await websocket.send_json(
-            {
-                "type": "state_sync",
-                "history": history_payload,
-                "scoreboard": build_scoreboard(room),
-                "mode": room.mode,
-                "locked": room.locked,
-                "game_type": room.game_type,
-                "public_state": public_state,
-                "end_time": room.end_time,
-                "duration": room.duration,
-            }
-        )
+        # Passer par la file du client garantit l'ordre avec les diffusions en cours
+        if missed_events is not None:
+            client.enqueue(
+                {
+                    "type": "state_resume",
+                    "seq": room.events.seq,
+                    "missed": len(missed_events),
+                    "scoreboard": build_scoreboard(room),
+                    "mode": room.mode,
+                    "locked": room.locked,
+                    "end_time": room.end_time,
+                }
+            )
+            for event in missed_events:
+                client.enqueue(event)
+        else:
+            queue_full_sync(client, room)
 
         await connections.broadcast(
             room_id,
@@ -810,6 +1177,10 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
 
         while True:
             data = await websocket.receive_json()
+            client.touch()
+
+            if data.get("type") == "pong":
+                continue
 
             if data.get("type") == "chat":
                 content = data.get("content", "").strip()
@@ -825,27 +1196,51 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
                         },
                     )
 
+            elif data.get("type") in ("guess", "reset", "surrender"):
+                # Même traitement que les routes HTTP, sans pile HTTP ni session DB systématique
+                status_code, body = await handle_ws_action(room_id, player_name, data)
+                client.enqueue(
+                    {
+                        "type": "ack",
+                        "request_id": data.get("request_id"),
+                        "action": data.get("type"),
+                        "status": status_code,
+                        "ok": status_code < 400,
+                        "result": body,
+                    }
+                )
+
     except WebSocketDisconnect:
         print(f"[WS] Déconnexion de {player_name} (Room: {room_id})")
+        connections.disconnect(room_id, websocket)
+        if connections.player_connected(room_id, player_name):
+            # Ancienne socket d'un joueur déjà reconnecté : rien d'autre à faire
+            return
+
         if room.host_name == player_name:
             print(f"[WS] L'hôte {player_name} a quitté. Destruction de la room {room_id}.")
             await connections.broadcast(room_id, {
                 "type": "room_destroyed",
                 "message": "L'hôte a quitté la partie. La room est fermée."
             })
+            game_timers.cancel(room_id)
             if room_id in room_manager.rooms:
                 del room_manager.rooms[room_id]
-
-            connections.disconnect(room_id, websocket) 
         else:
-            connections.disconnect(room_id, websocket)
             room.active_players.discard(player_name)
-            global waiting_duel_room_id
-            if waiting_duel_room_id == room_id and len(room.active_players) == 0:
-                print(f"[DUEL] Room d'attente {room_id} abandonnée.")
-                waiting_duel_room_id = None
 
-    except Exception:
+    except Exception as e:
         print(f"Erreur WS: {e}")
         connections.disconnect(room_id, websocket)
-        room.active_players.discard(player_name)
\ No newline at end of file
+        if not connections.player_connected(room_id, player_name):
+            room.active_players.discard(player_name)
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", "1256")),
+        # Compression permessage-deflate des trames WebSocket (désactivable si le CPU est le goulot)
+        ws_per_message_deflate=os.environ.get("WS_PER_MESSAGE_DEFLATE", "1") == "1",
+    )
@@ -1,16 +1,36 @@
 from passlib.context import CryptContext
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
 from jose import jwt
 import hashlib
 import os
+import time
 from dotenv import load_dotenv
 
+from core import metrics
+
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "cle_de_secours_temporaire_pour_le_dev")
 
 ALGORITHM = "HS256"
 
+# Durée (secondes) pendant laquelle un jeton déjà vérifié évite le SELECT sur users
+AUTH_CACHE_TTL = float(os.environ.get("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", "10000"))
+
+# Threads dédiés à bcrypt (qui relâche le GIL) et nombre maximal de calculs en attente
+AUTH_HASH_WORKERS = int(os.environ.get("AUTH_HASH_WORKERS", "2"))
+AUTH_HASH_QUEUE_SIZE = int(os.environ.get("AUTH_HASH_QUEUE_SIZE", "32"))
+
+auth_hash_seconds = metrics.histogram("auth_hash_seconds", "Durée d'un calcul bcrypt", ["op"])
+auth_hash_queue_wait = metrics.histogram("auth_hash_queue_wait_seconds", "Attente avant qu'un thread bcrypt prenne la demande", ["op"])
+auth_hash_rejected = metrics.counter("auth_hash_rejected_total", "Demandes bcrypt refusées car la file est pleine", ["op"])
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def _pre_hash_password(password: str) -> str:
@@ -28,4 +48,121 @@ def create_access_token(data: dict):
     to_encode.update({"exp": expire})
     
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Utilisateur authentifié, détaché de la session DB pour pouvoir être mis en cache."""
+    id: int
+    username: str
+    is_admin: bool
+
+
+class PrincipalCache:
+    """Cache TTL des jetons vérifiés, avec invalidation explicite par utilisateur."""
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, max_size: int = AUTH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        # Jetons en cache par pseudo, pour invalider tous les appareils d'un joueur
+        self.tokens_by_user: Dict[str, Set[str]] = {}
+
+    def get(self, token: str) -> Optional[Principal]:
+        entry = self.entries.get(token)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._discard(token)
+            return None
+        return principal
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float] = None):
+        if self.ttl <= 0:
+            return
+        ttl = self.ttl
+        if token_exp is not None:
+            # Un jeton ne reste jamais en cache après son expiration
+            ttl = min(ttl, token_exp - time.time())
+            if ttl <= 0:
+                return
+        self._discard(token)
+        self.entries[token] = (principal, time.monotonic() + ttl)
+        self.tokens_by_user.setdefault(principal.username, set()).add(token)
+        while len(self.entries) > self.max_size:
+            oldest = next(iter(self.entries))
+            self._discard(oldest)
+
+    def invalidate_user(self, username: str):
+        """À appeler quand un compte est supprimé ou change de droits."""
+        for token in list(self.tokens_by_user.get(username, ())):
+            self._discard(token)
+
+    def clear(self):
+        self.entries.clear()
+        self.tokens_by_user.clear()
+
+    def _discard(self, token: str):
+        entry = self.entries.pop(token, None)
+        if entry is None:
+            return
+        username = entry[0].username
+        tokens = self.tokens_by_user.get(username)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self.tokens_by_user[username]
+
+
+principal_cache = PrincipalCache()
+
+
+class HasherOverloaded(Exception):
+    """Trop de calculs bcrypt en attente : la requête doit être retentée plus tard."""
+
+
+class PasswordHasher:
+    """Exécute bcrypt hors de la boucle asyncio, dans un pool de threads borné.
+
+    Une rafale de connexions ne gèle plus les WebSockets : au-delà de `max_pending`
+    demandes en cours, les suivantes sont refusées immédiatement.
+    """
+
+    def __init__(self, workers: int = AUTH_HASH_WORKERS, max_pending: int = AUTH_HASH_QUEUE_SIZE):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def _run(self, op: str, function, *args):
+        if self.pending >= self.max_pending:
+            auth_hash_rejected.inc(op=op)
+            raise HasherOverloaded()
+        self.pending += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            auth_hash_queue_wait.observe(started - submitted, op=op)
+            try:
+                return function(*args)
+            finally:
+                auth_hash_seconds.observe(time.perf_counter() - started, op=op)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,103 @@
+from typing import Any, Dict, List, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Sous-protocole WebSocket négocié par les clients qui veulent des trames binaires
+SUBPROTOCOL = "cemantix.msgpack.v1"
+
+# Schéma fixe : chaque clé connue est remplacée par son index dans cette liste.
+# On ne fait qu'ajouter à la fin ; changer l'ordre impose un nouveau sous-protocole.
+KEYS = (
+    "type", "seq", "word", "player_name", "temperature", "similarity", "progression",
+    "feedback", "game_type", "team_score", "defeat", "target_reveal", "exists", "is_correct",
+    "error", "message", "lives", "max_lives", "masked_word", "blitz_success", "new_public_state",
+    "public_state", "scoreboard", "attempts", "best_similarity", "mode", "locked", "victory",
+    "winner", "room_id", "history", "history_total", "history_complete", "end_time", "duration",
+    "index", "last", "entries", "missed", "content", "current_votes", "total_players",
+    "waiting_for", "initiator", "cooldown", "request_id", "action", "status", "ok", "result",
+    "events", "strings", "theme", "options", "hint", "word_length", "used_letters",
+)
+KEY_IDS = {key: index for index, key in enumerate(KEYS)}
+
+# Valeurs très répétées (pseudos, mots, types d'événement) envoyées sous forme d'identifiants
+INTERNED_KEYS = frozenset({"type", "word", "player_name", "winner", "initiator", "game_type", "mode"})
+
+STRINGS_KEY = KEY_IDS["strings"]
+
+
+def is_available() -> bool:
+    return msgpack is not None
+
+
+class StringTable:
+    """Table d'identifiants partagée par les clients binaires d'une room.
+
+    Les nouvelles chaînes sont définies dans la trame qui les utilise pour la
+    première fois ; un client qui arrive reçoit la table complète dans `schema_frame`.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: str, new_definitions: Dict[int, str]) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+            new_definitions[string_id] = value
+        return string_id
+
+
+def compact(message: Dict[str, Any], table: Optional[StringTable] = None) -> Dict[Any, Any]:
+    """Remplace les clés par leur index et, si une table est fournie, les chaînes internées par leur id."""
+    new_definitions: Dict[int, str] = {}
+    packed = _compact(message, table, new_definitions)
+    if new_definitions:
+        packed[STRINGS_KEY] = new_definitions
+    return packed
+
+
+def _compact(value: Any, table: Optional[StringTable], new_definitions: Dict[int, str]) -> Any:
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if table is not None and key in INTERNED_KEYS and isinstance(item, str):
+                item = table.intern(item, new_definitions)
+            else:
+                item = _compact(item, table, new_definitions)
+            result[KEY_IDS.get(key, key)] = item
+        return result
+    if isinstance(value, (list, tuple)):
+        return [_compact(item, table, new_definitions) for item in value]
+    if hasattr(value, "item"):
+        # Scalaires numpy (float32...) renvoyés par les moteurs
+        return value.item()
+    return value
+
+
+def encode(message: Dict[str, Any], table: Optional[StringTable] = None) -> bytes:
+    return msgpack.packb(compact(message, table))
+
+
+def schema_frame(table: StringTable) -> bytes:
+    # Première trame d'une connexion binaire : clés en clair pour que le client construise ses tables
+    return msgpack.packb({"type": "schema", "version": 1, "keys": list(KEYS), "strings": list(table.values)})
+
+
+def batch_frame(frames: List[bytes]) -> bytes:
+    """Assemble des trames déjà encodées en une trame batch, sans les ré-encoder."""
+    packer = msgpack.Packer()
+    return b"".join(
+        [
+            packer.pack_map_header(2),
+            packer.pack(KEY_IDS["type"]),
+            packer.pack("batch"),
+            packer.pack(KEY_IDS["events"]),
+            packer.pack_array_header(len(frames)),
+            *frames,
+        ]
+    )
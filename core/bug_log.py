@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+BUG_LOG_PATH = Path(os.environ.get("BUG_LOG_PATH", "bugs.jsonl"))
+# Ancien journal texte, importé une fois au démarrage puis renommé en .imported
+LEGACY_BUG_LOG_PATH = Path(os.environ.get("LEGACY_BUG_LOG_PATH", "bugs.log"))
+# Rotation quand le fichier courant dépasse cette taille ; on garde BUG_LOG_BACKUPS anciens fichiers
+BUG_LOG_MAX_BYTES = int(os.environ.get("BUG_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+BUG_LOG_BACKUPS = int(os.environ.get("BUG_LOG_BACKUPS", "5"))
+# Délai pendant lequel les rapports sont regroupés avant une écriture disque
+BUG_LOG_FLUSH_DELAY = float(os.environ.get("BUG_LOG_FLUSH_DELAY", "0.5"))
+
+READ_BLOCK_SIZE = 8192
+
+LEGACY_LINE = re.compile(r"\[(?P<timestamp>[^\]]*)\] User: (?P<player_name>.*?) \| Context: (?P<context>.*?) \| Bug: (?P<description>.*)")
+
+
+def read_lines_reverse(path: Path, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+    """Lit un fichier ligne par ligne en partant de la fin, par blocs : seuls les octets utiles sont lus."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        if position == 0:
+            return
+        f.seek(position - 1)
+        # Dernière ligne sans retour à la ligne : écriture en cours, on l'ignore
+        skip_partial = f.read(1) != b"\n"
+        remainder = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if skip_partial:
+                    skip_partial = False
+                elif line:
+                    yield line
+        if remainder and not skip_partial:
+            yield remainder
+
+
+def parse_legacy_log(text: str) -> List[Dict[str, Any]]:
+    """Relit l'ancien format texte ; une ligne qui ne commence pas un rapport prolonge sa description."""
+    records: List[Dict[str, Any]] = []
+    for line in text.splitlines():
+        match = LEGACY_LINE.fullmatch(line)
+        if match:
+            records.append(match.groupdict())
+        elif records:
+            records[-1]["description"] += "\n" + line
+    return records
+
+
+def format_record(record: Dict[str, Any]) -> str:
+    return f"[{record.get('timestamp')}] User: {record.get('player_name')} | Context: {record.get('context')} | Bug: {record.get('description')}"
+
+
+class BugLogStore:
+    """Rapports de bug en JSON lines, écrits par lots hors de la boucle asyncio.
+
+    Un index en mémoire (pseudo et contexte -> positions dans le fichier courant)
+    permet de filtrer sans relire tout le fichier ; les anciens fichiers tournés
+    sont parcourus à l'envers seulement si besoin.
+    """
+
+    def __init__(self, path: Path = BUG_LOG_PATH, max_bytes: int = BUG_LOG_MAX_BYTES,
+                 backups: int = BUG_LOG_BACKUPS, flush_delay: float = BUG_LOG_FLUSH_DELAY):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_delay = flush_delay
+        self.buffer: List[Dict[str, Any]] = []
+        self.index: Dict[str, Dict[str, List[int]]] = {"player_name": {}, "context": {}}
+        self.index_ready = False
+        self.wakeup: Optional[asyncio.Event] = None
+        self.writer_task: Optional[asyncio.Task] = None
+        self.io_lock = asyncio.Lock()
+
+    def append(self, player_name: str, context: str, description: str) -> Dict[str, Any]:
+        record = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "player_name": player_name,
+            "context": context,
+            "description": description,
+        }
+        self.buffer.append(record)
+        self._ensure_writer()
+        self.wakeup.set()
+        return record
+
+    def _ensure_writer(self):
+        loop = asyncio.get_running_loop()
+        task = self.writer_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self.wakeup = asyncio.Event()
+            self.writer_task = loop.create_task(self._writer())
+
+    async def _writer(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[BUGLOG] Erreur écriture : {e}")
+
+    async def flush(self):
+        async with self.io_lock:
+            if not self.buffer:
+                return
+            records, self.buffer = self.buffer, []
+            try:
+                offsets, rotated = await asyncio.to_thread(self._write_records, records)
+            except Exception:
+                self.buffer[:0] = records
+                raise
+            if rotated:
+                self._clear_index()
+            if self.index_ready:
+                for record, offset in zip(records, offsets):
+                    self._index_record(record, offset)
+
+    def _write_records(self, records: List[Dict[str, Any]]):
+        rotated = False
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rotate()
+            rotated = True
+        offsets = []
+        with open(self.path, "ab") as f:
+            for record in records:
+                offsets.append(f.tell())
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        return offsets, rotated
+
+    def _backup_path(self, number: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{number}")
+
+    def _rotate(self):
+        oldest = self._backup_path(self.backups)
+        if oldest.exists():
+            oldest.unlink()
+        for number in range(self.backups - 1, 0, -1):
+            source = self._backup_path(number)
+            if source.exists():
+                os.replace(source, self._backup_path(number + 1))
+        if self.backups > 0:
+            os.replace(self.path, self._backup_path(1))
+        else:
+            self.path.unlink()
+
+    def import_legacy(self, legacy_path: Path = LEGACY_BUG_LOG_PATH) -> int:
+        """Reprend l'ancien bugs.log en tête du fichier courant (rapports plus anciens), une seule fois."""
+        legacy_path = Path(legacy_path)
+        if not legacy_path.exists():
+            return 0
+        records = parse_legacy_log(legacy_path.read_text(encoding="utf-8", errors="replace"))
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            if self.path.exists():
+                f.write(self.path.read_bytes())
+        os.replace(tmp, self.path)
+        os.replace(legacy_path, legacy_path.with_name(legacy_path.name + ".imported"))
+        self.index_ready = False
+        print(f"[BUGLOG] {len(records)} rapports importés depuis {legacy_path}")
+        return len(records)
+
+    def _clear_index(self):
+        for field in self.index.values():
+            field.clear()
+
+    def _index_record(self, record: Dict[str, Any], offset: int):
+        for field, positions in self.index.items():
+            positions.setdefault(str(record.get(field)), []).append(offset)
+
+    def _build_index(self):
+        self._clear_index()
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.endswith(b"\n"):
+                    try:
+                        self._index_record(json.loads(line), offset)
+                    except ValueError:
+                        pass
+                offset += len(line)
+
+    async def tail(self, limit: int = 200, player_name: Optional[str] = None,
+                   context: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Derniers rapports (les plus anciens en premier), filtrés par joueur et/ou contexte."""
+        async with self.io_lock:
+            if not self.index_ready:
+                await asyncio.to_thread(self._build_index)
+                self.index_ready = True
+            pending = [r for r in self.buffer if self._matches(r, player_name, context)]
+            wanted = max(limit - len(pending), 0)
+            records = await asyncio.to_thread(self._read_tail, wanted, player_name, context)
+        return (records + pending)[-limit:] if limit > 0 else []
+
+    @staticmethod
+    def _matches(record: Dict[str, Any], player_name: Optional[str], context: Optional[str]) -> bool:
+        return (player_name is None or record.get("player_name") == player_name) and \
+            (context is None or record.get("context") == context)
+
+    def _read_tail(self, limit: int, player_name: Optional[str], context: Optional[str]) -> List[Dict[str, Any]]:
+        found: List[Dict[str, Any]] = []
+        if limit <= 0:
+            return found
+
+        if player_name is not None or context is not None:
+            # Fichier courant : positions tirées de l'index, on ne lit que les lignes retenues
+            candidates = None
+            for field, value in (("player_name", player_name), ("context", context)):
+                if value is not None:
+                    positions = set(self.index[field].get(value, ()))
+                    candidates = positions if candidates is None else candidates & positions
+            if candidates:
+                with open(self.path, "rb") as f:
+                    for offset in sorted(candidates, reverse=True)[:limit]:
+                        f.seek(offset)
+                        found.append(json.loads(f.readline()))
+        else:
+            found.extend(self._scan(self.path, limit - len(found), None, None))
+
+        for number in range(1, self.backups + 1):
+            if len(found) >= limit:
+                break
+            found.extend(self._scan(self._backup_path(number), limit - len(found), player_name, context))
+
+        found.reverse()
+        return found
+
+    def _scan(self, path: Path, limit: int, player_name: Optional[str], context: Optional[str]) -> List[Dict[str, Any]]:
+        found = []
+        for line in read_lines_reverse(path):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if self._matches(record, player_name, context):
+                found.append(record)
+                if len(found) >= limit:
+                    break
+        return found
+
+    async def stop(self):
+        if self.writer_task is not None:
+            self.writer_task.cancel()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+            self.writer_task = None
+        await self.flush()
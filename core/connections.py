@@ -0,0 +1,278 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import WebSocket
+
+from core import binary_protocol, metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Taille maximale de la file d'envoi d'un client avant qu'il soit considéré comme trop lent
+WS_SEND_QUEUE_SIZE = int(os.environ.get("WS_SEND_QUEUE_SIZE", "256"))
+# Délai maximal (secondes) pour qu'une trame parte vers un client
+WS_SEND_TIMEOUT = float(os.environ.get("WS_SEND_TIMEOUT", "5"))
+# Fenêtre (ms) pendant laquelle les événements d'une room sont regroupés ; 0 = même tour de boucle
+WS_BATCH_WINDOW_MS = float(os.environ.get("WS_BATCH_WINDOW_MS", "0"))
+# Intervalle entre deux pings applicatifs, et silence maximal toléré avant éviction (secondes)
+WS_HEARTBEAT_INTERVAL = float(os.environ.get("WS_HEARTBEAT_INTERVAL", "15"))
+WS_HEARTBEAT_TIMEOUT = float(os.environ.get("WS_HEARTBEAT_TIMEOUT", "45"))
+
+ws_evictions = metrics.counter("ws_evicted_connections_total", "Connexions WebSocket coupées par le serveur", ["reason"])
+ws_frames_sent = metrics.counter("ws_frames_sent_total", "Trames envoyées aux clients WebSocket")
+ws_queue_depth = metrics.gauge("ws_send_queue_depth", "Trames en attente dans les files d'envoi", ["stat"])
+ws_active_connections = metrics.gauge("ws_active_connections", "Connexions WebSocket ouvertes")
+ws_batched_events = metrics.counter("ws_batched_events_total", "Événements regroupés dans des trames multi-événements")
+ws_broadcast_seconds = metrics.histogram("ws_broadcast_fanout_seconds", "Durée de la distribution d'un lot d'événements aux clients d'une room")
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Encode un message en trame texte JSON (orjson si disponible)."""
+    if orjson is not None:
+        return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class ClientConnection:
+    """Une socket et sa file d'envoi, vidée par une tâche d'écriture dédiée.
+
+    Un client lent ne ralentit plus que lui-même : la diffusion se contente de
+    déposer les trames dans les files, sans attendre l'envoi réseau.
+    """
+
+    def __init__(self, manager: "RoomConnectionManager", room_id: str, websocket: WebSocket,
+                 max_queue: int = WS_SEND_QUEUE_SIZE, send_timeout: float = WS_SEND_TIMEOUT,
+                 batching: bool = False, binary: bool = False, player_name: Optional[str] = None):
+        self.manager = manager
+        self.room_id = room_id
+        self.websocket = websocket
+        self.player_name = player_name
+        # Dernier message reçu du client (pong ou autre), pour le heartbeat
+        self.last_seen = time.monotonic()
+        # Le client accepte les trames {"type": "batch", "events": [...]}
+        self.batching = batching
+        # Le client a négocié le sous-protocole MessagePack
+        self.binary = binary
+        self.send_timeout = send_timeout
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+        self.writer_task = asyncio.create_task(self._writer())
+
+    def enqueue(self, message: Dict[str, Any]) -> bool:
+        if self.binary:
+            # Trame propre à ce client : clés compactées mais chaînes non internées
+            return self.enqueue_frame(binary_protocol.encode(message))
+        return self.enqueue_frame(encode_message(message))
+
+    def enqueue_frame(self, frame: Union[str, bytes]) -> bool:
+        """Dépose une trame déjà encodée (partagée entre tous les destinataires)."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.manager.evict(self, "queue_full")
+            return False
+        return True
+
+    async def _writer(self):
+        try:
+            while True:
+                frame = await self.queue.get()
+                if isinstance(frame, bytes):
+                    send = self.websocket.send_bytes(frame)
+                else:
+                    send = self.websocket.send_text(frame)
+                await asyncio.wait_for(send, timeout=self.send_timeout)
+                ws_frames_sent.inc()
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.manager.evict(self, "send_timeout")
+        except Exception:
+            self.manager.evict(self, "send_error")
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def shutdown(self):
+        self.closed = True
+        if self.writer_task is not asyncio.current_task():
+            self.writer_task.cancel()
+
+    async def close(self, code: int = 1013):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+
+class RoomConnectionManager:
+    def __init__(self, prepare_message: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+                 max_queue: int = WS_SEND_QUEUE_SIZE, send_timeout: float = WS_SEND_TIMEOUT,
+                 batch_window_ms: float = WS_BATCH_WINDOW_MS,
+                 heartbeat_interval: float = WS_HEARTBEAT_INTERVAL, heartbeat_timeout: float = WS_HEARTBEAT_TIMEOUT,
+                 on_evict: Optional[Callable[[ClientConnection], None]] = None):
+        self.active_connections: Dict[str, List[ClientConnection]] = {}
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.batch_window = batch_window_ms / 1000.0
+        # Messages diffusés mais pas encore distribués, avec leur trame JSON, par room
+        self.pending_frames: Dict[str, List[Tuple[Dict[str, Any], str]]] = {}
+        # Tables de chaînes internées pour les clients binaires, par room
+        self.string_tables: Dict[str, binary_protocol.StringTable] = {}
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        # Une seule tâche pour toutes les sockets, démarrée à la première connexion
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        # Appelé après l'éviction d'un client (mise à jour de la présence dans la room)
+        self.on_evict = on_evict
+        self.lock = asyncio.Lock()
+        # Transformation appliquée une seule fois avant diffusion (ex: numéro de séquence)
+        self.prepare_message = prepare_message
+        ws_queue_depth.set_function(self._queue_depth_stats)
+        ws_active_connections.set_function(lambda: sum(len(c) for c in self.active_connections.values()))
+
+    async def connect(self, room_id: str, websocket: WebSocket, batching: bool = False,
+                      binary: bool = False, player_name: Optional[str] = None) -> ClientConnection:
+        await websocket.accept(subprotocol=binary_protocol.SUBPROTOCOL if binary else None)
+        client = ClientConnection(self, room_id, websocket, self.max_queue, self.send_timeout, batching, binary, player_name)
+        self.start_heartbeat()
+        async with self.lock:
+            self.active_connections.setdefault(room_id, []).append(client)
+            if binary:
+                # Pas d'attente entre l'ajout et le schéma : le client connaît toutes les chaînes
+                # déjà internées et recevra les définitions des suivantes dans les diffusions
+                table = self.string_tables.setdefault(room_id, binary_protocol.StringTable())
+                client.enqueue_frame(binary_protocol.schema_frame(table))
+        return client
+
+    def _remove(self, client: ClientConnection):
+        room_connections = self.active_connections.get(client.room_id)
+        if room_connections and client in room_connections:
+            room_connections.remove(client)
+            if not room_connections:
+                del self.active_connections[client.room_id]
+                self.string_tables.pop(client.room_id, None)
+
+    def disconnect(self, room_id: str, websocket: WebSocket):
+        for client in list(self.active_connections.get(room_id, [])):
+            if client.websocket is websocket:
+                self._remove(client)
+                client.shutdown()
+
+    def player_connected(self, room_id: str, player_name: str) -> bool:
+        """Vrai si le joueur a encore au moins une socket ouverte dans la room (ex: après reconnexion)."""
+        return any(client.player_name == player_name for client in self.active_connections.get(room_id, []))
+
+    def evict(self, client: ClientConnection, reason: str):
+        """Coupe un client trop lent ou injoignable sans bloquer la diffusion."""
+        if client.closed:
+            return
+        print(f"[WS] Client évincé de la room {client.room_id} ({reason})")
+        ws_evictions.inc(reason=reason)
+        self._remove(client)
+        client.shutdown()
+        asyncio.get_running_loop().create_task(client.close())
+        if self.on_evict:
+            self.on_evict(client)
+
+    def start_heartbeat(self):
+        if self.heartbeat_interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        task = self.heartbeat_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self.heartbeat_task = loop.create_task(self._heartbeat_loop())
+
+    async def stop_heartbeat(self):
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            try:
+                await self.heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self.heartbeat_task = None
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self.heartbeat_tick()
+            except Exception as e:
+                print(f"[WS] Erreur heartbeat: {e}")
+
+    def heartbeat_tick(self):
+        """Évince les sockets muettes depuis trop longtemps et envoie un ping aux autres."""
+        now = time.monotonic()
+        ping = {"type": "ping", "ts": time.time()}
+        json_ping = encode_message(ping)
+        binary_ping = binary_protocol.encode(ping) if binary_protocol.is_available() else None
+
+        for clients in list(self.active_connections.values()):
+            for client in list(clients):
+                if now - client.last_seen > self.heartbeat_timeout:
+                    self.evict(client, "heartbeat_timeout")
+                else:
+                    client.enqueue_frame(binary_ping if client.binary else json_ping)
+
+    async def broadcast(self, room_id: str, message: Dict[str, Any]):
+        if self.prepare_message:
+            message = self.prepare_message(room_id, message)
+
+        # Encodage unique, quelle que soit la taille de la room
+        frame = encode_message(message)
+
+        # Les événements produits dans la même fenêtre partent ensemble (ex: guess + scoreboard + victory)
+        pending = self.pending_frames.setdefault(room_id, [])
+        pending.append((message, frame))
+        if len(pending) == 1:
+            loop = asyncio.get_running_loop()
+            if self.batch_window > 0:
+                loop.call_later(self.batch_window, self._flush, room_id)
+            else:
+                loop.call_soon(self._flush, room_id)
+
+    def _flush(self, room_id: str):
+        pending = self.pending_frames.pop(room_id, None)
+        if not pending:
+            return
+        start = time.perf_counter()
+        clients = list(self.active_connections.get(room_id, []))
+
+        frames = [frame for _, frame in pending]
+        batch_frame = None
+        if len(frames) > 1:
+            batch_frame = '{"type":"batch","events":[' + ",".join(frames) + "]}"
+            ws_batched_events.inc(len(frames))
+
+        binary_frames: List[bytes] = []
+        binary_batch = None
+        if any(client.binary for client in clients):
+            # Encodage MessagePack unique lui aussi, seulement si un client binaire écoute
+            table = self.string_tables.setdefault(room_id, binary_protocol.StringTable())
+            binary_frames = [binary_protocol.encode(message, table) for message, _ in pending]
+            if len(binary_frames) > 1:
+                binary_batch = binary_protocol.batch_frame(binary_frames)
+
+        for client in clients:
+            if client.binary:
+                client_frames, client_batch = binary_frames, binary_batch
+            else:
+                client_frames, client_batch = frames, batch_frame
+            if client_batch is not None and client.batching:
+                client.enqueue_frame(client_batch)
+            else:
+                for frame in client_frames:
+                    if not client.enqueue_frame(frame):
+                        break
+        ws_broadcast_seconds.observe(time.perf_counter() - start)
+
+    def _queue_depth_stats(self):
+        depths = [client.queue.qsize() for clients in self.active_connections.values() for client in clients]
+        return {("total",): sum(depths), ("max",): max(depths, default=0)}
@@ -1,12 +1,84 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import event
 import os
+import re
 import ssl
+import time
 from dotenv import load_dotenv
 
+from core import metrics
+
 load_dotenv()
 
+# Réglages du pool (voir db_pool_wait_seconds et db_pool_connections pour les dimensionner)
+DB_ECHO = os.environ.get("DB_ECHO", "0") == "1"
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+# Caches de requêtes préparées (SQLAlchemy et asyncpg), par connexion ; 0 derrière un pgbouncer en mode transaction
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "100"))
+
+db_query_seconds = metrics.histogram("db_query_seconds", "Durée des requêtes SQL", ["statement"])
+db_query_errors = metrics.counter("db_query_errors_total", "Requêtes SQL en erreur", ["statement"])
+db_pool_wait = metrics.histogram("db_pool_wait_seconds", "Attente pour obtenir une connexion du pool")
+db_pool_connections = metrics.gauge("db_pool_connections", "Connexions du pool", ["state"])
+db_commit_seconds = metrics.histogram("db_commit_seconds", "Durée des COMMIT de session")
+
+_STATEMENT_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+\"?(\w+)", re.IGNORECASE)
+
+
+def _statement_label(statement: str) -> str:
+    # Verbe + table principale : assez précis pour repérer une requête, sans exploser le nombre de séries
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "?"
+    match = _STATEMENT_TABLE.search(statement)
+    return f"{verb} {match.group(1)}" if match else verb
+
+
+class PoolWaitTimer:
+    """Mixin de pool qui mesure le temps passé à attendre une connexion libre."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - start)
+
+
+class InstrumentedPool(PoolWaitTimer, AsyncAdaptedQueuePool):
+    """Pool asyncio instrumenté, utilisé par le moteur de l'application."""
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start"].pop()
+    db_query_seconds.observe(time.perf_counter() - start, statement=_statement_label(statement))
+
+
+def _handle_error(exception_context):
+    statement = exception_context.statement or ""
+    db_query_errors.inc(statement=_statement_label(statement))
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def instrument_engine(target):
+    """Branche la mesure des requêtes sur un moteur (synchrone ou son sync_engine)."""
+    target = getattr(target, "sync_engine", target)
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+    return target
+
 # 1. Récupération de l'URL brute
 raw_url = os.environ.get("DATABASE_URL")
 if not raw_url:
@@ -28,13 +100,46 @@ safe_url = db_url.set(query={})
 # 5. Création du moteur
 engine = create_async_engine(
     safe_url,
-    echo=True,
-    connect_args={"ssl": ssl_ctx} # On injecte le SSL ici directement
+    echo=DB_ECHO,
+    poolclass=InstrumentedPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        "ssl": ssl_ctx, # On injecte le SSL ici directement
+        # Cache de SQLAlchemy et cache propre à asyncpg : les deux doivent suivre le réglage
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
 )
 
+
+instrument_engine(engine)
+
+
+def _pool_stats():
+    pool = engine.pool
+    return {("checked_out",): pool.checkedout(), ("idle",): pool.checkedin(), ("overflow",): max(pool.overflow(), 0)}
+
+
+db_pool_connections.set_function(_pool_stats)
+
+class InstrumentedAsyncSession(AsyncSession):
+    """Session dont chaque COMMIT (flush compris) est chronométré."""
+
+    async def commit(self):
+        start = time.perf_counter()
+        try:
+            await super().commit()
+        finally:
+            db_commit_seconds.observe(time.perf_counter() - start)
+
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
-    class_=AsyncSession,
+    class_=InstrumentedAsyncSession,
     expire_on_commit=False,
     autoflush=False
 )
@@ -0,0 +1,104 @@
+import os
+import random
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+# Dossier des tables produites par tools/build_difficulty_tables.py
+DIFFICULTY_DIR = Path(os.environ.get("DIFFICULTY_DIR", "difficulty"))
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+TABLE_FILES = {"cemantix": "cemantix.npy", "hangman": "hangman.npy"}
+# Seuils de similarité du voisinage : beaucoup de mots proches = mot cible plus facile à cerner
+DENSITY_THRESHOLDS = (0.5, 0.3)
+
+
+def table_dtype(width: int) -> np.dtype:
+    return np.dtype([
+        ("word", f"S{width}"),
+        ("rank", "<i4"),  # Rang de fréquence (0 = mot le plus fréquent)
+        ("dense_05", "<i4"),  # Mots à plus de 0.5 de similarité
+        ("dense_03", "<i4"),  # Mots à plus de 0.3 de similarité
+        ("score", "<f4"),  # 0 = facile, 1 = difficile
+        ("level", "u1"),  # Index dans DIFFICULTY_LEVELS
+    ])
+
+
+def _percentile(values: np.ndarray) -> np.ndarray:
+    if len(values) < 2:
+        return np.zeros(len(values), dtype=np.float32)
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values), dtype=np.float32)
+    ranks[order] = np.arange(len(values), dtype=np.float32)
+    return ranks / (len(values) - 1)
+
+
+def difficulty_scores(ranks: np.ndarray, dense_05: np.ndarray, dense_03: np.ndarray) -> np.ndarray:
+    """Moitié rareté du mot, moitié pauvreté de son voisinage (en percentiles)."""
+    rarity = _percentile(np.asarray(ranks))
+    isolation = 1.0 - (_percentile(np.asarray(dense_05)) + _percentile(np.asarray(dense_03))) / 2
+    return (0.5 * rarity + 0.5 * isolation).astype(np.float32)
+
+
+def build_table(words, ranks, dense_05, dense_03) -> np.ndarray:
+    """Table triée par niveau puis par score : chaque niveau est une tranche contiguë."""
+    scores = difficulty_scores(ranks, dense_05, dense_03)
+    # Trois tiers de même taille
+    levels = np.minimum((_percentile(scores) * len(DIFFICULTY_LEVELS)).astype(np.uint8), len(DIFFICULTY_LEVELS) - 1)
+    encoded = [word.encode("utf-8") for word in words]
+    records = np.zeros(len(words), dtype=table_dtype(max((len(w) for w in encoded), default=1)))
+    records["word"] = encoded
+    records["rank"] = ranks
+    records["dense_05"] = dense_05
+    records["dense_03"] = dense_03
+    records["score"] = scores
+    records["level"] = levels
+    return records[np.lexsort((records["score"], records["level"]))]
+
+
+class DifficultyTable:
+    """Mots cibles classés par difficulté, lus depuis un .npy projeté en mémoire.
+
+    Les niveaux sont des tranches contiguës : un tirage est un index aléatoire dans la tranche.
+    """
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+        levels = np.asarray(records["level"])
+        self.bounds: Dict[str, tuple] = {}
+        for index, level in enumerate(DIFFICULTY_LEVELS):
+            self.bounds[level] = (int(np.searchsorted(levels, index, "left")), int(np.searchsorted(levels, index, "right")))
+
+    @classmethod
+    def load(cls, path: Path) -> "DifficultyTable":
+        return cls(np.load(path, mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.records)
+
+    def sample(self, level: Optional[str] = None, model=None, rng: random.Random = random,
+               attempts: int = 10) -> Optional[str]:
+        """Tire un mot du niveau demandé (tous niveaux si None) présent dans `model`."""
+        start, end = self.bounds.get(level, (0, len(self.records))) if level else (0, len(self.records))
+        if end <= start:
+            return None
+        for _ in range(attempts):
+            word = self.records[rng.randrange(start, end)]["word"].decode("utf-8")
+            if model is None or word in model.key_to_index:
+                return word
+        return None
+
+
+def load_tables(directory: Path = DIFFICULTY_DIR) -> Dict[str, DifficultyTable]:
+    tables = {}
+    for game_type, filename in TABLE_FILES.items():
+        path = Path(directory) / filename
+        if not path.exists():
+            continue
+        try:
+            tables[game_type] = table = DifficultyTable.load(path)
+            sizes = ", ".join(f"{level} {end - start}" for level, (start, end) in table.bounds.items())
+            print(f"[DIFFICULTY] {game_type} : {sizes} ({path})")
+        except Exception as e:
+            print(f"[DIFFICULTY] Table {path} illisible, tirage sans niveau : {e}")
+    return tables
@@ -0,0 +1,105 @@
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Taille des blocs lus sur disque pendant le chargement
+READ_CHUNK_SIZE = 1 << 20
+
+
+class WordVectors:
+    """Vecteurs de mots chargés depuis le format binaire word2vec, sans gensim.
+
+    Reprend la partie de `KeyedVectors` utilisée par les moteurs : `key_to_index`,
+    `index_to_key`, `get_vecattr(mot, "count")`, `similarity` et `most_similar`.
+    Les vecteurs sont gardés normalisés : seules des similarités cosinus sont calculées.
+    """
+
+    def __init__(self, index_to_key: List[str], vectors: np.ndarray, vocab_size: Optional[int] = None):
+        self.index_to_key = index_to_key
+        self.key_to_index: Dict[str, int] = {key: index for index, key in enumerate(index_to_key)}
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        # Normalisation sur place : pas de seconde copie de la matrice en mémoire
+        vectors /= norms
+        self.vectors = vectors
+        self.vector_size = vectors.shape[1]
+        # Le format binaire ne contient pas de fréquences : comme gensim, on attribue des
+        # effectifs décroissants selon le rang (les mots fréquents sont en tête du fichier)
+        self.vocab_size = vocab_size if vocab_size is not None else len(index_to_key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_to_index
+
+    def __len__(self) -> int:
+        return len(self.index_to_key)
+
+    def get_vecattr(self, key: str, attr: str):
+        if attr != "count":
+            raise KeyError(f"Attribut inconnu : {attr}")
+        return self.vocab_size - self.key_to_index[key]
+
+    def get_vector(self, key: str) -> np.ndarray:
+        return self.vectors[self.key_to_index[key]]
+
+    def similarity(self, w1: str, w2: str) -> np.float32:
+        return np.dot(self.get_vector(w1), self.get_vector(w2))
+
+    def most_similar(self, key: str, topn: int = 10) -> List[Tuple[str, float]]:
+        index = self.key_to_index[key]
+        scores = self.vectors @ self.vectors[index]
+        scores[index] = -np.inf
+        topn = min(topn, len(scores) - 1)
+        if topn <= 0:
+            return []
+        best = np.argpartition(-scores, topn - 1)[:topn]
+        best = best[np.argsort(-scores[best])]
+        return [(self.index_to_key[i], float(scores[i])) for i in best]
+
+
+def _read_header(f: BinaryIO) -> Tuple[int, int]:
+    header = f.readline().decode("utf-8").split()
+    return int(header[0]), int(header[1])
+
+
+def load_word2vec_binary(path: str, limit: Optional[int] = None, encoding: str = "utf-8") -> WordVectors:
+    """Lit un fichier word2vec binaire par blocs, directement dans un tableau NumPy préalloué."""
+    with open(path, "rb") as f:
+        vocab_size, vector_size = _read_header(f)
+        if limit is not None:
+            vocab_size = min(vocab_size, limit)
+
+        vectors = np.empty((vocab_size, vector_size), dtype=np.float32)
+        index_to_key: List[str] = []
+        seen: Dict[str, int] = {}
+        records_read = 0
+        record_bytes = vector_size * 4
+        buffer = b""
+        position = 0
+        eof = False
+
+        while records_read < vocab_size:
+            space = buffer.find(b" ", position)
+            if space == -1 or len(buffer) - space - 1 < record_bytes:
+                if eof:
+                    break
+                chunk = f.read(READ_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            # Le séparateur de fin de vecteur (\n) est facultatif selon les outils
+            word = buffer[position:space].lstrip(b"\n").decode(encoding, errors="strict")
+            vector = np.frombuffer(buffer, dtype="<f4", count=vector_size, offset=space + 1)
+            position = space + 1 + record_bytes
+            records_read += 1
+
+            if word in seen:
+                # Doublon : on garde le premier, comme gensim
+                continue
+            seen[word] = len(index_to_key)
+            vectors[len(index_to_key)] = vector
+            index_to_key.append(word)
+
+    # Les effectifs restent calculés sur la taille annoncée par l'en-tête, comme gensim
+    return WordVectors(index_to_key, vectors[:len(index_to_key)], vocab_size=vocab_size)
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from core import metrics
+
+# "thread" : pool de threads dédié ; "inline" : exécution directe sur la boucle (tests, débogage)
+ENGINE_EXECUTOR = os.environ.get("ENGINE_EXECUTOR", "thread")
+# NumPy relâche le GIL pendant les produits matriciels : quelques threads suffisent
+ENGINE_WORKERS = int(os.environ.get("ENGINE_WORKERS", "2"))
+
+engine_task_seconds = metrics.histogram("engine_task_seconds", "Durée des calculs des moteurs de jeu", ["op"])
+engine_queue_wait_seconds = metrics.histogram(
+    "engine_queue_wait_seconds", "Attente avant qu'un calcul de moteur démarre", ["op"]
+)
+engine_pending_tasks = metrics.gauge("engine_pending_tasks", "Calculs de moteur en cours ou en attente")
+
+
+class EngineExecutor:
+    """Exécute hors de la boucle asyncio le travail lourd des moteurs (tirage d'un mot, voisins).
+
+    Les moteurs gardent leur état et partagent le modèle chargé en mémoire : ils tournent
+    dans des threads du même processus. L'appelant sérialise les accès à un même moteur
+    (verrou de la room), le pool ne fait que libérer la boucle.
+    """
+
+    def __init__(self, kind: str = ENGINE_EXECUTOR, workers: int = ENGINE_WORKERS):
+        if kind not in ("thread", "inline"):
+            raise ValueError(f"ENGINE_EXECUTOR inconnu : {kind}")
+        self.kind = kind
+        self.executor: Optional[ThreadPoolExecutor] = None
+        if kind == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="engine")
+        self.pending = 0
+        engine_pending_tasks.set_function(lambda: self.pending)
+
+    async def run(self, op: str, function: Callable[..., Any], *args, **kwargs) -> Any:
+        self.pending += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            engine_queue_wait_seconds.observe(started - submitted, op=op)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                engine_task_seconds.observe(time.perf_counter() - started, op=op)
+
+        try:
+            if self.executor is None:
+                return timed()
+            return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+
+    async def new_game(self, engine, **kwargs):
+        return await self.run("new_game", engine.new_game, **kwargs)
+
+    async def next_word(self, engine):
+        return await self.run("next_word", engine.next_word)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+engine_executor = EngineExecutor()
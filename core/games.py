@@ -1,11 +1,15 @@
+import functools
 import random
 import re
+import time
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 import unicodedata
 import requests
 from urllib.parse import quote
 
+from core import metrics
+
 try:
     from wiktionaryparser import WiktionaryParser
 except ImportError:
@@ -17,8 +21,62 @@ def remove_accents(input_str):
 
 
 
+engine_new_game_seconds = metrics.histogram("engine_new_game_seconds", "Durée d'un tirage de partie", ["engine"])
+wiktionary_failures = metrics.counter("wiktionary_failures_total", "Appels au Wiktionnaire sans résultat exploitable", ["reason"])
+
+# Effectif minimal (rang de fréquence) des mots tirés par chaque jeu
+CEMANTIX_MIN_COUNT = 50000
+HANGMAN_MIN_COUNT = 50000
+DEFINITION_MIN_COUNT = 60000
+INTRUDER_MIN_COUNT = 50000
+DUEL_MIN_COUNT = 100000
+
+TARGET_WORD_PATTERN = re.compile(r"[a-zàâçéèêëîïôûùüÿñæœ]+")
+
+
+# Critères des mots cibles et des thèmes, partagés avec les outils de tools/
+def is_cemantix_target(model, word: str) -> bool:
+    return 4 <= len(word) <= 8 and TARGET_WORD_PATTERN.fullmatch(word) is not None \
+        and model.get_vecattr(word, "count") > CEMANTIX_MIN_COUNT
+
+
+def is_hangman_target(model, word: str) -> bool:
+    return 5 <= len(word) <= 10 and TARGET_WORD_PATTERN.fullmatch(word) is not None \
+        and model.get_vecattr(word, "count") > HANGMAN_MIN_COUNT
+
+
+def is_duel_theme(model, word: str) -> bool:
+    return 4 <= len(word) <= 10 and word.isalpha() and model.get_vecattr(word, "count") > DUEL_MIN_COUNT
+
+
+def is_intruder_theme(model, word: str) -> bool:
+    return len(word) >= 4 and word.isalpha() and model.get_vecattr(word, "count") > INTRUDER_MIN_COUNT
+
+
 # --- Base Game Class ---
+def _timed_new_game(new_game, engine_name: str):
+    @functools.wraps(new_game)
+    def wrapper(self, *args, **kwargs):
+        # Un tirage qui se relance lui-même (repli, super().new_game()) ne compte qu'une fois
+        if getattr(self, "_timing_new_game", False):
+            return new_game(self, *args, **kwargs)
+        self._timing_new_game = True
+        start = time.perf_counter()
+        try:
+            return new_game(self, *args, **kwargs)
+        finally:
+            self._timing_new_game = False
+            engine_new_game_seconds.observe(time.perf_counter() - start, engine=engine_name)
+    return wrapper
+
+
 class GameEngine(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Chaque tirage est chronométré, d'où qu'il vienne (création, reset, mot suivant en Blitz)
+        if "new_game" in cls.__dict__:
+            cls.new_game = _timed_new_game(cls.__dict__["new_game"], cls.__name__)
+
     @abstractmethod
     def new_game(self):
         pass
@@ -38,18 +96,29 @@ class GameEngine(ABC):
 
 
 class DuelEngine(GameEngine):
-    def __init__(self, model):
+    def __init__(self, model, pack=None):
         self.model = model
+        self.pack = pack
         self.theme_word = None
+        # Vocabulaire copié une fois par moteur, au premier tirage sans pack
+        self.vocab_keys: Optional[List[str]] = None
 
     def new_game(self):
+        # Pack prégénéré : un simple tirage d'index
+        puzzle = self.pack.sample(self.model) if self.pack is not None else None
+        if puzzle is not None:
+            self.theme_word = puzzle["theme"]
+            print(f"[DUEL] Thème choisi : {self.theme_word} (pack)")
+            return
+
         # On choisit un mot fréquent et simple comme thème (comme pour Intruder)
-        vocab_keys = list(self.model.key_to_index.keys())
+        if self.vocab_keys is None:
+            self.vocab_keys = list(self.model.key_to_index)
+        vocab_keys = self.vocab_keys
         while True:
             candidate = random.choice(vocab_keys)
             # On filtre: mot alphabétique, taille correcte, fréquence élevée
-            if (4 <= len(candidate) <= 10 and candidate.isalpha() 
-                and self.model.get_vecattr(candidate, "count") > 100000):
+            if is_duel_theme(self.model, candidate):
                 self.theme_word = candidate
                 break
         
@@ -86,29 +155,31 @@ class DuelEngine(GameEngine):
 
 # --- Cemantix Implementation ---
 class CemantixEngine(GameEngine):
-    def __init__(self, model):
+    def __init__(self, model, targets=None, difficulty: Optional[str] = None):
         self.model = model
+        # Table de difficulté (core/difficulty.py) : tirage direct dans le niveau demandé
+        self.targets = targets
+        self.difficulty = difficulty
         self.target_word: Optional[str] = None
 
     # MODIFICATION ICI : Ajout du paramètre 'custom_seed'
     def new_game(self, custom_seed=None):
-        vocab = self.model.key_to_index.keys()
-        frequent_words = [
-            w for w in vocab
-            if 4 <= len(w) <= 8
-            and re.fullmatch(r"[a-zàâçéèêëîïôûùüÿñæœ]+", w)
-            and self.model.get_vecattr(w, "count") > 50000
-        ]
-        
-        # Si c'est le mode Daily, on utilise la date comme graine aléatoire
-        if custom_seed:
-            random.seed(custom_seed)
-            self.target_word = random.choice(frequent_words)
-            # Important : on remet l'aléatoire normal pour ne pas impacter les autres jeux
-            random.seed(None)
-        else:
-            self.target_word = random.choice(frequent_words)
-            
+        if self.targets is not None:
+            # Mot du jour : même mot pour tous, quel que soit le niveau choisi
+            rng = random.Random(custom_seed) if custom_seed else random
+            word = self.targets.sample(None if custom_seed else self.difficulty, self.model, rng=rng)
+            if word is not None:
+                self.target_word = word
+                print(f"[CEMANTIX] Mot cible : {self.target_word} ({self.difficulty or 'tout niveau'})")
+                return
+
+        frequent_words = [w for w in self.model.key_to_index.keys() if is_cemantix_target(self.model, w)]
+
+        # Mode Daily : la date sert de graine. Générateur local, car les tirages des autres
+        # rooms tournent en parallèle dans l'exécuteur (pas de random.seed global)
+        rng = random.Random(custom_seed) if custom_seed else random
+        self.target_word = rng.choice(frequent_words)
+
         print(f"[CEMANTIX] Mot cible : {self.target_word}")
 
     def guess(self, word: str) -> Dict[str, Any]:
@@ -196,11 +267,13 @@ class DefinitionEngine(GameEngine):
             print(r.status_code)
             if r.status_code != 200:
                 print(r.status_code)
+                wiktionary_failures.inc(reason="http_error")
                 return False
 
             data = r.json()
         except Exception as e:
             print(f"[WKT] Exception: {e}")
+            wiktionary_failures.inc(reason="network")
             return False
 
         pages = data.get("query", {}).get("pages", [])
@@ -210,6 +283,7 @@ class DefinitionEngine(GameEngine):
 
         if pages[0].get("missing", False):
             print("[WKT] Mot inexistant dans Wiktionnaire.")
+            wiktionary_failures.inc(reason="missing")
             return False
 
         print("[WKT] Mot trouvé.")
@@ -240,11 +314,13 @@ class DefinitionEngine(GameEngine):
             data = requests.get(url, timeout=4, headers=headers).json()
         except Exception as e:
             print(f"[WKT] Exception: {e}")
+            wiktionary_failures.inc(reason="network")
             return None
 
         wikitext = data.get("parse", {}).get("wikitext", {}).get("*")
         if not wikitext:
             print("[WKT] Pas de wikitext.")
+            wiktionary_failures.inc(reason="no_definition")
             return None
 
         # On récupère la première ligne commençant par "# "
@@ -256,6 +332,7 @@ class DefinitionEngine(GameEngine):
             return defs[0]
 
         print("[WKT] Aucune définition exploitable.")
+        wiktionary_failures.inc(reason="no_definition")
         return None
 
     # -------------------------------------------------------
@@ -269,8 +346,8 @@ class DefinitionEngine(GameEngine):
         frequent_words = [
             w for w in vocab
             if 4 <= len(w) <= 12
-            and re.fullmatch(r"[a-zàâçéèêëîïôûùüÿñæœ]+", w)
-            and self.model.get_vecattr(w, "count") > 60000
+            and TARGET_WORD_PATTERN.fullmatch(w)
+            and self.model.get_vecattr(w, "count") > DEFINITION_MIN_COUNT
         ]
         print(f"[DEF] {len(frequent_words)} mots fréquents sélectionnés")
 
@@ -364,23 +441,37 @@ class DefinitionEngine(GameEngine):
 # Ajoutez les imports manquants si besoin (déjà présents normalement : random, re)
 
 class IntruderEngine(GameEngine):
-    def __init__(self, model):
+    def __init__(self, model, pack=None):
         self.model = model
+        self.pack = pack
         self.options = []
         self.correct_word = None # C'est l'intrus
         self.theme_word = None
+        # Vocabulaire copié une fois par moteur, au premier tirage sans pack
+        self.vocab_keys: Optional[List[str]] = None
 
 
 
     def new_game(self):
-        vocab_keys = list(self.model.key_to_index.keys())
+        # Pack prégénéré et vérifié hors ligne : plus de most_similar à chaque partie
+        puzzle = self.pack.sample(self.model) if self.pack is not None else None
+        if puzzle is not None:
+            self.theme_word = puzzle["theme"]
+            self.correct_word = puzzle["intruder"]
+            self.options = puzzle["neighbours"] + [puzzle["intruder"]]
+            random.shuffle(self.options)
+            print(f"[INTRUS] Thème: {self.theme_word} | Intrus: {self.correct_word} (pack)")
+            return
+
+        if self.vocab_keys is None:
+            self.vocab_keys = list(self.model.key_to_index)
+        vocab_keys = self.vocab_keys
         
         # 1. Choisir un mot thème fréquent (nom commun simple)
         # On filtre pour avoir des mots de taille raisonnable et alphabétiques
         while True:
             candidate = random.choice(vocab_keys)
-            if (len(candidate) >= 4 and candidate.isalpha() 
-                and self.model.get_vecattr(candidate, "count") > 50000):
+            if is_intruder_theme(self.model, candidate):
                 self.theme_word = candidate
                 break
 
@@ -442,8 +533,10 @@ class IntruderEngine(GameEngine):
         self.new_game()
 
 class HangmanEngine(GameEngine):
-    def __init__(self, model):
+    def __init__(self, model, targets=None, difficulty: Optional[str] = None):
         self.model = model
+        self.targets = targets
+        self.difficulty = difficulty
         self.target_word = None
         self.normalized_target = None
         self.found_letters = set()
@@ -452,15 +545,12 @@ class HangmanEngine(GameEngine):
         self.lives = 7
 
     def new_game(self):
-        vocab = self.model.key_to_index.keys()
-        # On choisit un mot fréquent (longueur 5 à 10)
-        frequent_words = [
-            w for w in vocab
-            if 5 <= len(w) <= 10
-            and re.fullmatch(r"[a-zàâçéèêëîïôûùüÿñæœ]+", w)
-            and self.model.get_vecattr(w, "count") > 50000
-        ]
-        self.target_word = random.choice(frequent_words)
+        word = self.targets.sample(self.difficulty, self.model) if self.targets is not None else None
+        if word is None:
+            # On choisit un mot fréquent (longueur 5 à 10)
+            frequent_words = [w for w in self.model.key_to_index.keys() if is_hangman_target(self.model, w)]
+            word = random.choice(frequent_words)
+        self.target_word = word
         # On normalise pour le jeu (Éléphant -> ELEPHANT) pour simplifier le clavier
         self.normalized_target = remove_accents(self.target_word)
         
@@ -0,0 +1,233 @@
+import asyncio
+import heapq
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+
+from core.models import User
+
+# Classements disponibles et compteurs de la table users qui les alimentent
+BOARDS = {
+    "wins": ("cemantix_wins", "hangman_wins"),
+    "cemantix": ("cemantix_wins",),
+    "hangman": ("hangman_wins",),
+    "daily": ("daily_challenges_validated",),
+}
+TRACKED_COUNTERS = ("cemantix_wins", "hangman_wins", "daily_challenges_validated")
+# Pseudos reconnus comme invités (aucun compte), gardés pour ne pas interroger la base à chaque victoire
+GUEST_CACHE_SIZE = 10000
+
+
+class Ranking:
+    """Classement incrémental : arbre de Fenwick sur le nombre de joueurs par score.
+
+    Une victoire (set) et le rang d'un joueur coûtent O(log S), S étant le meilleur
+    score ; le top N remonte les scores depuis le plus haut, sans trier la table.
+    Les ex aequo partagent le même rang (1, 1, 3...).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.tree: List[int] = [0] * (capacity + 1)
+        self.buckets: Dict[int, Set[str]] = {}
+        self.scores: Dict[str, int] = {}
+
+    def _add(self, score: int, delta: int):
+        while score <= self.capacity:
+            self.tree[score] += delta
+            score += score & -score
+
+    def _prefix(self, score: int) -> int:
+        """Nombre de joueurs dont le score est <= `score`."""
+        total, score = 0, min(score, self.capacity)
+        while score > 0:
+            total += self.tree[score]
+            score -= score & -score
+        return total
+
+    def _find(self, k: int) -> int:
+        """Plus petit score s tel que k joueurs ont un score <= s (k-ième score croissant)."""
+        position, step = 0, 1 << self.capacity.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.capacity and self.tree[nxt] < k:
+                position = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return position + 1
+
+    def _grow(self, score: int):
+        # Capacité doublée (coût amorti) puis arbre reconstruit depuis les paniers
+        while self.capacity < score:
+            self.capacity *= 2
+        self.tree = [0] * (self.capacity + 1)
+        for bucket_score, names in self.buckets.items():
+            self._add(bucket_score, len(names))
+
+    def set(self, username: str, score: int):
+        old = self.scores.get(username)
+        if old == score:
+            return
+        if old is not None:
+            bucket = self.buckets[old]
+            bucket.discard(username)
+            if not bucket:
+                del self.buckets[old]
+            self._add(old, -1)
+        if score > 0:
+            if score > self.capacity:
+                self._grow(score)
+            self.scores[username] = score
+            self.buckets.setdefault(score, set()).add(username)
+            self._add(score, 1)
+        else:
+            self.scores.pop(username, None)
+
+    def remove(self, username: str):
+        self.set(username, 0)
+
+    def rank(self, username: str) -> Optional[int]:
+        score = self.scores.get(username)
+        if score is None:
+            return None
+        # 1 + nombre de joueurs strictement devant
+        return len(self.scores) - self._prefix(score) + 1
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        entries = []
+        ahead, count = 0, len(self.scores)
+        while ahead < min(limit, count):
+            score = self._find(count - ahead)
+            bucket = self.buckets[score]
+            # Ex aequo départagés par pseudo ; seuls les premiers nécessaires sont triés
+            for username in heapq.nsmallest(limit - len(entries), bucket):
+                entries.append({"rank": ahead + 1, "player_name": username, "score": score})
+            ahead += len(bucket)
+        return entries
+
+    def __len__(self):
+        return len(self.scores)
+
+
+class LeaderboardService:
+    """Classements en mémoire, chargés une fois au démarrage puis tenus à jour à chaque victoire."""
+
+    def __init__(self, session_factory: Optional[Callable] = None):
+        self.rankings: Dict[str, Ranking] = {name: Ranking() for name in BOARDS}
+        # Comptes suivis ; les invités n'entrent pas dans les classements
+        self.users: Dict[str, Dict[str, int]] = {}
+        # Version par classement, pour les ETag ; l'époque change à chaque redémarrage
+        self.epoch = int(time.time())
+        self.versions: Dict[str, int] = {name: 0 for name in BOARDS}
+        self.top_cache: Dict[Tuple[str, int], Tuple[int, Dict[str, Any]]] = {}
+        # Comptes sans victoire au démarrage : non chargés, retrouvés à leur première victoire
+        self.session_factory = session_factory
+        self.unresolved: Dict[str, Dict[str, int]] = {}
+        self.guests: Set[str] = set()
+        self.resolver_task: Optional[asyncio.Task] = None
+
+    async def seed(self, session):
+        """Une seule requête projetée (pas de tycoon_save), limitée aux comptes ayant au moins un compteur non nul."""
+        counters = [getattr(User, name) for name in TRACKED_COUNTERS]
+        query = select(User.username, *counters).where(or_(*(column > 0 for column in counters)))
+        result = await session.stream(query)
+        count = 0
+        async for row in result:
+            username, *values = row
+            self.add_user(username, {name: value or 0 for name, value in zip(TRACKED_COUNTERS, values)})
+            count += 1
+        print(f"[LEADERBOARD] {count} comptes classés chargés")
+
+    def add_user(self, username: str, counters: Optional[Dict[str, int]] = None):
+        self.guests.discard(username)
+        self.users[username] = {name: 0 for name in TRACKED_COUNTERS}
+        if counters:
+            self.increment(username, **counters)
+
+    def remove_user(self, username: str):
+        if self.users.pop(username, None) is None:
+            return
+        for name, ranking in self.rankings.items():
+            if username in ranking.scores:
+                ranking.remove(username)
+                self._bump(name)
+
+    def increment(self, username: str, **counters: int):
+        user_counters = self.users.get(username)
+        if user_counters is None:
+            self._defer(username, counters)
+            return
+        changed = False
+        for name, amount in counters.items():
+            if name in user_counters and amount:
+                user_counters[name] += amount
+                changed = True
+        if not changed:
+            return
+        for name, sources in BOARDS.items():
+            if any(counters.get(source) for source in sources):
+                self.rankings[name].set(username, sum(user_counters[source] for source in sources))
+                self._bump(name)
+
+    def _defer(self, username: str, counters: Dict[str, int]):
+        """Pseudo absent du chargement initial : compte sans victoire ou invité, vérifié en base."""
+        if self.session_factory is None or username in self.guests:
+            return
+        pending = self.unresolved.setdefault(username, {})
+        for name, amount in counters.items():
+            if name in TRACKED_COUNTERS and amount:
+                pending[name] = pending.get(name, 0) + amount
+        loop = asyncio.get_running_loop()
+        task = self.resolver_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self.resolver_task = loop.create_task(self.resolve())
+
+    async def resolve(self):
+        """Une requête sur l'index unique du pseudo pour les victoires de joueurs inconnus."""
+        while self.unresolved:
+            batch, self.unresolved = self.unresolved, {}
+            try:
+                async with self.session_factory() as session:
+                    result = await session.execute(select(User.username).where(User.username.in_(list(batch))))
+                    accounts = set(result.scalars())
+            except Exception as e:
+                print(f"[LEADERBOARD] Vérification des comptes impossible : {e}")
+                return
+            if len(self.guests) > GUEST_CACHE_SIZE:
+                self.guests.clear()
+            for username, counters in batch.items():
+                if username in self.users:
+                    # Inscrit entre-temps : add_user l'a déjà créé
+                    self.increment(username, **counters)
+                elif username in accounts:
+                    # Compteurs nuls au démarrage : les victoires depuis suffisent
+                    self.add_user(username, counters)
+                else:
+                    self.guests.add(username)
+
+    def _bump(self, board: str):
+        self.versions[board] += 1
+
+    def etag(self, board: str, suffix: str = "") -> str:
+        return f'W/"{board}-{self.epoch}-{self.versions[board]}{suffix}"'
+
+    def top(self, board: str, limit: int) -> Dict[str, Any]:
+        version = self.versions[board]
+        cached = self.top_cache.get((board, limit))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        ranking = self.rankings[board]
+        payload = {"board": board, "total": len(ranking), "entries": ranking.top(limit)}
+        self.top_cache[(board, limit)] = (version, payload)
+        return payload
+
+    def player_rank(self, board: str, username: str) -> Dict[str, Any]:
+        ranking = self.rankings[board]
+        return {
+            "board": board,
+            "player_name": username,
+            "rank": ranking.rank(username),
+            "score": ranking.scores.get(username, 0),
+            "total": len(ranking),
+        }
@@ -0,0 +1,241 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core import metrics
+
+# Durée maximale d'une requête de recherche (long polling) ; le client relance ensuite
+MATCHMAKING_POLL_TIMEOUT = float(os.environ.get("MATCHMAKING_POLL_TIMEOUT", "20"))
+# Temps pendant lequel un ticket reste en file entre deux requêtes du même joueur
+MATCHMAKING_TICKET_GRACE = float(os.environ.get("MATCHMAKING_TICKET_GRACE", "10"))
+# Fenêtre de regroupement des arrivées avant un passage d'appariement
+MATCHMAKING_BATCH_INTERVAL = float(os.environ.get("MATCHMAKING_BATCH_INTERVAL", "0.05"))
+# Niveaux par nombre de victoires (0 : tout le monde dans la même file)
+MATCHMAKING_SKILL_BUCKETS = os.environ.get("MATCHMAKING_SKILL_BUCKETS", "1") == "1"
+# Chaque tranche de cette attente élargit d'un niveau l'écart accepté (0 : tous niveaux d'emblée)
+MATCHMAKING_WIDEN_AFTER = float(os.environ.get("MATCHMAKING_WIDEN_AFTER", "10"))
+
+matchmaking_wait_seconds = metrics.histogram(
+    "matchmaking_wait_seconds", "Attente entre l'entrée en file et l'appariement",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+matchmaking_queue_length = metrics.gauge("matchmaking_queue_length", "Joueurs en attente d'un adversaire")
+matchmaking_matches = metrics.counter("matchmaking_matches_total", "Duels formés par la file d'attente", ["widened"])
+matchmaking_timeouts = metrics.counter("matchmaking_timeouts_total", "Recherches terminées sans adversaire", ["reason"])
+
+
+def skill_bucket(wins: int) -> int:
+    """Niveau logarithmique : 0, 1, 2-3, 4-7, 8-15... victoires."""
+    return max(wins, 0).bit_length()
+
+
+class MatchmakingError(Exception):
+    pass
+
+
+class TicketConflict(MatchmakingError):
+    """Pseudo déjà en recherche avec un autre jeton (autre onglet ou autre personne)."""
+
+
+class _Ticket:
+    __slots__ = ("player_name", "token", "bucket", "enqueued_at", "last_seen", "waiters", "future")
+
+    def __init__(self, player_name: str, token: Optional[str], bucket: int, now: float):
+        self.player_name = player_name
+        # Jeton choisi par le client à la première requête : seul lui peut relancer ou annuler
+        self.token = token
+        self.bucket = bucket
+        self.enqueued_at = now
+        self.last_seen = now
+        self.waiters = 0
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class Matchmaker:
+    """File d'attente des duels aléatoires, vidée par lots par une tâche de fond.
+
+    Chaque joueur dépose un ticket dans la file de son niveau puis attend (long polling).
+    Les appariements se font sans `await` : deux passages ne peuvent pas prendre le même
+    ticket. La room n'est créée qu'une fois la paire formée, via `create_match`.
+    """
+
+    def __init__(self, create_match: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+                 poll_timeout: float = MATCHMAKING_POLL_TIMEOUT, grace: float = MATCHMAKING_TICKET_GRACE,
+                 batch_interval: float = MATCHMAKING_BATCH_INTERVAL, skill_buckets: bool = MATCHMAKING_SKILL_BUCKETS,
+                 widen_after: float = MATCHMAKING_WIDEN_AFTER):
+        self.create_match = create_match
+        self.poll_timeout = poll_timeout
+        self.grace = grace
+        self.batch_interval = batch_interval
+        self.skill_buckets = skill_buckets
+        self.widen_after = widen_after
+        self.tickets: Dict[str, _Ticket] = {}
+        # Par niveau, tickets encore en file dans l'ordre d'arrivée
+        self.queues: Dict[int, "OrderedDict[str, _Ticket]"] = {}
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        matchmaking_queue_length.set_function(lambda: sum(len(queue) for queue in self.queues.values()))
+
+    async def join(self, player_name: str, wins: int = 0, token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Attend un adversaire ; retourne la room du duel, ou None si la requête expire."""
+        self._ensure_running()
+        now = time.monotonic()
+        ticket = self.tickets.get(player_name)
+        if ticket is not None and ticket.token != token:
+            raise TicketConflict("Recherche déjà en cours pour ce pseudo")
+        if ticket is None:
+            ticket = _Ticket(player_name, token, skill_bucket(wins) if self.skill_buckets else 0, now)
+            self.tickets[player_name] = ticket
+            self.queues.setdefault(ticket.bucket, OrderedDict())[player_name] = ticket
+            self.wakeup.set()
+        ticket.last_seen = now
+        ticket.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(ticket.future), self.poll_timeout)
+        except asyncio.TimeoutError:
+            matchmaking_timeouts.inc(reason="poll")
+            return None
+        except asyncio.CancelledError:
+            # Ticket annulé (départ de la file, arrêt) plutôt que la requête elle-même
+            if not ticket.future.cancelled():
+                raise
+            return None
+        finally:
+            ticket.waiters -= 1
+            ticket.last_seen = time.monotonic()
+            if ticket.future.done() and self.tickets.get(player_name) is ticket:
+                del self.tickets[player_name]
+
+    def leave(self, player_name: str, token: Optional[str] = None) -> bool:
+        ticket = self.tickets.get(player_name)
+        if ticket is None or ticket.token != token:
+            return False
+        if ticket.future.done():
+            # Déjà apparié : la room existe, le joueur la quittera normalement
+            return False
+        self._discard(ticket)
+        ticket.future.cancel()
+        return True
+
+    def _discard(self, ticket: _Ticket):
+        if self.tickets.get(ticket.player_name) is ticket:
+            del self.tickets[ticket.player_name]
+        self._dequeue(ticket)
+
+    def _dequeue(self, ticket: _Ticket):
+        queue = self.queues.get(ticket.bucket)
+        if queue is not None:
+            queue.pop(ticket.player_name, None)
+            if not queue:
+                del self.queues[ticket.bucket]
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        task = self.task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self.tickets.clear()
+            self.queues.clear()
+            self.wakeup = asyncio.Event()
+            self.task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            if self.queues:
+                # Des joueurs attendent encore : repasser pour élargir les niveaux et purger
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), 1.0)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await self.wakeup.wait()
+            self.wakeup.clear()
+            await asyncio.sleep(self.batch_interval)
+            try:
+                self.purge(time.monotonic())
+                pairs = self.pair(time.monotonic())
+                if pairs:
+                    await asyncio.gather(*(self._start_match(pair) for pair in pairs))
+            except Exception as e:
+                print(f"[MATCHMAKING] Erreur d'appariement : {e}")
+
+    def purge(self, now: float) -> int:
+        """Retire les tickets abandonnés (plus aucune requête en cours depuis `grace`)."""
+        expired = [t for t in self.tickets.values() if t.waiters == 0 and now - t.last_seen > self.grace]
+        for ticket in expired:
+            self._discard(ticket)
+            if not ticket.future.done():
+                ticket.future.cancel()
+                matchmaking_timeouts.inc(reason="abandoned")
+        return len(expired)
+
+    def pair(self, now: float) -> List[Tuple[_Ticket, _Ticket]]:
+        """Forme toutes les paires possibles en un passage, les plus anciens d'abord."""
+        pairs: List[Tuple[_Ticket, _Ticket]] = []
+        leftovers: List[_Ticket] = []
+        for bucket in sorted(self.queues):
+            waiting = list(self.queues[bucket].values())
+            for index in range(0, len(waiting) - 1, 2):
+                pairs.append((waiting[index], waiting[index + 1]))
+            if len(waiting) % 2:
+                leftovers.append(waiting[-1])
+
+        # Un joueur seul à son niveau affronte un niveau voisin, d'autant plus éloigné qu'il attend
+        # depuis longtemps : les deux joueurs doivent accepter l'écart
+        widened = 0
+        index = 0
+        while index < len(leftovers) - 1:
+            first, second = leftovers[index], leftovers[index + 1]
+            if second.bucket - first.bucket <= min(self._allowed_gap(first, now), self._allowed_gap(second, now)):
+                pairs.append((first, second))
+                widened += 1
+                index += 2
+            else:
+                index += 1
+
+        # Les tickets appariés restent dans `tickets` jusqu'à ce que le joueur récupère sa room
+        for first, second in pairs:
+            self._dequeue(first)
+            self._dequeue(second)
+        if pairs:
+            matchmaking_matches.inc(len(pairs) - widened, widened="false")
+            if widened:
+                matchmaking_matches.inc(widened, widened="true")
+        return pairs
+
+    def _allowed_gap(self, ticket: _Ticket, now: float) -> float:
+        if self.widen_after <= 0:
+            return float("inf")
+        return (now - ticket.enqueued_at) // self.widen_after
+
+    async def _start_match(self, pair: Tuple[_Ticket, _Ticket]):
+        first, second = pair
+        now = time.monotonic()
+        try:
+            room = await self.create_match([first.player_name, second.player_name])
+        except Exception as e:
+            print(f"[MATCHMAKING] Création du duel impossible : {e}")
+            for ticket in pair:
+                if not ticket.future.done():
+                    ticket.future.set_exception(MatchmakingError(str(e)))
+            return
+        # Le premier arrivé crée la room (il y entre en premier), le second la rejoint
+        for ticket, is_new in ((first, True), (second, False)):
+            matchmaking_wait_seconds.observe(now - ticket.enqueued_at)
+            if not ticket.future.done():
+                ticket.future.set_result({**room, "is_new": is_new})
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        for ticket in list(self.tickets.values()):
+            if not ticket.future.done():
+                ticket.future.cancel()
+        self.tickets.clear()
+        self.queues.clear()
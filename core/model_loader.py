@@ -1,4 +1,4 @@
-from gensim.models import KeyedVectors
+from core.embeddings import load_word2vec_binary
 
 class ModelLoader:
     def __init__(self, model_path: str):
@@ -7,8 +7,6 @@ class ModelLoader:
 
     def load(self):
         if self.model is None:
-            self.model = KeyedVectors.load_word2vec_format(
-                self.model_path,
-                binary=True
-            )
+            # Lecteur word2vec natif : plus besoin d'importer gensim (ni scipy) au démarrage
+            self.model = load_word2vec_binary(self.model_path)
         return self.model
@@ -0,0 +1,140 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from core import metrics
+
+# Nombre maximal de notifications en attente ; au-delà, les nouvelles sont abandonnées
+NOTIFY_QUEUE_SIZE = int(os.environ.get("NOTIFY_QUEUE_SIZE", "100"))
+# Délai (secondes) pendant lequel les notifications sont regroupées dans un même message
+NOTIFY_BATCH_DELAY = float(os.environ.get("NOTIFY_BATCH_DELAY", "2"))
+NOTIFY_MAX_RETRIES = int(os.environ.get("NOTIFY_MAX_RETRIES", "5"))
+# Discord accepte au plus 10 embeds par message de webhook
+DISCORD_MAX_EMBEDS = 10
+
+notifications_sent = metrics.counter("notifications_sent_total", "Notifications livrées au webhook")
+notifications_dropped = metrics.counter("notifications_dropped_total", "Notifications abandonnées", ["reason"])
+notifications_retries = metrics.counter("notifications_retries_total", "Nouvelles tentatives d'envoi au webhook", ["reason"])
+
+
+class WebhookDispatcher:
+    """File d'envoi vers un webhook Discord, vidée par une tâche de fond.
+
+    La requête du joueur ne fait que déposer un embed dans la file. Un seul client
+    HTTP (connexions réutilisées) envoie les embeds par paquets de 10 et respecte
+    les limites de débit (429 + retry_after).
+    """
+
+    def __init__(self, url: Optional[str], content: str = "", max_queue: int = NOTIFY_QUEUE_SIZE,
+                 batch_delay: float = NOTIFY_BATCH_DELAY, max_retries: int = NOTIFY_MAX_RETRIES,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url
+        self.content = content
+        self.max_queue = max_queue
+        self.batch_delay = batch_delay
+        self.max_retries = max_retries
+        self.transport = transport
+        self.queue: Optional[asyncio.Queue] = None
+        self.client: Optional[httpx.AsyncClient] = None
+        self.worker_task: Optional[asyncio.Task] = None
+        # Paquet en cours d'envoi, renvoyé à l'arrêt si la tâche est interrompue
+        self.in_flight: List[Dict[str, Any]] = []
+
+    def notify(self, embed: Dict[str, Any]) -> bool:
+        if not self.url:
+            return False
+        self._ensure_worker()
+        try:
+            self.queue.put_nowait(embed)
+        except asyncio.QueueFull:
+            notifications_dropped.inc(reason="queue_full")
+            return False
+        return True
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        task = self.worker_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self.queue = asyncio.Queue(maxsize=self.max_queue)
+            self.client = httpx.AsyncClient(transport=self.transport, timeout=10.0)
+            self.worker_task = loop.create_task(self._worker())
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        # Chaque embed passe dans in_flight dès sa sortie de la file : un arrêt pendant
+        # le délai de regroupement le renvoie au lieu de le perdre
+        self.in_flight = [await self.queue.get()]
+        if self.batch_delay > 0:
+            await asyncio.sleep(self.batch_delay)
+        while len(self.in_flight) < DISCORD_MAX_EMBEDS and not self.queue.empty():
+            self.in_flight.append(self.queue.get_nowait())
+        return self.in_flight
+
+    async def _worker(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self.send(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                notifications_dropped.inc(len(batch), reason="error")
+                print(f"[NOTIFY] Erreur envoi webhook : {e}")
+            self.in_flight = []
+
+    async def send(self, embeds: List[Dict[str, Any]]) -> bool:
+        payload = {"content": self.content, "embeds": embeds}
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.post(self.url, json=payload)
+            except httpx.HTTPError as e:
+                delay, reason = 2 ** attempt, "network"
+                print(f"[NOTIFY] Webhook injoignable ({e}), nouvel essai dans {delay}s")
+            else:
+                if response.status_code < 300:
+                    notifications_sent.inc(len(embeds))
+                    return True
+                if response.status_code == 429:
+                    delay, reason = self._retry_after(response), "rate_limited"
+                elif response.status_code >= 500:
+                    delay, reason = 2 ** attempt, "server_error"
+                else:
+                    # 4xx autre que 429 : réessayer ne changera rien
+                    print(f"[NOTIFY] Webhook refusé : {response.status_code} - {response.text}")
+                    notifications_dropped.inc(len(embeds), reason="rejected")
+                    return False
+            if attempt < self.max_retries:
+                notifications_retries.inc(reason=reason)
+                await asyncio.sleep(delay)
+        notifications_dropped.inc(len(embeds), reason="retries_exhausted")
+        return False
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return float(response.json().get("retry_after", 1.0))
+        except Exception:
+            return float(response.headers.get("retry-after", 1.0))
+
+    async def stop(self, timeout: float = 5.0):
+        """Envoie ce qui reste en file (dans la limite de `timeout`) puis ferme le client."""
+        if self.worker_task is None:
+            return
+        self.worker_task.cancel()
+        try:
+            await self.worker_task
+        except asyncio.CancelledError:
+            pass
+        self.worker_task = None
+
+        remaining, self.in_flight = self.in_flight, []
+        while not self.queue.empty():
+            remaining.append(self.queue.get_nowait())
+        try:
+            for start in range(0, len(remaining), DISCORD_MAX_EMBEDS):
+                await asyncio.wait_for(self.send(remaining[start:start + DISCORD_MAX_EMBEDS]), timeout)
+        except Exception as e:
+            print(f"[NOTIFY] Notifications perdues à l'arrêt : {e}")
+        await self.client.aclose()
+        self.client = None
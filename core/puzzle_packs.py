@@ -0,0 +1,102 @@
+import os
+import random
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Dossier des packs produits par tools/build_puzzle_packs.py
+PUZZLE_PACK_DIR = Path(os.environ.get("PUZZLE_PACK_DIR", "packs"))
+PACK_FILES = {"intruder": "intruder.npy", "duel": "duel.npy"}
+# Nombre de voisins proposés avec l'intrus
+INTRUDER_NEIGHBOURS = 3
+
+
+def intruder_dtype(width: int) -> np.dtype:
+    return np.dtype([
+        ("theme", f"S{width}"),
+        ("neighbours", f"S{width}", (INTRUDER_NEIGHBOURS,)),
+        ("intruder", f"S{width}"),
+        # Similarité moyenne thème/voisins, et thème/intrus
+        ("neighbour_similarity", "<f4"),
+        ("intruder_similarity", "<f4"),
+    ])
+
+
+def duel_dtype(width: int) -> np.dtype:
+    return np.dtype([
+        ("theme", f"S{width}"),
+        ("count", "<i8"),
+        # Nombre de mots du vocabulaire à plus de 0.3 de similarité : thème jouable
+        ("density", "<i4"),
+    ])
+
+
+def _decode(value) -> Any:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, np.ndarray):
+        return [_decode(item) for item in value]
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class PuzzlePack:
+    """Puzzles prégénérés, lus depuis un .npy projeté en mémoire.
+
+    Le fichier n'est pas chargé : un tirage lit une seule ligne, à un index aléatoire.
+    """
+
+    def __init__(self, kind: str, records: np.ndarray):
+        self.kind = kind
+        self.records = records
+
+    @classmethod
+    def load(cls, kind: str, path: Path) -> "PuzzlePack":
+        return cls(kind, np.load(path, mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, index: int) -> Dict[str, Any]:
+        row = self.records[index]
+        return {name: _decode(row[name]) for name in self.records.dtype.names}
+
+    def sample(self, model=None, attempts: int = 10, rng: random.Random = random) -> Optional[Dict[str, Any]]:
+        """Tire un puzzle dont tous les mots existent dans `model` (None si le pack ne correspond pas)."""
+        if not len(self.records):
+            return None
+        for _ in range(attempts):
+            puzzle = self.record(rng.randrange(len(self.records)))
+            if model is None or all(word in model.key_to_index for word in _words(puzzle)):
+                return puzzle
+        return None
+
+
+def _words(puzzle: Dict[str, Any]):
+    for value in puzzle.values():
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, list):
+            yield from value
+
+
+def save_pack(path: Path, records: np.ndarray):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, records)
+    os.replace(tmp_path, path)
+
+
+def load_packs(directory: Path = PUZZLE_PACK_DIR) -> Dict[str, PuzzlePack]:
+    packs = {}
+    for kind, filename in PACK_FILES.items():
+        path = Path(directory) / filename
+        if not path.exists():
+            continue
+        try:
+            packs[kind] = PuzzlePack.load(kind, path)
+            print(f"[PACKS] {kind} : {len(packs[kind])} puzzles ({path})")
+        except Exception as e:
+            print(f"[PACKS] Pack {path} illisible, génération à la volée : {e}")
+    return packs
@@ -1,12 +1,17 @@
+import asyncio
 import json
 import os
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import date
 from typing import Dict, List, Optional, Any, Set
 
 from core.games import DuelEngine, CemantixEngine, DefinitionEngine, GameEngine, IntruderEngine, HangmanEngine
 
+# Nombre d'événements conservés par room pour les reconnexions (?since=<seq>)
+REPLAY_BUFFER_SIZE = int(os.environ.get("ROOM_REPLAY_BUFFER_SIZE", "256"))
+
 @dataclass
 class ChatMessage:
     player_name: str
@@ -68,6 +73,37 @@ class GuessEntry:
         room.history = [GuessEntry.from_dict(entry) for entry in data.get("history", [])]
         return room
 
+class RoomEventLog:
+    """Numérote les événements diffusés dans une room et garde les derniers en mémoire.
+
+    Un client qui se reconnecte avec ?since=<seq> ne reçoit que ce qu'il a raté,
+    tant que le tampon remonte assez loin.
+    """
+
+    def __init__(self, maxlen: int = REPLAY_BUFFER_SIZE):
+        self.seq = 0
+        self.buffer: deque = deque(maxlen=maxlen)
+
+    def record(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.seq += 1
+        event = {**message, "seq": self.seq}
+        self.buffer.append(event)
+        return event
+
+    def since(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """Événements postérieurs à `seq`, ou None s'il faut une synchro complète."""
+        if seq < 0 or seq > self.seq:
+            # Numéro venant d'une autre room (ou d'une room recréée)
+            return None
+        if seq == self.seq:
+            return []
+        if not self.buffer or self.buffer[0]["seq"] > seq + 1:
+            # Le tampon a déjà oublié une partie des événements manqués
+            return None
+        start = seq + 1 - self.buffer[0]["seq"]
+        return [self.buffer[i] for i in range(start, len(self.buffer))]
+
+
 @dataclass
 class RoomState:
     room_id: str
@@ -91,6 +127,16 @@ class RoomState:
 
     active_players: Set[str] = field(default_factory=set)
 
+    events: RoomEventLog = field(default_factory=RoomEventLog)
+
+    # Caches des charges utiles envoyées aux clients, invalidés quand l'état change
+    scoreboard_cache: Optional[List[Dict[str, Any]]] = None
+    history_payload_cache: List[Dict[str, Any]] = field(default_factory=list)
+    encoded_history_chunks: Dict[Any, str] = field(default_factory=dict)
+
+    # Sérialise les accès au moteur : un essai ne voit jamais un tirage à moitié fait
+    engine_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
+
     def add_chat_message(self, player_name: str, content: str):
         self.chat_history.append(ChatMessage(player_name, content))
         # On garde seulement les 50 derniers messages pour éviter de saturer la mémoire
@@ -100,6 +146,7 @@ class RoomState:
     def add_player(self, player_name: str):
         if player_name not in self.players:
             self.players[player_name] = PlayerStats()
+            self.scoreboard_cache = None
 
     # Mise à jour de la signature pour accepter feedback
     def record_guess(self, word: str, player_name: str, similarity: float, temperature: float, feedback: str = ""):
@@ -109,7 +156,8 @@ class RoomState:
         
         if similarity is not None and similarity > player.best_similarity:
             player.best_similarity = similarity
-        
+        self.scoreboard_cache = None
+
         self.history.append(GuessEntry(
             word=word,
             player_name=player_name,
@@ -126,18 +174,23 @@ class RoomState:
         return len(self.reset_votes) >= len(self.active_players)
 
     # AJOUT : Réinitialisation de la partie
-    def reset_game(self):
-        """Relance la partie"""
-        
+    def new_game_kwargs(self) -> Dict[str, Any]:
         # MODIFICATION : Si c'est le mode daily, on garde le mot du jour
         if self.mode == "daily" and isinstance(self.engine, CemantixEngine):
-             # On réutilise la même seed basée sur la date
-             from datetime import date
-             self.engine.new_game(custom_seed=date.today().isoformat())
-        else:
-             self.engine.new_game()
-             
+            # On réutilise la même seed basée sur la date
+            return {"custom_seed": date.today().isoformat()}
+        return {}
+
+    def reset_game(self):
+        """Relance la partie"""
+        self.engine.new_game(**self.new_game_kwargs())
+        self.clear_game_state()
+
+    def clear_game_state(self):
+        """Remet la partie à zéro une fois le nouveau mot tiré."""
         self.history.clear()
+        self.history_payload_cache.clear()
+        self.encoded_history_chunks.clear()
         self.reset_votes.clear()
         self.locked = False
 
@@ -153,12 +206,17 @@ class RoomState:
         }
 
 class RoomManager:
-    def __init__(self, model, state_path: str = "rooms_state.json"):
+    def __init__(self, model, state_path: str = "rooms_state.json", packs: Optional[Dict[str, Any]] = None,
+                 targets: Optional[Dict[str, Any]] = None):
         self.model = model
+        # Packs de puzzles prégénérés (core/puzzle_packs.py), par type de jeu
+        self.packs = packs or {}
+        # Tables de difficulté des mots cibles (core/difficulty.py), par type de jeu
+        self.targets = targets or {}
         self.state_path = state_path
         self.rooms: Dict[str, RoomState] = {}
 
-    def create_room(self, game_type: str, mode: str, creator_name: str) -> RoomState:
+    def create_room(self, game_type: str, mode: str, creator_name: str, difficulty: Optional[str] = None) -> RoomState:
         room_id = uuid.uuid4().hex[:8]
 
         engine: GameEngine
@@ -173,16 +231,16 @@ class RoomManager:
             except Exception as exc:
                 raise RuntimeError("Impossible d'initialiser le jeu de définition") from exc
         elif game_type == "intruder":
-            engine = IntruderEngine(self.model)
+            engine = IntruderEngine(self.model, pack=self.packs.get("intruder"))
             engine.new_game()
         elif game_type == "duel":
-            engine = DuelEngine(self.model)
+            engine = DuelEngine(self.model, pack=self.packs.get("duel"))
             engine.new_game()
         elif game_type == "cemantix":
-            engine = CemantixEngine(self.model)
+            engine = CemantixEngine(self.model, targets=self.targets.get("cemantix"), difficulty=difficulty)
             engine.new_game(custom_seed=custom_seed) # Passe la seed si mode daily
         else:
-            engine = HangmanEngine(self.model)
+            engine = HangmanEngine(self.model, targets=self.targets.get("hangman"), difficulty=difficulty)
             engine.new_game()
         
         # Initialisation correcte avec game_type
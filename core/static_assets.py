@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Callable, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+# Durée de cache des fichiers appelés avec leur empreinte (?v=<hash>) : leur contenu ne change jamais
+STATIC_IMMUTABLE_MAX_AGE = 31536000
+# Variantes précompressées produites par tools/build_static.py, par ordre de préférence
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+mimetypes.add_type("model/gltf-binary", ".glb")
+mimetypes.add_type("text/javascript", ".js")
+
+# Les modules JS gardent leur URL : ils s'importent entre eux par chemin relatif,
+# et une URL différente (?v=...) les chargerait deux fois avec un état séparé.
+_STATIC_REFERENCE = re.compile(r'(href|src)="/static/([^"?#]+)"')
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def accepted_encodings(headers: Headers) -> Set[str]:
+    encodings = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            encodings.add(name.lower())
+    return encodings
+
+
+def encoded_etag(digest: str, encoding: Optional[str] = None) -> str:
+    """ETag fort propre à chaque représentation : la version compressée n'a pas les mêmes octets."""
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def etag_matches(headers: Headers, etag: str) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class MemoryAsset:
+    """Fichier gardé en mémoire avec sa version gzip et son ETag, calculés une seule fois."""
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str = "no-cache"):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.etag = encoded_etag(self.digest)
+        self.gzip_body = None
+        if len(body) >= 1024:
+            compressed = gzip.compress(body, 9, mtime=0)
+            # Contenu déjà compressé (ex: favicon PNG) : on garde l'original
+            if len(compressed) < len(body) * 0.95:
+                self.gzip_body = compressed
+
+    @classmethod
+    def from_file(cls, path: str, media_type: Optional[str] = None, cache_control: str = "no-cache",
+                  transform: Optional[Callable[[str], str]] = None) -> "MemoryAsset":
+        with open(path, "rb") as f:
+            body = f.read()
+        if transform is not None:
+            body = transform(body.decode("utf-8")).encode("utf-8")
+        media_type = media_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return cls(body, media_type, cache_control)
+
+    def response(self, request_headers: Headers) -> Response:
+        encoding = "gzip" if self.gzip_body is not None and "gzip" in accepted_encodings(request_headers) else None
+        etag = encoded_etag(self.digest, encoding)
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(request_headers, etag):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            return Response(self.gzip_body, media_type=self.media_type, headers={**headers, "Content-Encoding": encoding})
+        return Response(self.body, media_type=self.media_type, headers=headers)
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """StaticFiles avec ETag par contenu, cache immuable pour les URLs à empreinte et fichiers précompressés."""
+
+    def __init__(self, directory: str, url_prefix: str = "/static", **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.url_prefix = url_prefix
+        # Empreintes par chemin absolu, recalculées si le fichier change (mtime, taille)
+        self.digests: Dict[str, Tuple[int, int, str]] = {}
+
+    def digest(self, full_path: str, stat_result: Optional[os.stat_result] = None) -> str:
+        stat_result = stat_result or os.stat(full_path)
+        cached = self.digests.get(full_path)
+        if cached is not None and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+            return cached[2]
+        value = file_digest(full_path)
+        self.digests[full_path] = (stat_result.st_mtime_ns, stat_result.st_size, value)
+        return value
+
+    def asset_url(self, relative_path: str) -> str:
+        full_path = os.path.join(str(self.directory), relative_path)
+        if not os.path.isfile(full_path):
+            return f"{self.url_prefix}/{relative_path}"
+        return f"{self.url_prefix}/{relative_path}?v={self.digest(full_path)}"
+
+    def manifest(self, subdirectory: str) -> Dict[str, str]:
+        """URLs à empreinte des fichiers d'un dossier, pour les ressources chargées depuis JS (modèles .glb)."""
+        root = os.path.join(str(self.directory), subdirectory)
+        urls = {}
+        for name in sorted(os.listdir(root)) if os.path.isdir(root) else ():
+            if name.endswith((".gz", ".br")):
+                continue
+            relative_path = f"{subdirectory}/{name}"
+            if os.path.isfile(os.path.join(root, name)):
+                urls[relative_path] = self.asset_url(relative_path)
+        return urls
+
+    def fingerprint_html(self, html: str) -> str:
+        """Ajoute ?v=<empreinte> aux feuilles de style et images référencées par une page."""
+        def replace(match):
+            attribute, relative_path = match.groups()
+            if relative_path.endswith(".js"):
+                return match.group(0)
+            return f'{attribute}="{self.asset_url(relative_path)}"'
+
+        return _STATIC_REFERENCE.sub(replace, html)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        digest = self.digest(full_path, stat_result)
+
+        version = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v", [None])[0]
+        if version == digest:
+            cache_control = f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            cache_control = "no-cache"
+
+        # Représentation choisie d'abord : son ETag dépend de l'encodage envoyé
+        encoding, served_path = None, full_path
+        encodings = accepted_encodings(request_headers)
+        for candidate, suffix in PRECOMPRESSED:
+            compressed_path = full_path + suffix
+            if candidate in encodings and os.path.isfile(compressed_path) \
+                    and os.stat(compressed_path).st_mtime_ns >= stat_result.st_mtime_ns:
+                encoding, served_path = candidate, compressed_path
+                break
+
+        etag = encoded_etag(digest, encoding)
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(request_headers, etag):
+            return Response(status_code=304, headers=headers)
+
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        if encoding:
+            return FileResponse(served_path, status_code=status_code, media_type=media_type,
+                                headers={**headers, "Content-Encoding": encoding})
+        return FileResponse(full_path, status_code=status_code, stat_result=stat_result,
+                            media_type=media_type, headers=headers)
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import bindparam, func, update
+
+from core import metrics
+from core.models import User
+
+# Compteurs de la table users accumulés en mémoire
+STAT_COUNTERS = ("games_played", "cemantix_wins", "cemantix_surrenders", "hangman_wins", "daily_challenges_validated")
+
+STATS_FLUSH_INTERVAL = float(os.environ.get("STATS_FLUSH_INTERVAL", "5"))
+# Fichier où sont déversés les compteurs non écrits à l'arrêt, relus au démarrage suivant
+STATS_SPILL_PATH = Path(os.environ.get("STATS_SPILL_PATH", "stats_spill.json"))
+
+stats_flush_seconds = metrics.histogram("stats_flush_seconds", "Durée des écritures groupées de statistiques")
+stats_flush_failures = metrics.counter("stats_flush_failures_total", "Écritures groupées de statistiques en échec")
+stats_pending_users = metrics.gauge("stats_pending_users", "Joueurs ayant des statistiques en attente d'écriture")
+
+
+def _build_update():
+    table = User.__table__
+    # Une seule requête préparée, exécutée en executemany : SET x = x + n pour chaque compteur
+    return (
+        update(table)
+        .where(table.c.username == bindparam("b_username"))
+        .values({name: func.coalesce(table.c[name], 0) + bindparam(f"b_{name}") for name in STAT_COUNTERS})
+    )
+
+
+class StatsAggregator:
+    """Accumule les incréments de statistiques et les écrit en tâche de fond.
+
+    Les parties n'attendent plus Postgres : `increment` ne fait que mettre à jour
+    un dictionnaire, et `flush` envoie tout en une seule requête groupée.
+    """
+
+    def __init__(self, session_factory: Callable, flush_interval: float = STATS_FLUSH_INTERVAL,
+                 spill_path: Path = STATS_SPILL_PATH):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.spill_path = Path(spill_path)
+        self.pending: Dict[str, Dict[str, int]] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.flush_lock = asyncio.Lock()
+        stats_pending_users.set_function(lambda: len(self.pending))
+
+    def increment(self, username: str, **counters: int):
+        if not username:
+            return
+        user_pending = self.pending.setdefault(username, {})
+        for name, amount in counters.items():
+            if name not in STAT_COUNTERS:
+                raise ValueError(f"Compteur inconnu : {name}")
+            if amount:
+                user_pending[name] = user_pending.get(name, 0) + amount
+
+    def _merge(self, batch: Dict[str, Dict[str, int]]):
+        for username, counters in batch.items():
+            user_pending = self.pending.setdefault(username, {})
+            for name, amount in counters.items():
+                user_pending[name] = user_pending.get(name, 0) + amount
+
+    async def flush(self) -> int:
+        """Écrit les compteurs en attente. Retourne le nombre de joueurs mis à jour."""
+        async with self.flush_lock:
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, {}
+            rows = [
+                {"b_username": username, **{f"b_{name}": counters.get(name, 0) for name in STAT_COUNTERS}}
+                for username, counters in batch.items()
+            ]
+            start = time.perf_counter()
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(_build_update(), rows)
+                    await session.commit()
+            except Exception:
+                # On garde les incréments pour la prochaine tentative
+                stats_flush_failures.inc()
+                self._merge(batch)
+                raise
+            finally:
+                stats_flush_seconds.observe(time.perf_counter() - start)
+            return len(rows)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[STATS] Écriture différée en échec, nouvel essai plus tard : {e}")
+
+    def load_spill(self):
+        if not self.spill_path.exists():
+            return
+        try:
+            spilled = json.loads(self.spill_path.read_text(encoding="utf-8"))
+            self._merge({u: {k: int(v) for k, v in c.items() if k in STAT_COUNTERS} for u, c in spilled.items()})
+            self.spill_path.unlink()
+            print(f"[STATS] {len(spilled)} joueurs récupérés depuis {self.spill_path}")
+        except Exception as e:
+            print(f"[STATS] Impossible de relire {self.spill_path} : {e}")
+
+    def spill(self):
+        if not self.pending:
+            return
+        tmp_path = self.spill_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.pending), encoding="utf-8")
+        os.replace(tmp_path, self.spill_path)
+        print(f"[STATS] {len(self.pending)} joueurs sauvegardés dans {self.spill_path}")
+
+    def start(self):
+        self.load_spill()
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"[STATS] Dernière écriture impossible ({e}), sauvegarde sur disque.")
+            self.spill()
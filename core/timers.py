@@ -0,0 +1,120 @@
+import asyncio
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+# Résolution de la roue (secondes) et nombre de cases ; une fin de manche est déclenchée
+# au plus TIMER_WHEEL_TICK secondes après son échéance
+TIMER_WHEEL_TICK = float(os.environ.get("TIMER_WHEEL_TICK", "0.25"))
+TIMER_WHEEL_SLOTS = int(os.environ.get("TIMER_WHEEL_SLOTS", "512"))
+
+
+class _Timer:
+    __slots__ = ("key", "deadline", "rounds", "slot", "callback")
+
+    def __init__(self, key: Hashable, deadline: float, rounds: int, slot: int,
+                 callback: Callable[[], Awaitable[Any]]):
+        self.key = key
+        self.deadline = deadline
+        self.rounds = rounds
+        self.slot = slot
+        self.callback = callback
+
+
+class TimerWheel:
+    """Roue de minuteries hachée : ajout et annulation en O(1), un seul tick pour toutes les rooms.
+
+    Chaque minuterie a une clé (ex: l'id de la room) ; reprogrammer une clé remplace
+    l'échéance précédente, ce qui couvre les relances de partie.
+    """
+
+    def __init__(self, tick: float = TIMER_WHEEL_TICK, slots: int = TIMER_WHEEL_SLOTS):
+        self.tick = tick
+        self.slots: List[Dict[Hashable, _Timer]] = [{} for _ in range(slots)]
+        self.timers: Dict[Hashable, _Timer] = {}
+        self.cursor = 0
+        # Instant (time.time) correspondant au début de la case `cursor`
+        self.cursor_time = time.time()
+        self.task: Optional[asyncio.Task] = None
+        # Levé dès qu'une minuterie est ajoutée : la roue vide dort sans tick
+        self.wakeup: Optional[asyncio.Event] = None
+
+    def schedule(self, key: Hashable, deadline: float, callback: Callable[[], Awaitable[Any]]):
+        """Programme `callback()` (coroutine) à l'instant `deadline` (time.time())."""
+        self.cancel(key)
+        if not self.timers:
+            # Roue vide : inutile de rattraper les cases écoulées pendant l'inactivité
+            self.cursor_time = time.time()
+        # La case courante est déjà traitée : une échéance passée part au tick suivant
+        ticks = max(1, math.ceil((deadline - self.cursor_time) / self.tick))
+        slot = (self.cursor + ticks) % len(self.slots)
+        timer = _Timer(key, deadline, (ticks - 1) // len(self.slots), slot, callback)
+        self.slots[slot][key] = timer
+        self.timers[key] = timer
+        self._ensure_running()
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self.timers.pop(key, None)
+        if timer is None:
+            return False
+        self.slots[timer.slot].pop(key, None)
+        return True
+
+    def __len__(self):
+        return len(self.timers)
+
+    def _ensure_running(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Appelé hors de la boucle : la minuterie partira au prochain démarrage de la roue
+            return
+        task = self.task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self.wakeup = asyncio.Event()
+            self.task = loop.create_task(self._run())
+        self.wakeup.set()
+
+    async def _run(self):
+        while True:
+            if not self.timers:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            await asyncio.sleep(max(0.0, self.cursor_time + self.tick - time.time()))
+            try:
+                self.advance(time.time())
+            except Exception as e:
+                print(f"[TIMERS] Erreur de la roue : {e}")
+
+    def advance(self, now: float) -> int:
+        """Traite toutes les cases écoulées jusqu'à `now`. Retourne le nombre de minuteries déclenchées."""
+        fired = 0
+        while self.cursor_time + self.tick <= now:
+            self.cursor_time += self.tick
+            self.cursor = (self.cursor + 1) % len(self.slots)
+            bucket = self.slots[self.cursor]
+            for key, timer in list(bucket.items()):
+                if timer.rounds > 0:
+                    timer.rounds -= 1
+                    continue
+                del bucket[key]
+                del self.timers[key]
+                fired += 1
+                asyncio.get_running_loop().create_task(self._fire(timer))
+        return fired
+
+    async def _fire(self, timer: _Timer):
+        try:
+            await timer.callback()
+        except Exception as e:
+            print(f"[TIMERS] Erreur dans la minuterie {timer.key} : {e}")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
@@ -0,0 +1,128 @@
+import base64
+import copy
+import json
+import os
+import zlib
+from typing import Any, Dict, List, Tuple
+
+# Au-delà de cette taille (octets JSON), la sauvegarde est stockée compressée
+TYCOON_SAVE_COMPRESS_MIN = int(os.environ.get("TYCOON_SAVE_COMPRESS_MIN", "1024"))
+# Garde-fou sur la taille d'une sauvegarde décompressée
+TYCOON_SAVE_MAX_BYTES = int(os.environ.get("TYCOON_SAVE_MAX_BYTES", str(1024 * 1024)))
+
+
+class PatchError(ValueError):
+    """Opération de patch invalide (chemin inexistant, opération inconnue, test échoué...)."""
+
+
+def _parse_pointer(path: str) -> List[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise PatchError(f"Chemin invalide : {path}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in path[1:].split("/")]
+
+
+def _resolve(document: Any, parts: List[str]) -> Tuple[Any, str]:
+    """Retourne le conteneur parent et la dernière clé du chemin."""
+    parent = document
+    for part in parts[:-1]:
+        try:
+            parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise PatchError(f"Chemin introuvable : /{'/'.join(parts)}")
+    return parent, parts[-1]
+
+
+def _list_index(container: list, key: str, allow_end: bool) -> int:
+    if allow_end and key == "-":
+        return len(container)
+    try:
+        index = int(key)
+    except ValueError:
+        raise PatchError(f"Index de liste invalide : {key}")
+    limit = len(container) if allow_end else len(container) - 1
+    if index < 0 or index > limit:
+        raise PatchError(f"Index hors limites : {key}")
+    return index
+
+
+def apply_patch(document: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Applique des opérations façon JSON Patch (add, remove, replace, test) sur une copie du document."""
+    result = copy.deepcopy(document)
+    for operation in operations:
+        op = operation.get("op")
+        parts = _parse_pointer(operation.get("path", ""))
+        if not parts:
+            # Remplacement de la racine
+            if op in ("add", "replace"):
+                result = copy.deepcopy(operation.get("value"))
+                if not isinstance(result, dict):
+                    raise PatchError("La sauvegarde doit rester un objet JSON")
+                continue
+            raise PatchError(f"Opération {op} impossible sur la racine")
+
+        parent, key = _resolve(result, parts)
+        if op == "add":
+            value = copy.deepcopy(operation.get("value"))
+            if isinstance(parent, list):
+                parent.insert(_list_index(parent, key, allow_end=True), value)
+            elif isinstance(parent, dict):
+                parent[key] = value
+            else:
+                raise PatchError(f"Conteneur invalide pour {operation.get('path')}")
+        elif op in ("remove", "replace", "test"):
+            if isinstance(parent, list):
+                index = _list_index(parent, key, allow_end=False)
+            elif isinstance(parent, dict) and key in parent:
+                index = key
+            else:
+                raise PatchError(f"Chemin introuvable : {operation.get('path')}")
+            if op == "remove":
+                del parent[index]
+            elif op == "replace":
+                parent[index] = copy.deepcopy(operation.get("value"))
+            elif parent[index] != operation.get("value"):
+                raise PatchError(f"Test échoué sur {operation.get('path')}")
+        else:
+            raise PatchError(f"Opération inconnue : {op}")
+    return result
+
+
+# Clé de version de l'enveloppe : ne peut pas se confondre avec un champ d'une ancienne sauvegarde brute
+ENVELOPE_KEY = "__tycoon_v"
+
+
+def _is_envelope(stored: Dict[str, Any], version_key: str) -> bool:
+    version = stored.get(version_key)
+    if not isinstance(version, int) or isinstance(version, bool):
+        return False
+    keys = set(stored)
+    return keys == {version_key, "data"} and isinstance(stored["data"], dict) \
+        or keys == {version_key, "z"} and isinstance(stored["z"], str)
+
+
+def unpack(stored: Any) -> Tuple[int, Dict[str, Any]]:
+    """Lit la colonne tycoon_save : enveloppe versionnée, éventuellement compressée, ou ancien dict brut."""
+    if not stored:
+        return 0, {}
+    if isinstance(stored, dict):
+        # "v" : premières enveloppes, reconnues seulement si elles en ont exactement la forme
+        for version_key in (ENVELOPE_KEY, "v"):
+            if _is_envelope(stored, version_key):
+                if "z" in stored:
+                    raw = zlib.decompress(base64.b64decode(stored["z"]))
+                    return stored[version_key], json.loads(raw)
+                return stored[version_key], stored["data"]
+    # Sauvegarde antérieure au versionnage
+    return 0, stored
+
+
+def pack(version: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Construit l'enveloppe stockée ; compacte le JSON et le compresse s'il est gros."""
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(raw) > TYCOON_SAVE_MAX_BYTES:
+        raise PatchError("Sauvegarde trop volumineuse")
+    if len(raw) >= TYCOON_SAVE_COMPRESS_MIN:
+        return {ENVELOPE_KEY: version, "z": base64.b64encode(zlib.compress(raw, 6)).decode("ascii")}
+    return {ENVELOPE_KEY: version, "data": data}
@@ -2,7 +2,7 @@ import { verifierPseudo  } from "./session.js";
 import { state } from "./state.js";
 import { showModal } from "./ui.js";
 
-export async function createGame(type, mode = 'coop', duration = 0) {
+export async function createGame(type, mode = 'coop', duration = 0, difficulty = null) {
     if (!verifierPseudo()) return;
     
     const nameInput = document.getElementById('player-name');
@@ -12,7 +12,7 @@ export async function createGame(type, mode = 'coop', duration = 0) {
     const res = await fetch('/rooms', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({ player_name: name, game_type: type, mode: mode, duration: duration })
+        body: JSON.stringify({ player_name: name, game_type: type, mode: mode, duration: duration, difficulty: difficulty || null })
     });
     if (!res.ok) {
         const errorData = await res.json();
@@ -1,5 +1,6 @@
 import { state } from "./state.js";
-import { showModal, addHistoryMessage } from "./ui.js";
+import { showModal, addHistoryMessage, escapeHtml } from "./ui.js";
+import { sendRoomAction } from "./websocket.js";
 
 export function handleBlitzSuccess(data) {
     initGameUI({ 
@@ -41,51 +42,10 @@ export function startTimer(endTime) {
         const diff = endTime - now;
 
         if (diff <= 0) {
+            // La fin de manche est décidée par le serveur (message game_over)
             clearInterval(state.timerInterval);
             state.timerInterval = null;
-            
             if (timerEl) timerEl.textContent = "00:00";
-
-            if (state.gameType === "duel") {
-                showModal("DUEL TERMINÉ ⚔️", `
-                    <div style="margin-bottom: 20px;">
-                        Le temps est écoulé !<br>
-                        Regardez le tableau des scores pour voir qui a la meilleure proximité.
-                    </div>
-                `);
-            } else {
-                const scoreEl = document.getElementById('score-display');
-                const score = scoreEl ? scoreEl.textContent : "0";
-
-                showModal("TEMPS ÉCOULÉ", `
-                    <div style="margin-bottom: 20px;">
-                        C'est terminé !<br>
-                        Score final : <strong style="color:var(--success); font-size:1.5rem;">${score}</strong> mots.
-                    </div>
-                `);
-            }
-
-            const actionsDiv = document.getElementById('modal-actions');
-            if (actionsDiv) {
-                actionsDiv.innerHTML = `
-                    <div style="display: flex; gap: 10px; justify-content: center;">
-                        <button id="btn-blitz-replay" class="btn">Rejouer</button>
-                        <button id="btn-hub-return" class="btn btn-outline">Retour au Hub</button>
-                    </div>
-                `;
-                
-                const btnHub = document.getElementById('btn-hub-return');
-                if(btnHub) btnHub.onclick = () => window.location.href = "/";
-                
-                const btnReplay = document.getElementById('btn-blitz-replay');
-                if(btnReplay) {
-                    btnReplay.onclick = function() {
-                        if(typeof sendResetRequest === 'function') {
-                            sendResetRequest(this);
-                        }
-                    };
-                }
-            }
         } else {
             const m = Math.floor(diff / 60);
             const s = Math.floor(diff % 60);
@@ -96,6 +56,58 @@ export function startTimer(endTime) {
     state.timerInterval = setInterval(updateTimer, 1000);
 }
 
+export function showRoundOver(data) {
+    if (state.timerInterval) {
+        clearInterval(state.timerInterval);
+        state.timerInterval = null;
+    }
+    const timerEl = document.getElementById('timer-display');
+    if (timerEl) timerEl.textContent = "00:00";
+
+    if (data.game_type === "duel") {
+        const result = data.winner
+            ? (data.winner === state.currentUser
+                ? `<strong style="color:var(--success);">Victoire !</strong> Vous avez la meilleure proximité.`
+                : `<strong>${escapeHtml(data.winner)}</strong> remporte le duel.`)
+            : "Égalité : personne ne se détache.";
+        showModal("DUEL TERMINÉ ⚔️", `
+            <div style="margin-bottom: 20px;">
+                Le temps est écoulé !<br>
+                ${result}
+            </div>
+        `);
+    } else {
+        showModal("TEMPS ÉCOULÉ", `
+            <div style="margin-bottom: 20px;">
+                C'est terminé !<br>
+                Score final : <strong style="color:var(--success); font-size:1.5rem;">${data.team_score}</strong> mots.
+            </div>
+        `);
+    }
+
+    const actionsDiv = document.getElementById('modal-actions');
+    if (actionsDiv) {
+        actionsDiv.innerHTML = `
+            <div style="display: flex; gap: 10px; justify-content: center;">
+                <button id="btn-blitz-replay" class="btn">Rejouer</button>
+                <button id="btn-hub-return" class="btn btn-outline">Retour au Hub</button>
+            </div>
+        `;
+
+        const btnHub = document.getElementById('btn-hub-return');
+        if(btnHub) btnHub.onclick = () => window.location.href = "/";
+
+        const btnReplay = document.getElementById('btn-blitz-replay');
+        if(btnReplay) {
+            btnReplay.onclick = function() {
+                if(typeof sendResetRequest === 'function') {
+                    sendResetRequest(this);
+                }
+            };
+        }
+    }
+}
+
 export function initGameUI(data) {
     state.gameType = data.game_type;
 
@@ -219,12 +231,7 @@ export async function submitIntruderGuess(word, buttonElement) {
     buttonElement.disabled = true;
 
     try {
-        const res = await fetch(`/rooms/${state.currentRoomId}/guess`, {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ word, player_name: state.currentUser })
-        });
-        const data = await res.json();
+        const { data } = await sendRoomAction("guess", { word, player_name: state.currentUser });
         
         if (data.error) {
             showModal("Oups", data.message);
@@ -319,11 +326,7 @@ export async function submitHangmanGuess(letter, btnElement) {
     btnElement.disabled = true;
 
     try {
-        await fetch(`/rooms/${state.currentRoomId}/guess`, {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ word: letter, player_name: state.currentUser })
-        });
+        await sendRoomAction("guess", { word: letter, player_name: state.currentUser });
     } catch (err) {
         console.error("Erreur réseau:", err);
         btnElement.disabled = false;
@@ -365,11 +368,7 @@ export async function sendResetRequest(btnElement) {
     btnElement.disabled = true;
     btnElement.textContent = "En attente...";
     
-    await fetch(`/rooms/${state.currentRoomId}/reset`, {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({ player_name: state.currentUser })
-    });
+    await sendRoomAction("reset", { player_name: state.currentUser });
 }
 
 export function updateResetStatus(data) {
@@ -411,19 +410,14 @@ export async function requestSurrender(vote = true) {
     if (state.roomLocked) return;
 
     try {
-        const res = await fetch(`/rooms/${state.currentRoomId}/surrender`, {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ 
-                player_name: state.currentUser,
-                vote: vote 
-            })
+        const { status, data } = await sendRoomAction("surrender", { 
+            player_name: state.currentUser,
+            vote: vote 
         });
         
-        const data = await res.json();
-        if (res.status === 429) {
+        if (status === 429) {
             showModal("Patience...", data.message);
-        } else if (res.status === 403) {
+        } else if (status === 403) {
             showModal("Impossible", data.message);
         }
         
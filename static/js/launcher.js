@@ -5,40 +5,70 @@ import { state } from "./state.js";
 
 let currentConfigType = "definition";
 
+let duelSearch = null;
+
 async function joinRandomDuel() {
+    const btn = document.getElementById('btn-random');
+    const resetButton = () => {
+        if(btn) {
+            btn.disabled = false;
+            btn.textContent = "🎲 Adversaire Aléatoire";
+        }
+    };
+
+    // Second clic pendant la recherche : on quitte la file
+    if (duelSearch) {
+        duelSearch.cancelled = true;
+        fetch(`/rooms/join_random?player_name=${encodeURIComponent(duelSearch.pseudo)}&search_token=${encodeURIComponent(duelSearch.token)}`, { method: "DELETE" });
+        duelSearch = null;
+        resetButton();
+        return;
+    }
+
     console.log("🎲 Recherche d'adversaire...");
     if (!verifierPseudo()) return;
     
     const pseudo = state.currentUser; 
-    const btn = document.getElementById('btn-random');
+    // Jeton propre à cette recherche : seul cet onglet pourra la relancer ou l'annuler
+    // (randomUUID n'existe qu'en contexte sécurisé : repli sur getRandomValues en HTTP simple)
+    const token = crypto.randomUUID
+        ? crypto.randomUUID()
+        : Array.from(crypto.getRandomValues(new Uint8Array(16)), (b) => b.toString(16).padStart(2, "0")).join("");
+    const search = duelSearch = { pseudo, token, cancelled: false };
     
     if(btn) {
-        btn.disabled = true;
-        btn.textContent = "Recherche...";
+        btn.textContent = "Recherche... (annuler)";
     }
 
     try {
-        const response = await fetch("/rooms/join_random", {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ player_name: pseudo })
-        });
-        
-        if (!response.ok) throw new Error("Erreur serveur");
-        
-        const data = await response.json();
-        
-        if (data.room_id) {
-            closeConfigModal();
-            window.location.href = `/game?room=${data.room_id}&player=${encodeURIComponent(pseudo)}`;
+        // Long polling : le serveur répond 202 tant qu'aucun adversaire n'est trouvé
+        while (!search.cancelled) {
+            const response = await fetch("/rooms/join_random", {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ player_name: pseudo, search_token: token })
+            });
+            // Annulé pendant l'attente : on ignore la réponse, même si un duel a été trouvé
+            if (search.cancelled) return;
+            
+            if (!response.ok) throw new Error("Erreur serveur");
+            if (response.status === 202) continue;
+            
+            const data = await response.json();
+            
+            if (data.room_id && !search.cancelled) {
+                duelSearch = null;
+                closeConfigModal();
+                window.location.href = `/game?room=${data.room_id}&player=${encodeURIComponent(pseudo)}`;
+            }
+            return;
         }
     } catch (e) {
         console.error(e);
+        if (search.cancelled) return;
+        duelSearch = null;
         alert("Impossible de trouver ou créer un duel.");
-        if(btn) {
-            btn.disabled = false;
-            btn.textContent = "🎲 Adversaire Aléatoire";
-        }
+        resetButton();
     }
 }
 
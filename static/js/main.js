@@ -8,7 +8,7 @@ import { copyToClipboard } from "./utils.js";
 import { initGameUI, handleDefeat, handleBlitzSuccess, updateHangmanUI, performGameReset, updateResetStatus, startTimer, sendResetRequest, requestSurrender } from "./game_logic.js";
 import { openGameConfig, openDictioConfig, submitGameConfig, toggleDurationDisplay } from "./launcher.js";
 import { checkDailyVictory, handleVictory } from "./victory.js";
-import { openWebsocket, initGameConnection } from "./websocket.js";
+import { openWebsocket, initGameConnection, sendRoomAction } from "./websocket.js";
 import { createGame } from "./api.js";
 import { openLoginModal, closeConfigModal } from "./modal.js";
 
@@ -276,12 +276,7 @@ export function initApp() {
                 elements.input.focus();
                 
                 try {
-                    const res = await fetch(`/rooms/${roomId}/guess`, {
-                        method: "POST",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify({ word, player_name: playerName })
-                    });
-                    const data = await res.json();
+                    const { data } = await sendRoomAction("guess", { word, player_name: playerName });
                     
                     if (data.error) {
                         if (data.error === "unknown_word") {
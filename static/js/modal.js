@@ -25,8 +25,12 @@ export async function openLoginModal() {
     overlay.classList.add('active');
 
     try {
-        // Appel API
-        const res = await fetch(`/users/${state.currentUser}/stats`);
+        // Appel API (le classement est servi depuis la mémoire du serveur)
+        const [res, rankRes] = await Promise.all([
+            fetch(`/users/${state.currentUser}/stats`),
+            fetch(`/leaderboards/wins/players/${encodeURIComponent(state.currentUser)}`).catch(() => null)
+        ]);
+        const rank = rankRes && rankRes.ok ? await rankRes.json() : null;
         
         let statsHtml = '';
         
@@ -61,6 +65,10 @@ export async function openLoginModal() {
                 <div style="text-align:center; font-size:0.9rem; color:var(--text-muted); font-style:italic;">
                     Victoires Pendu : ${data.hangman_wins}
                 </div>
+                ${rank && rank.rank ? `
+                <div style="text-align:center; margin-top:10px; font-weight:bold; color:var(--text-main);">
+                    🏆 Classement général : #${rank.rank} sur ${rank.total}
+                </div>` : ''}
             `;
         } else {
             statsHtml = `<p style="color:red;">Impossible de charger les statistiques.</p>`;
@@ -4,5 +4,7 @@ export const state = {
     currentMode: "coop",
     roomLocked: false,
     websocket: null,
+    lastSeq: 0,
+    roomClosed: false,
     currentUser: localStorage.getItem("arcade_user_pseudo") || "",
 };
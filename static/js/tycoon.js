@@ -1,6 +1,7 @@
 import * as THREE from 'three';
 import { OrbitControls } from 'three/addons/controls/OrbitControls.js';
 import { GLTFLoader } from 'three/addons/loaders/GLTFLoader.js';
+import { createTycoonSaver } from './tycoon_save.js';
 
 // --- CONFIGURATION DE BASE ---
 const scene = new THREE.Scene();
@@ -34,14 +35,54 @@ const controls = new OrbitControls(camera, renderer.domElement);
 controls.target.set(0, 0, 0);
 controls.update();
 
+// --- ÉTAT DE LA PARTIE (SAUVEGARDÉ) ---
+// L'état vit dans saver.data : c'est lui que l'autosauvegarde compare à la dernière version envoyée
+let saver = null;
+try {
+    saver = await createTycoonSaver();
+} catch (error) {
+    // Hors ligne ou serveur indisponible : on joue quand même, sans sauvegarde
+    console.error("Sauvegarde tycoon indisponible :", error);
+}
+export const tycoonState = saver ? saver.data : {};
+
+// Note: Les assets Kenney sont souvent petits ou à une échelle spécifique.
+// Ajuste l'échelle si nécessaire (ex: model.scale.set(1,1,1)).
+const DEFAULT_LAYOUT = [
+    // 1. Le Sol (On en met 4 pour faire une surface)
+    { file: 'floorFull.glb', x: 0, y: 0, z: 0 },
+    { file: 'floorFull.glb', x: 0, y: 0, z: 2 },
+    { file: 'floorFull.glb', x: 2, y: 0, z: 0 },
+    { file: 'floorFull.glb', x: 2, y: 0, z: 2 },
+    // 2. Meubles : lit double, table basse, lampe sur pied
+    { file: 'bedDouble.glb', x: 1, y: 0, z: 1, rotationY: Math.PI },
+    { file: 'tableCoffee.glb', x: -0.5, y: 0, z: 1 },
+    { file: 'lampRoundFloor.glb', x: -1.5, y: 0, z: 0.5 },
+];
+if (!Array.isArray(tycoonState.placed)) tycoonState.placed = structuredClone(DEFAULT_LAYOUT);
+if (typeof tycoonState.money !== 'number') tycoonState.money = 0;
+
 // --- CHARGEMENT DES MODÈLES ---
+// URLs à empreinte (?v=<hash>) fournies par le serveur : les .glb sont mis en cache sans revalidation
+let modelUrls = {};
+try {
+    const manifest = await fetch('/static-manifest/models.json');
+    if (manifest.ok) modelUrls = await manifest.json();
+} catch (error) {
+    console.error("Manifeste des modèles indisponible :", error);
+}
+
 const loader = new GLTFLoader();
 const loadingElem = document.getElementById('loading');
 let loadedCount = 0;
-const totalModelsToLoad = 4; // Nombre de modèles qu'on appelle ci-dessous
+const totalModelsToLoad = tycoonState.placed.length;
+
+function hideLoading() {
+    if (loadingElem) loadingElem.style.display = 'none';
+}
 
 function loadModel(fileName, x, y, z, rotationY = 0) {
-    const path = `/static/models/${fileName}`;
+    const path = modelUrls[`models/${fileName}`] || `/static/models/${fileName}`;
     
     loader.load(path, (gltf) => {
         const model = gltf.scene;
@@ -63,7 +104,7 @@ function loadModel(fileName, x, y, z, rotationY = 0) {
         // Gestion simple du chargement
         loadedCount++;
         if(loadedCount === totalModelsToLoad) {
-            loadingElem.style.display = 'none';
+            hideLoading();
         }
 
     }, undefined, (error) => {
@@ -71,26 +112,21 @@ function loadModel(fileName, x, y, z, rotationY = 0) {
     });
 }
 
-// --- CONSTRUCTION DE LA SCÈNE ---
-// Note: Les assets Kenney sont souvent petits ou à une échelle spécifique.
-// Ajuste l'échelle si nécessaire (ex: model.scale.set(1,1,1)).
-
-// 1. Le Sol (On en met 4 pour faire une surface)
-loadModel('floorFull.glb', 0, 0, 0);
-loadModel('floorFull.glb', 0, 0, 2);
-loadModel('floorFull.glb', 2, 0, 0);
-loadModel('floorFull.glb', 2, 0, 2);
-// Corrige le totalModelsToLoad plus haut si tu ajoutes des lignes ici.
-
-// 2. Meubles
-// Lit double
-loadModel('bedDouble.glb', 1, 0, 1, Math.PI); 
+// Pose un objet : il rejoint l'état sauvegardé et apparaît dans la scène
+export function placeModel(file, x, y, z, rotationY = 0) {
+    tycoonState.placed.push({ file, x, y, z, rotationY });
+    loadModel(file, x, y, z, rotationY);
+}
 
-// Table basse
-loadModel('tableCoffee.glb', -0.5, 0, 1);
+export function addMoney(amount) {
+    tycoonState.money += amount;
+}
 
-// Lampe sur pied
-loadModel('lampRoundFloor.glb', -1.5, 0, 0.5);
+// --- CONSTRUCTION DE LA SCÈNE ---
+if (totalModelsToLoad === 0) hideLoading();
+for (const item of tycoonState.placed) {
+    loadModel(item.file, item.x, item.y, item.z, item.rotationY || 0);
+}
 
 // --- BOUCLE D'ANIMATION ---
 function animate() {
@@ -106,4 +142,14 @@ window.addEventListener('resize', () => {
     camera.aspect = window.innerWidth / window.innerHeight;
     camera.updateProjectionMatrix();
     renderer.setSize(window.innerWidth, window.innerHeight);
-});
\ No newline at end of file
+});
+
+// --- SAUVEGARDE AUTOMATIQUE ---
+// Seules les modifications depuis la dernière sauvegarde sont envoyées
+const AUTOSAVE_INTERVAL_MS = 30000;
+
+if (saver) {
+    setInterval(() => saver.save(tycoonState).catch((error) => console.error(error)), AUTOSAVE_INTERVAL_MS);
+    // keepalive : la requête survit à la fermeture de la page
+    window.addEventListener('pagehide', () => saver.save(tycoonState, { keepalive: true }).catch(() => {}));
+}
@@ -0,0 +1,58 @@
+// Sauvegarde du tycoon : seules les différences depuis la dernière sauvegarde partent au serveur.
+
+const escapeKey = (key) => String(key).replace(/~/g, "~0").replace(/\//g, "~1");
+
+// Opérations façon JSON Patch pour passer de `before` à `after`
+export function diffSave(before, after, path = "", ops = []) {
+    const isObject = (v) => v !== null && typeof v === "object" && !Array.isArray(v);
+    if (isObject(before) && isObject(after)) {
+        for (const key of Object.keys(before)) {
+            if (!(key in after)) ops.push({ op: "remove", path: `${path}/${escapeKey(key)}` });
+        }
+        for (const [key, value] of Object.entries(after)) {
+            const childPath = `${path}/${escapeKey(key)}`;
+            if (!(key in before)) ops.push({ op: "add", path: childPath, value });
+            else diffSave(before[key], value, childPath, ops);
+        }
+    } else if (JSON.stringify(before) !== JSON.stringify(after)) {
+        // Tableaux et valeurs simples : remplacés d'un bloc
+        ops.push({ op: "replace", path, value: after });
+    }
+    return ops;
+}
+
+export async function createTycoonSaver() {
+    const token = localStorage.getItem('access_token');
+    if (!token) return null;
+    const headers = { 'Authorization': 'Bearer ' + token, 'Content-Type': 'application/json' };
+
+    const res = await fetch('/tycoon/save', { headers });
+    if (!res.ok) return null;
+    const initial = await res.json();
+
+    let version = initial.version;
+    let saved = structuredClone(initial.save_data);
+
+    const put = (body, keepalive) => fetch('/tycoon/save', { method: 'PUT', headers, body: JSON.stringify(body), keepalive });
+
+    return {
+        data: structuredClone(initial.save_data),
+
+        async save(current, { keepalive = false } = {}) {
+            const ops = diffSave(saved, current);
+            if (ops.length === 0) return true;
+            const snapshot = structuredClone(current);
+
+            let response = await put({ version, ops }, keepalive);
+            if (response.status === 409) {
+                // Sauvegardé depuis un autre onglet : on repart de sa version avec l'état complet
+                version = (await response.json()).version;
+                response = await put({ version, save_data: snapshot }, keepalive);
+            }
+            if (!response.ok) return false;
+            version = (await response.json()).version;
+            saved = snapshot;
+            return true;
+        }
+    };
+}
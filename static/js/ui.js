@@ -2,6 +2,13 @@ import { elements } from "./dom.js";
 
 let messageTimeout;
 
+// Pour insérer un texte venu du serveur (pseudo...) dans le HTML passé à showModal
+export function escapeHtml(text) {
+    const div = document.createElement("div");
+    div.textContent = String(text);
+    return div.innerHTML;
+}
+
 export function addHistoryMessage(text, duration = 0) {
     if (!elements.messages) return;
     if (messageTimeout) clearTimeout(messageTimeout);
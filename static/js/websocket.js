@@ -2,8 +2,9 @@ import { state } from "./state.js";
 import { addEntry, renderHistory, renderScoreboard, triggerConfetti, updateRoomStatus } from "./rendering.js";
 import { addHistoryMessage, setRoomInfo, showModal } from "./ui.js";
 import { addChatMessage } from "./chat_ui.js";
-import { handleSurrenderVote, handleSurrenderCancel, handleSurrenderSuccess, initGameUI, performGameReset, updateHangmanUI, startTimer, updateMusicContext, handleDefeat, handleBlitzSuccess, updateResetStatus } from "./game_logic.js";
+import { handleSurrenderVote, handleSurrenderCancel, handleSurrenderSuccess, initGameUI, performGameReset, updateHangmanUI, startTimer, updateMusicContext, handleDefeat, handleBlitzSuccess, updateResetStatus, showRoundOver } from "./game_logic.js";
 import { handleVictory } from "./victory.js";
+import { BINARY_SUBPROTOCOL, createBinaryDecoder } from "./binary_protocol.js";
 
 export function openWebsocket(playerName) {
     if (!state.currentRoomId) return;
@@ -68,6 +69,12 @@ export function openWebsocket(playerName) {
                 triggerConfetti();
                 updateRoomStatus();
                 break;
+            case "game_over":
+                state.roomLocked = true;
+                if (data.scoreboard) renderScoreboard(data.scoreboard);
+                showRoundOver(data);
+                break;
+
             case "chat_message":
                 addChatMessage(data.player_name, data.content);
                 break;
@@ -87,35 +94,102 @@ export function openWebsocket(playerName) {
     };
 }
 
-export function initGameConnection(roomId, playerName) {
+const pendingActions = new Map();
+let nextRequestId = 1;
+
+// Envoie guess / reset / surrender sur la WebSocket de la room et attend l'accusé de réception.
+// Si la socket n'est pas ouverte, on passe par l'API HTTP classique.
+export function sendRoomAction(action, payload) {
+    const ws = state.websocket;
+    if (!ws || ws.readyState !== WebSocket.OPEN) {
+        return fetch(`/rooms/${state.currentRoomId}/${action}`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(payload)
+        }).then(async res => ({ status: res.status, data: await res.json() }));
+    }
+
+    const requestId = `r${nextRequestId++}`;
+    return new Promise((resolve, reject) => {
+        const timer = setTimeout(() => {
+            pendingActions.delete(requestId);
+            reject(new Error(`Pas de réponse du serveur pour ${action}`));
+        }, 10000);
+        pendingActions.set(requestId, { resolve, timer });
+        ws.send(JSON.stringify({ ...payload, type: action, request_id: requestId }));
+    });
+}
+
+export function initGameConnection(roomId, playerName, since = null) {
     state.currentRoomId = roomId;
     if(document.getElementById("display-room-id")) {
         document.getElementById("display-room-id").textContent = roomId;
     }
 
-    setRoomInfo(`Connexion à la Room ${roomId}...`);
+    if (since === null) setRoomInfo(`Connexion à la Room ${roomId}...`);
 
     const protocol = window.location.protocol === "https:" ? "wss" : "ws";
-    const wsUrl = `${protocol}://${window.location.host}/rooms/${roomId}/ws?player_name=${encodeURIComponent(playerName)}`;
+    // batch=1 : le serveur regroupe les événements d'un même instant dans une seule trame
+    let wsUrl = `${protocol}://${window.location.host}/rooms/${roomId}/ws?player_name=${encodeURIComponent(playerName)}&batch=1`;
+    // Reconnexion : le serveur ne renvoie que les événements manqués
+    if (since !== null) wsUrl += `&since=${since}`;
 
     if (state.websocket) {
+        state.websocket.onclose = null;
         state.websocket.close();
     }
 
-    const ws = new WebSocket(wsUrl);
+    // Protocole binaire compact (MessagePack) dans l'appli Android ou sur demande ; JSON par défaut.
+    // Si le serveur ne le propose pas, il répond simplement en JSON.
+    const useBinary = !!window.Capacitor || localStorage.getItem("ws_binary") === "1";
+    const ws = useBinary ? new WebSocket(wsUrl, [BINARY_SUBPROTOCOL]) : new WebSocket(wsUrl);
+    ws.binaryType = "arraybuffer";
+    const decodeBinary = createBinaryDecoder();
     state.websocket = ws; 
 
-    ws.onopen = () => { console.log("WS Connecté"); };
+    ws.onopen = () => {
+        console.log("WS Connecté");
+        state.reconnectDelay = 1000;
+    };
     
     ws.onmessage = (event) => {
-        const data = JSON.parse(event.data);
+        const data = typeof event.data === "string" ? JSON.parse(event.data) : decodeBinary(event.data);
+        if (data.type === "batch") {
+            (data.events || []).forEach(handleRoomEvent);
+        } else {
+            handleRoomEvent(data);
+        }
+    };
 
+    function handleRoomEvent(data) {
         if (data.error) {
+            state.roomClosed = true;
             showModal("Erreur", data.message || "Erreur inconnue");
             return;
         }
 
+        // Les événements déjà reçus avant la coupure sont ignorés
+        if (data.seq !== undefined) {
+            if (data.type !== "state_sync" && data.type !== "state_resume" && data.seq <= state.lastSeq) return;
+            state.lastSeq = data.seq;
+        }
+
         switch (data.type) {
+            case "ping":
+                // Heartbeat serveur : sans réponse, la connexion est considérée comme morte
+                if (ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify({ type: "pong" }));
+                return;
+
+            case "ack": {
+                const pending = pendingActions.get(data.request_id);
+                if (pending) {
+                    clearTimeout(pending.timer);
+                    pendingActions.delete(data.request_id);
+                    pending.resolve({ status: data.status, data: data.result });
+                }
+                return;
+            }
+
             case "state_sync":
                 initGameUI(data);
                 renderHistory(data.history || []);
@@ -129,6 +203,7 @@ export function initGameConnection(roomId, playerName) {
                 setRoomInfo(`${roomId} • ${data.mode === 'race' ? 'Course' : 'Coop'}`); 
 
                 if (data.history && Array.isArray(data.history)) {
+                    state.pendingHistory = data.history_complete === false ? [...data.history] : null;
                     state.entries = data.history.map(entry => ({
                         ...entry,
                         temp: entry.temperature
@@ -141,6 +216,31 @@ export function initGameConnection(roomId, playerName) {
                 }
                 break;
 
+            case "history_chunk":
+                // Synchro complète d'un long historique, envoyée en plusieurs morceaux
+                if (!state.pendingHistory) break;
+                state.pendingHistory.push(...(data.entries || []));
+                if (data.last) {
+                    state.entries = state.pendingHistory.map(entry => ({
+                        ...entry,
+                        temp: entry.temperature
+                    })).reverse();
+                    state.pendingHistory = null;
+                    renderHistory();
+                }
+                break;
+
+            case "state_resume":
+                renderScoreboard(data.scoreboard || []);
+                state.currentMode = data.mode;
+                state.roomLocked = data.locked;
+                setRoomInfo(`${roomId} • ${data.mode === 'race' ? 'Course' : 'Coop'}`);
+                break;
+
+            case "room_destroyed":
+                state.roomClosed = true;
+                break;
+
             case "game_start":
                 addHistoryMessage("🔔 " + data.message);
                 if (data.end_time) {
@@ -180,6 +280,12 @@ export function initGameConnection(roomId, playerName) {
                 handleVictory(data.winner, state.scoreboard || []);
                 break;
 
+            case "game_over":
+                state.roomLocked = true;
+                if (data.scoreboard) renderScoreboard(data.scoreboard);
+                showRoundOver(data);
+                break;
+
             case "chat_message":
                 addChatMessage(data.player_name, data.content);
                 break;
@@ -205,7 +311,15 @@ export function initGameConnection(roomId, playerName) {
         }
 
         if (data.blitz_success) handleBlitzSuccess(data);
-    };
+    }
 
-    ws.onclose = () => { setRoomInfo("Déconnecté"); };
+    ws.onclose = () => {
+        setRoomInfo("Déconnecté");
+        if (state.roomClosed || state.currentRoomId !== roomId) return;
+
+        // Reconnexion automatique avec reprise à partir du dernier événement reçu
+        const delay = state.reconnectDelay || 1000;
+        state.reconnectDelay = Math.min(delay * 2, 15000);
+        setTimeout(() => initGameConnection(roomId, playerName, state.lastSeq), delay);
+    };
 }
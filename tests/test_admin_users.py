@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app as app_module
+from core.auth import Principal
+from core.database import Base, get_db
+from core.models import User
+
+pytest.importorskip("aiosqlite")
+
+USERNAMES = ["alice", "al_bert", "alfred", "bob", "carol", "dave", "eve"]
+
+
+@pytest.fixture
+def admin_client(tmp_path, monkeypatch):
+    # Base SQLite jetable ; NullPool : une connexion neuve par boucle (test et TestClient)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}", poolclass=NullPool)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with sessions() as session:
+            session.add_all(User(username=name, hashed_password="x") for name in USERNAMES)
+            await session.commit()
+
+    asyncio.run(seed())
+
+    async def override_db():
+        async with sessions() as session:
+            yield session
+
+    monkeypatch.setattr(app_module, "AsyncSessionLocal", sessions)
+    app_module.app.dependency_overrides[get_db] = override_db
+    app_module.app.dependency_overrides[app_module.get_current_admin_user] = lambda: Principal(1, "alice", True)
+    yield TestClient(app_module.app)
+    app_module.app.dependency_overrides.clear()
+    asyncio.run(engine.dispose())
+
+
+def test_keyset_pages_cover_every_user_once(admin_client, monkeypatch):
+    monkeypatch.setattr(app_module, "ADMIN_USERS_MAX_LIMIT", 3)
+    seen, after, pages = [], 0, 0
+    while after is not None:
+        # Limite demandée au-delà du plafond : ramenée à ADMIN_USERS_MAX_LIMIT
+        body = admin_client.get("/admin/users", params={"after": after, "limit": 100}).json()
+        assert len(body["users"]) <= 3
+        seen.extend(user["username"] for user in body["users"])
+        after, pages = body["next_cursor"], pages + 1
+    assert seen == USERNAMES
+    assert pages == 3
+    assert all("hashed_password" not in user for user in body["users"])
+
+    # "_" est pris littéralement, pas comme joker LIKE
+    prefixed = admin_client.get("/admin/users", params={"prefix": "al_"}).json()
+    assert [user["username"] for user in prefixed["users"]] == ["al_bert"]
+
+
+def test_export_streams_one_json_object_per_line(admin_client, monkeypatch):
+    monkeypatch.setattr(app_module, "ADMIN_EXPORT_PAGE_SIZE", 2)
+    response = admin_client.get("/admin/users/export")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert [json.loads(line)["username"] for line in lines] == USERNAMES
+
+    prefixed = admin_client.get("/admin/users/export", params={"prefix": "al"}).text.splitlines()
+    assert [json.loads(line)["username"] for line in prefixed] == ["alice", "al_bert", "alfred"]
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.auth import HasherOverloaded, PasswordHasher, Principal, PrincipalCache
+
+
+def test_principal_cache_ttl_and_invalidation():
+    cache = PrincipalCache(ttl=60, max_size=2)
+    alice = Principal(id=1, username="alice", is_admin=True)
+    bob = Principal(id=2, username="bob", is_admin=False)
+
+    cache.put("token-a1", alice)
+    cache.put("token-a2", alice)
+    assert cache.get("token-a1") == alice
+
+    # Taille maximale : le plus ancien jeton sort du cache
+    cache.put("token-b", bob)
+    assert cache.get("token-a1") is None
+    assert cache.get("token-b") == bob
+
+    cache.invalidate_user("alice")
+    assert cache.get("token-a2") is None
+    assert cache.get("token-b") == bob
+
+    # Un jeton expiré n'est pas mis en cache
+    cache.put("token-old", bob, token_exp=time.time() - 1)
+    assert cache.get("token-old") is None
+
+
+def test_password_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(hasher._run("hash", release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(HasherOverloaded):
+            await hasher._run("hash", lambda: None)
+        release.set()
+        await blocked
+        assert hasher.pending == 0
+
+    asyncio.run(scenario())
+    hasher.shutdown()
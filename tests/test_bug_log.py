@@ -0,0 +1,52 @@
+import asyncio
+
+from core.bug_log import BugLogStore
+
+
+def test_bug_log_tail_filters_and_rotation(tmp_path):
+    store = BugLogStore(tmp_path / "bugs.jsonl", max_bytes=600, backups=2, flush_delay=0)
+
+    async def scenario():
+        for i in range(12):
+            store.append("alice" if i % 3 == 0 else "bob", "hub" if i % 2 else "game", f"bug {i}")
+            if i % 4 == 3:
+                await store.flush()
+        # Rapport encore en mémoire : visible avant même l'écriture disque
+        store.append("alice", "hub", "bug 12")
+
+        last = await store.tail(3)
+        assert [r["description"] for r in last] == ["bug 10", "bug 11", "bug 12"]
+
+        alice = await store.tail(10, player_name="alice")
+        assert [r["description"] for r in alice] == ["bug 0", "bug 3", "bug 6", "bug 9", "bug 12"]
+
+        alice_game = await store.tail(10, player_name="alice", context="game")
+        assert [r["description"] for r in alice_game] == ["bug 0", "bug 6"]
+        await store.stop()
+
+    asyncio.run(scenario())
+    assert (tmp_path / "bugs.jsonl.1").exists()
+
+
+def test_legacy_log_is_imported_once(tmp_path):
+    legacy = tmp_path / "bugs.log"
+    legacy.write_text(
+        "[2025-12-02 18:34:52] User: Alexi | Context: Hub Principal | Bug: écran noir\n"
+        "sur deux lignes\n"
+        "[2025-12-03 09:00:00] User: bob | Context: game | Bug: pas de son\n",
+        encoding="utf-8",
+    )
+    store = BugLogStore(tmp_path / "bugs.jsonl", flush_delay=0)
+
+    async def scenario():
+        store.append("carol", "hub", "nouveau")
+        await store.flush()
+        assert store.import_legacy(legacy) == 2
+        assert store.import_legacy(legacy) == 0
+        return await store.tail(10), await store.tail(10, player_name="Alexi")
+
+    everything, alexi = asyncio.run(scenario())
+    # Les anciens rapports passent avant ceux déjà écrits au nouveau format
+    assert [r["player_name"] for r in everything] == ["Alexi", "bob", "carol"]
+    assert alexi[0]["description"] == "écran noir\nsur deux lignes"
+    assert (tmp_path / "bugs.log.imported").exists()
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import pytest
+
+from core import binary_protocol
+from core.connections import ClientConnection, RoomConnectionManager
+
+msgpack = binary_protocol.msgpack
+
+
+class FakeWebSocket:
+    def __init__(self, stalled=False):
+        self.stalled = stalled
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self, subprotocol=None):
+        self.subprotocol = subprotocol
+
+    async def send_text(self, frame):
+        if self.stalled:
+            # Client à moitié mort : l'envoi ne se termine jamais
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(frame))
+
+    async def send_bytes(self, frame):
+        self.sent.append(msgpack.unpackb(frame, strict_map_key=False))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_slow_client_does_not_delay_others_and_gets_evicted():
+    async def scenario():
+        manager = RoomConnectionManager(max_queue=2)
+        fast_ws, slow_ws = FakeWebSocket(), FakeWebSocket(stalled=True)
+        await manager.connect("room", fast_ws)
+        slow = await manager.connect("room", slow_ws)
+
+        for i in range(5):
+            await asyncio.wait_for(manager.broadcast("room", {"n": i}), timeout=0.1)
+        await asyncio.sleep(0.01)
+
+        assert [m["n"] for m in fast_ws.sent] == [0, 1, 2, 3, 4]
+        assert slow.closed
+        assert slow_ws.closed_with == 1013
+        assert [c.websocket for c in manager.active_connections["room"]] == [fast_ws]
+
+    asyncio.run(scenario())
+
+
+def test_events_of_the_same_tick_are_coalesced_for_opted_in_clients():
+    async def scenario():
+        manager = RoomConnectionManager()
+        legacy_ws, batch_ws = FakeWebSocket(), FakeWebSocket()
+        await manager.connect("room", legacy_ws)
+        await manager.connect("room", batch_ws, batching=True)
+
+        for event_type in ("guess", "scoreboard_update", "victory"):
+            await manager.broadcast("room", {"type": event_type})
+        await asyncio.sleep(0.01)
+
+        assert [m["type"] for m in legacy_ws.sent] == ["guess", "scoreboard_update", "victory"]
+        assert len(batch_ws.sent) == 1
+        assert batch_ws.sent[0]["type"] == "batch"
+        assert [e["type"] for e in batch_ws.sent[0]["events"]] == ["guess", "scoreboard_update", "victory"]
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.skipif(msgpack is None, reason="msgpack non installé")
+def test_binary_clients_get_compact_frames_with_interned_strings():
+    async def scenario():
+        manager = RoomConnectionManager()
+        ws = FakeWebSocket()
+        await manager.connect("room", ws, batching=True, binary=True)
+        assert ws.subprotocol == binary_protocol.SUBPROTOCOL
+
+        await manager.broadcast("room", {"type": "guess", "word": "chat", "player_name": "Alice", "temperature": 42.5})
+        await manager.broadcast("room", {"type": "guess", "word": "chien", "player_name": "Alice", "temperature": 50.0})
+        await asyncio.sleep(0.01)
+
+        schema, batch = ws.sent
+        assert schema["type"] == "schema"
+        keys = schema["keys"]
+        batch = {keys[k]: v for k, v in batch.items()}
+        assert batch["type"] == "batch"
+
+        strings = {}
+        decoded = []
+        for event in batch["events"]:
+            strings.update(event.pop(binary_protocol.STRINGS_KEY, {}))
+            event = {keys[k]: v for k, v in event.items()}
+            decoded.append({k: strings[v] if k in binary_protocol.INTERNED_KEYS else v for k, v in event.items()})
+
+        assert decoded == [
+            {"type": "guess", "word": "chat", "player_name": "Alice", "temperature": 42.5},
+            {"type": "guess", "word": "chien", "player_name": "Alice", "temperature": 50.0},
+        ]
+        # "Alice" et "guess" ne sont définis qu'une fois
+        assert sorted(strings.values()) == ["Alice", "chat", "chien", "guess"]
+
+    asyncio.run(scenario())
+
+
+def test_heartbeat_evicts_silent_clients_and_pings_the_others():
+    async def scenario():
+        evicted = []
+        manager = RoomConnectionManager(heartbeat_interval=0, heartbeat_timeout=30, on_evict=evicted.append)
+        alive_ws, ghost_ws = FakeWebSocket(), FakeWebSocket()
+        await manager.connect("room", alive_ws, player_name="Alice")
+        ghost = await manager.connect("room", ghost_ws, player_name="Bob")
+        ghost.last_seen -= 60
+
+        manager.heartbeat_tick()
+        await asyncio.sleep(0.01)
+
+        assert [c.player_name for c in evicted] == ["Bob"]
+        assert manager.player_connected("room", "Alice")
+        assert not manager.player_connected("room", "Bob")
+        assert [m["type"] for m in alive_ws.sent] == ["ping"]
+        assert ghost_ws.sent == []
+
+    asyncio.run(scenario())
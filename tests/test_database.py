@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+from core.database import PoolWaitTimer, db_pool_wait, db_query_errors, db_query_seconds, instrument_engine
+
+
+class TimedQueuePool(PoolWaitTimer, QueuePool):
+    pass
+
+
+def test_pool_wait_and_queries_are_recorded():
+    # Moteur SQLite synchrone : mêmes écouteurs et même mixin de pool que le moteur asyncpg
+    engine = create_engine("sqlite://", poolclass=TimedQueuePool)
+    instrument_engine(engine)
+    waits = db_pool_wait.count()
+    selects = db_query_seconds.count(statement="SELECT users")
+    errors = db_query_errors.value(statement="SELECT missing")
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("SELECT id FROM users"))
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT id FROM missing"))
+
+    assert db_pool_wait.count() == waits + 1
+    assert db_query_seconds.count(statement="SELECT users") == selects + 1
+    assert db_query_errors.value(statement="SELECT missing") == errors + 1
@@ -0,0 +1,37 @@
+import random
+
+import numpy as np
+
+from core.difficulty import DifficultyTable, build_table, load_tables
+from core.games import HangmanEngine
+from core.puzzle_packs import save_pack
+
+
+class FakeModel:
+    def __init__(self, words):
+        self.key_to_index = {word: index for index, word in enumerate(words)}
+
+
+def test_difficulty_table_levels_and_sampling(tmp_path):
+    words = ["maison", "soleil", "chapeau", "girafe", "brindille", "quiproquo"]
+    # Mots fréquents au voisinage dense = faciles ; rares et isolés = difficiles
+    records = build_table(
+        words,
+        ranks=np.array([0, 1, 2, 3, 4, 5]),
+        dense_05=np.array([90, 80, 40, 30, 5, 1]),
+        dense_03=np.array([900, 800, 400, 300, 50, 10]),
+    )
+    save_pack(tmp_path / "hangman.npy", records)
+    table = load_tables(tmp_path)["hangman"]
+    assert isinstance(table, DifficultyTable)
+    assert table.bounds == {"easy": (0, 2), "medium": (2, 4), "hard": (4, 6)}
+
+    rng = random.Random(0)
+    assert {table.sample("easy", rng=rng) for _ in range(20)} == {"maison", "soleil"}
+    assert {table.sample("hard", rng=rng) for _ in range(20)} == {"brindille", "quiproquo"}
+    # Mots absents du modèle chargé : pas de tirage possible
+    assert table.sample("hard", FakeModel(["maison"])) is None
+
+    engine = HangmanEngine(FakeModel(words), targets=table, difficulty="medium")
+    engine.new_game()
+    assert engine.target_word in ("chapeau", "girafe")
@@ -0,0 +1,32 @@
+import numpy as np
+
+from core.embeddings import load_word2vec_binary
+
+
+def write_word2vec(path, words, vectors):
+    with open(path, "wb") as f:
+        f.write(f"{len(words)} {vectors.shape[1]}\n".encode())
+        for word, vector in zip(words, vectors):
+            f.write(word.encode("utf-8") + b" " + vector.astype("<f4").tobytes() + b"\n")
+
+
+def test_word2vec_binary_reader(tmp_path, monkeypatch):
+    monkeypatch.setattr("core.embeddings.READ_CHUNK_SIZE", 7)
+    words = ["chat", "chien", "été", "voiture"]
+    vectors = np.array([[1, 0, 0], [0.9, 0.1, 0], [0, 1, 0], [0, 0, 2]], dtype=np.float32)
+    path = tmp_path / "model.bin"
+    write_word2vec(path, words, vectors)
+
+    model = load_word2vec_binary(str(path))
+    assert model.index_to_key == words
+    assert "été" in model.key_to_index
+    # Effectifs fictifs décroissants, comme KeyedVectors.load_word2vec_format
+    assert model.get_vecattr("chat", "count") == 4
+    assert model.get_vecattr("voiture", "count") == 1
+    assert abs(float(model.similarity("voiture", "voiture")) - 1.0) < 1e-6
+    expected = np.dot(vectors[0], vectors[1]) / (np.linalg.norm(vectors[0]) * np.linalg.norm(vectors[1]))
+    assert abs(float(model.similarity("chat", "chien")) - expected) < 1e-6
+    assert [word for word, _ in model.most_similar("chat", topn=2)] == ["chien", "été"]
+
+    limited = load_word2vec_binary(str(path), limit=2)
+    assert limited.index_to_key == ["chat", "chien"]
@@ -0,0 +1,61 @@
+import asyncio
+import random
+import threading
+
+from core.executor import EngineExecutor
+from core.games import CemantixEngine
+
+
+class FakeEngine:
+    def __init__(self):
+        self.threads = []
+
+    def new_game(self, custom_seed=None):
+        self.threads.append((threading.current_thread().name, custom_seed))
+
+    def next_word(self):
+        self.threads.append((threading.current_thread().name, None))
+
+
+def test_engine_executor_runs_off_loop():
+    async def scenario():
+        engine = FakeEngine()
+        executor = EngineExecutor("thread", workers=1)
+        await executor.new_game(engine, custom_seed="2024-01-01")
+        await executor.next_word(engine)
+        executor.shutdown()
+
+        inline = EngineExecutor("inline")
+        await inline.next_word(engine)
+        return engine.threads
+
+    threads = asyncio.run(scenario())
+    assert threads[0][0].startswith("engine") and threads[0][1] == "2024-01-01"
+    assert threads[1][0].startswith("engine")
+    assert threads[2][0] == threading.main_thread().name
+
+
+class FakeModel:
+    def __init__(self):
+        self.key_to_index = {f"mot{a}{b}": index for index, (a, b) in enumerate(
+            (a, b) for a in "abcdefghij" for b in "abcdefghij")}
+
+    def get_vecattr(self, word, attr):
+        return 60000
+
+
+def test_concurrent_daily_draws_are_deterministic():
+    async def scenario():
+        executor = EngineExecutor("thread", workers=4)
+        engines = [CemantixEngine(FakeModel()) for _ in range(16)]
+        await asyncio.gather(*(executor.new_game(engine, custom_seed="2024-01-01") for engine in engines))
+        executor.shutdown()
+        return {engine.target_word for engine in engines}
+
+    random.seed(7)
+    state = random.getstate()
+    expected = CemantixEngine(FakeModel())
+    expected.new_game(custom_seed="2024-01-01")
+    assert asyncio.run(scenario()) == {expected.target_word}
+    # Le générateur global des autres rooms n'est ni réinitialisé ni consommé
+    assert random.getstate() == state
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from core import metrics
+from core.games import DefinitionEngine, HangmanEngine, IntruderEngine, engine_new_game_seconds, wiktionary_failures
+
+
+class FakeModel:
+    def __init__(self):
+        self.key_to_index = {"maison": 0, "bateau": 1}
+
+    def get_vecattr(self, word, attr):
+        return 60000
+
+
+def test_engine_draws_and_wiktionary_failures_are_counted():
+    before = engine_new_game_seconds.count(engine="HangmanEngine")
+    engine = HangmanEngine(FakeModel())
+    engine.new_game()
+    engine.next_word()
+    assert engine_new_game_seconds.count(engine="HangmanEngine") == before + 2
+    # Le nom de la méthode est conservé malgré le chronométrage
+    assert HangmanEngine.new_game.__name__ == "new_game"
+
+    failures = wiktionary_failures.value(reason="network")
+    with patch("core.games.requests.get", side_effect=OSError("hors ligne")):
+        assert DefinitionEngine(FakeModel())._wiktionary_exists("maison") is False
+    assert wiktionary_failures.value(reason="network") == failures + 1
+
+    rendered = metrics.REGISTRY.render()
+    assert 'engine_new_game_seconds_count{engine="HangmanEngine"}' in rendered
+
+
+def test_draw_that_retries_itself_is_timed_once():
+    class RetryingIntruder(IntruderEngine):
+        def new_game(self):
+            # Premier tirage raté : le moteur se relance, comme un repli sans candidat
+            self.attempts += 1
+            if self.attempts < 3:
+                return self.new_game()
+
+    engine = RetryingIntruder(FakeModel())
+    engine.attempts = 0
+    before = engine_new_game_seconds.count(engine="RetryingIntruder")
+    engine.new_game()
+    assert engine.attempts == 3
+    assert engine_new_game_seconds.count(engine="RetryingIntruder") == before + 1
+    # Le drapeau retombe : le tirage suivant est de nouveau mesuré
+    engine.next_word()
+    assert engine_new_game_seconds.count(engine="RetryingIntruder") == before + 2
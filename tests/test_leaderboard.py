@@ -0,0 +1,83 @@
+import asyncio
+import random
+
+from core.leaderboard import LeaderboardService, Ranking
+
+
+def test_leaderboard_incremental_ranking():
+    board = LeaderboardService()
+    board.add_user("alice", {"cemantix_wins": 3})
+    board.add_user("bob", {"hangman_wins": 3, "daily_challenges_validated": 1})
+    board.add_user("carol")
+
+    top = board.top("wins", 10)
+    assert [(e["rank"], e["player_name"], e["score"]) for e in top["entries"]] == [(1, "alice", 3), (1, "bob", 3)]
+    etag = board.etag("wins")
+
+    # Un invité (compte inconnu) ne change rien
+    board.increment("guest", cemantix_wins=1)
+    assert board.etag("wins") == etag
+
+    board.increment("carol", cemantix_wins=5)
+    assert board.etag("wins") != etag
+    assert board.player_rank("wins", "carol")["rank"] == 1
+    assert board.player_rank("wins", "bob")["rank"] == 2
+    assert board.player_rank("cemantix", "bob")["rank"] is None
+    assert board.top("daily", 10)["entries"] == [{"rank": 1, "player_name": "bob", "score": 1}]
+
+    board.remove_user("carol")
+    assert board.player_rank("wins", "alice")["rank"] == 1
+    assert board.top("wins", 1)["total"] == 2
+
+
+def test_ranking_matches_sorted_order_and_grows():
+    ranking = Ranking(capacity=4)
+    rng = random.Random(3)
+    scores = {}
+    for _ in range(500):
+        name = f"p{rng.randrange(40)}"
+        # Scores au-delà de la capacité initiale : l'arbre s'agrandit
+        scores[name] = rng.randrange(0, 30)
+        ranking.set(name, scores[name])
+
+    ranked = sorted((-score, name) for name, score in scores.items() if score > 0)
+    expected = [(name, -negative) for negative, name in ranked]
+    assert [(e["player_name"], e["score"]) for e in ranking.top(15)] == expected[:15]
+    assert len(ranking) == len(ranked)
+    for name, score in expected:
+        assert ranking.rank(name) == 1 + sum(1 for _, other in expected if other > score)
+
+
+class FakeResult:
+    def __init__(self, names):
+        self.names = names
+
+    def scalars(self):
+        return iter(self.names)
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        # Seul "dora" a un compte (sans victoire au démarrage, donc non chargé)
+        return FakeResult(["dora"])
+
+
+def test_unloaded_accounts_are_resolved_on_first_win():
+    board = LeaderboardService(session_factory=FakeSession)
+
+    async def scenario():
+        board.increment("dora", cemantix_wins=1)
+        board.increment("guest", cemantix_wins=1)
+        board.increment("dora", hangman_wins=1)
+        await board.resolver_task
+
+    asyncio.run(scenario())
+    assert board.player_rank("wins", "dora")["score"] == 2
+    assert board.player_rank("wins", "guest")["rank"] is None
+    assert "guest" in board.guests
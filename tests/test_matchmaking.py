@@ -0,0 +1,93 @@
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from core.matchmaking import Matchmaker, TicketConflict, _Ticket, skill_bucket
+
+
+def test_matchmaker_pairs_by_skill_and_widens():
+    async def scenario():
+        created = []
+
+        async def create_match(players):
+            created.append(players)
+            return {"room_id": f"room{len(created)}", "mode": "blitz", "game_type": "duel"}
+
+        matchmaker = Matchmaker(create_match, poll_timeout=1.0, batch_interval=0, widen_after=60)
+        # Deux débutants et un joueur confirmé arrivent en même temps
+        results = asyncio.gather(
+            matchmaker.join("alice", 0),
+            matchmaker.join("bob", 0),
+            matchmaker.join("carol", 12),
+        )
+        await asyncio.sleep(0.05)
+        assert created == [["alice", "bob"]]
+        assert list(matchmaker.tickets) == ["carol"]
+
+        # Seule à son niveau depuis longtemps : elle affronte le niveau voisin
+        matchmaker.widen_after = 0
+        dave = asyncio.ensure_future(matchmaker.join("dave", 3))
+        alice, bob, carol = await results
+        assert alice == {"room_id": "room1", "mode": "blitz", "game_type": "duel", "is_new": True}
+        assert bob["room_id"] == "room1" and not bob["is_new"]
+        assert carol["room_id"] == (await dave)["room_id"] == "room2"
+        assert matchmaker.tickets == {} and matchmaker.queues == {}
+        await matchmaker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_matchmaker_poll_timeout_keeps_place_and_leave():
+    async def scenario():
+        async def create_match(players):
+            raise AssertionError("aucune paire attendue")
+
+        matchmaker = Matchmaker(create_match, poll_timeout=0.01, batch_interval=0)
+        assert await matchmaker.join("alice") is None
+        # La place en file est gardée entre deux requêtes
+        assert "alice" in matchmaker.tickets
+        assert matchmaker.leave("alice")
+        assert matchmaker.tickets == {} and matchmaker.queues == {}
+        await matchmaker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_matchmaker_widens_one_level_per_wait_step():
+    async def scenario():
+        matchmaker = Matchmaker(None, batch_interval=0, widen_after=10)
+        matchmaker._ensure_running()
+        for name, wins in (("alice", 0), ("bob", 3), ("zoe", 500)):
+            ticket = _Ticket(name, None, skill_bucket(wins), 0.0)
+            matchmaker.tickets[name] = ticket
+            matchmaker.queues.setdefault(ticket.bucket, OrderedDict())[name] = ticket
+
+        # Niveaux 0 et 2 : il faut deux tranches d'attente, le débutant n'affronte jamais 500 victoires
+        assert matchmaker.pair(15.0) == []
+        pairs = matchmaker.pair(25.0)
+        assert [(a.player_name, b.player_name) for a, b in pairs] == [("alice", "bob")]
+        assert list(matchmaker.queues) == [skill_bucket(500)]
+        await matchmaker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_matchmaker_search_token_guards_retry_and_cancel():
+    async def scenario():
+        async def create_match(players):
+            raise AssertionError("aucune paire attendue")
+
+        matchmaker = Matchmaker(create_match, poll_timeout=0.01, batch_interval=0)
+        assert await matchmaker.join("alice", 0, "jeton-a") is None
+        # Un autre appelant ne peut ni reprendre ni annuler la recherche d'alice
+        with pytest.raises(TicketConflict):
+            await matchmaker.join("alice", 0, "jeton-b")
+        assert not matchmaker.leave("alice", "jeton-b")
+        assert not matchmaker.leave("alice")
+        assert await matchmaker.join("alice", 0, "jeton-a") is None
+        assert matchmaker.leave("alice", "jeton-a")
+        assert matchmaker.tickets == {}
+        await matchmaker.stop()
+
+    asyncio.run(scenario())
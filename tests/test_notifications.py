@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import httpx
+
+from core.notifications import WebhookDispatcher
+
+
+def test_dispatcher_batches_and_retries_on_rate_limit():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        if len(requests) == 1:
+            return httpx.Response(429, json={"retry_after": 0.01})
+        return httpx.Response(204)
+
+    dispatcher = WebhookDispatcher("https://discord.test/webhook", content="bugs", batch_delay=0.05,
+                                   transport=httpx.MockTransport(handler))
+
+    async def scenario():
+        for i in range(3):
+            assert dispatcher.notify({"title": f"bug {i}"})
+        await asyncio.sleep(0.2)
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+    # Un seul message pour les trois rapports, renvoyé après le 429
+    assert len(requests) == 2
+    assert requests[0] == requests[1]
+    assert [embed["title"] for embed in requests[1]["embeds"]] == ["bug 0", "bug 1", "bug 2"]
+
+
+def test_dispatcher_without_url_is_disabled():
+    dispatcher = WebhookDispatcher(None)
+    assert dispatcher.notify({"title": "ignored"}) is False
+
+
+def test_stop_during_batch_delay_sends_dequeued_embed():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(204)
+
+    dispatcher = WebhookDispatcher("https://discord.test/webhook", batch_delay=10,
+                                   transport=httpx.MockTransport(handler))
+
+    async def scenario():
+        assert dispatcher.notify({"title": "bug 0"})
+        # Le worker a sorti l'embed de la file et attend la fin du délai de regroupement
+        await asyncio.sleep(0.05)
+        assert dispatcher.queue.empty()
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+    assert [embed["title"] for embed in requests[0]["embeds"]] == ["bug 0"]
@@ -0,0 +1,49 @@
+import numpy as np
+
+from core.games import DuelEngine, IntruderEngine
+from core.puzzle_packs import duel_dtype, intruder_dtype, load_packs, save_pack
+
+
+class FakeModel:
+    def __init__(self, words):
+        self.key_to_index = {word: index for index, word in enumerate(words)}
+
+
+def test_engines_sample_from_memory_mapped_packs(tmp_path):
+    intruders = np.zeros(2, dtype=intruder_dtype(8))
+    intruders[0] = ("soleil", ["lune", "ciel", "astre"], "valise", 0.6, 0.25)
+    # Mot absent du modèle : ce puzzle ne doit jamais être tiré
+    intruders[1] = ("inconnu", ["lune", "ciel", "astre"], "valise", 0.6, 0.25)
+    save_pack(tmp_path / "intruder.npy", intruders)
+    duels = np.zeros(1, dtype=duel_dtype(8))
+    duels[0] = ("musique", 150000, 420)
+    save_pack(tmp_path / "duel.npy", duels)
+
+    packs = load_packs(tmp_path)
+    assert isinstance(packs["intruder"].records, np.memmap)
+    model = FakeModel(["soleil", "lune", "ciel", "astre", "valise", "musique"])
+
+    intruder = IntruderEngine(model, pack=packs["intruder"])
+    for _ in range(10):
+        intruder.new_game()
+        assert intruder.theme_word == "soleil"
+        assert intruder.correct_word == "valise"
+        assert sorted(intruder.options) == ["astre", "ciel", "lune", "valise"]
+
+    duel = DuelEngine(model, pack=packs["duel"])
+    duel.new_game()
+    assert duel.get_public_state() == {"game_type": "duel", "theme": "musique"}
+    assert packs["duel"].record(0) == {"theme": "musique", "count": 150000, "density": 420}
+
+
+class CountedModel(FakeModel):
+    def get_vecattr(self, word, attr):
+        return 150000
+
+
+def test_duel_without_pack_draws_from_key_to_index():
+    # Modèle minimal des tests : key_to_index seulement, pas de index_to_key
+    duel = DuelEngine(CountedModel(["musique", "x1"]))
+    duel.new_game()
+    assert duel.theme_word == "musique"
+    assert duel.vocab_keys == ["musique", "x1"]
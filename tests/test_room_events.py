@@ -0,0 +1,120 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from core.rooms import RoomEventLog, RoomManager
+
+
+class FakeModel:
+    def __init__(self):
+        self.key_to_index = {"alpha": 0, "bravo": 1, "charlie": 2}
+
+    def get_vecattr(self, word, attr):
+        return 60000
+
+    def similarity(self, w1, w2):
+        return 1.0 if w1 == w2 else 0.25
+
+
+def test_event_log_replays_only_missed_events():
+    log = RoomEventLog(maxlen=3)
+    for i in range(5):
+        log.record({"type": "guess", "n": i})
+
+    assert log.seq == 5
+    assert [e["n"] for e in log.since(3)] == [3, 4]
+    assert log.since(5) == []
+    # Le tampon ne contient plus les événements 1 et 2 : synchro complète obligatoire
+    assert log.since(1) is None
+    # Numéro inconnu (room recréée) : synchro complète aussi
+    assert log.since(42) is None
+
+
+def test_reconnect_with_since_receives_only_missed_events():
+    # Carol n'est pas l'hôte : sa déconnexion ne détruit pas la room
+    app_module.room_manager = RoomManager(FakeModel())
+    room = app_module.room_manager.create_room("cemantix", "coop", "Alice")
+    client = TestClient(app_module.app)
+
+    with client.websocket_connect(f"/rooms/{room.room_id}/ws?player_name=Carol") as ws:
+        sync = ws.receive_json()
+        assert sync["type"] == "state_sync"
+        assert sync["history_complete"] is True
+        last_seq = ws.receive_json()["seq"]
+
+    word = next(w for w in ("alpha", "bravo") if w != room.engine.target_word)
+    client.post(f"/rooms/{room.room_id}/guess", json={"word": word, "player_name": "Bob"})
+
+    with client.websocket_connect(f"/rooms/{room.room_id}/ws?player_name=Carol&since={last_seq}") as ws:
+        resume = ws.receive_json()
+        assert resume["type"] == "state_resume"
+        assert resume["missed"] == 2
+        missed = [ws.receive_json() for _ in range(resume["missed"])]
+        assert [m["type"] for m in missed] == ["guess", "scoreboard_update"]
+        assert missed[0]["word"] == word
+        assert all(m["seq"] > last_seq for m in missed)
+
+
+def test_long_history_is_sent_in_chunks(monkeypatch):
+    monkeypatch.setattr(app_module, "HISTORY_CHUNK_SIZE", 2)
+    app_module.room_manager = RoomManager(FakeModel())
+    room = app_module.room_manager.create_room("cemantix", "coop", "Alice")
+    for word in ["bravo", "charlie", "bravo", "charlie", "bravo"]:
+        room.record_guess(word, "Alice", 0.25, 25.0)
+    client = TestClient(app_module.app)
+
+    with client.websocket_connect(f"/rooms/{room.room_id}/ws?player_name=Carol") as ws:
+        sync = ws.receive_json()
+        assert sync["history_complete"] is False
+        assert sync["history_total"] == 5
+        chunks = [ws.receive_json() for _ in range(3)]
+
+    assert [c["type"] for c in chunks] == ["history_chunk"] * 3
+    assert [c["last"] for c in chunks] == [False, False, True]
+    assert [e["word"] for c in chunks for e in c["entries"]] == ["bravo", "charlie", "bravo", "charlie", "bravo"]
+    # Les morceaux complets restent encodés en cache pour les prochains arrivants
+    assert set(room.encoded_history_chunks) == {(2, 0), (2, 1)}
+
+
+def test_guess_over_websocket_is_acked_and_broadcast():
+    app_module.room_manager = RoomManager(FakeModel())
+    room = app_module.room_manager.create_room("cemantix", "coop", "Alice")
+    word = next(w for w in ("alpha", "bravo") if w != room.engine.target_word)
+    client = TestClient(app_module.app)
+
+    with client.websocket_connect(f"/rooms/{room.room_id}/ws?player_name=Carol&batch=1") as ws:
+        ws.receive_json()  # state_sync
+        ws.receive_json()  # scoreboard_update de l'arrivée
+        ws.send_json({"type": "guess", "request_id": "r1", "word": f" {word.upper()} "})
+
+        frames = [ws.receive_json() for _ in range(2)]
+
+    ack = next(f for f in frames if f["type"] == "ack")
+    batch = next(f for f in frames if f["type"] == "batch")
+    assert ack["request_id"] == "r1"
+    assert ack["ok"] is True
+    assert ack["result"]["similarity"] == 0.25
+    assert [e["type"] for e in batch["events"]] == ["guess", "scoreboard_update"]
+    assert batch["events"][0]["player_name"] == "Carol"
+    assert batch["events"][0]["word"] == word
+
+
+def test_guess_after_deadline_ends_round_with_game_over():
+    # L'essai arrive avant le tic de la roue : il doit clore la manche lui-même
+    app_module.room_manager = RoomManager(FakeModel())
+    room = app_module.room_manager.create_room("cemantix", "blitz", "Alice")
+    room.end_time = time.time() + 60
+    client = TestClient(app_module.app)
+
+    with client.websocket_connect(f"/rooms/{room.room_id}/ws?player_name=Carol") as ws:
+        assert ws.receive_json()["type"] == "state_sync"
+        assert ws.receive_json()["type"] == "scoreboard_update"
+        room.end_time = time.time() - 1
+
+        response = client.post(f"/rooms/{room.room_id}/guess", json={"word": "alpha", "player_name": "Alice"})
+        assert response.json()["error"] == "time_up"
+        game_over = ws.receive_json()
+        assert game_over["type"] == "game_over"
+        assert game_over["end_time"] == room.end_time
+        assert room.locked is True
@@ -0,0 +1,59 @@
+import gzip
+
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from core.static_assets import FingerprintedStaticFiles, MemoryAsset
+
+
+def test_fingerprinted_static_files(tmp_path):
+    (tmp_path / "style.css").write_text("body { color: red; }\n" * 200)
+    (tmp_path / "style.css.gz").write_bytes(gzip.compress(b"precompressed"))
+    (tmp_path / "main.js").write_text("export const x = 1;")
+    static_files = FingerprintedStaticFiles(directory=str(tmp_path))
+    client = TestClient(Starlette(routes=[Mount("/static", static_files)]))
+
+    html = static_files.fingerprint_html('<link href="/static/style.css"><script src="/static/main.js"></script>')
+    assert 'href="/static/style.css?v=' in html
+    assert 'src="/static/main.js"' in html
+
+    versioned_url = html.split('href="')[1].split('"')[0]
+    response = client.get(versioned_url, headers={"Accept-Encoding": "gzip"})
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"precompressed"
+
+    plain = client.get("/static/style.css", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["cache-control"] == "no-cache"
+    assert "content-encoding" not in plain.headers
+    revalidated = client.get("/static/style.css", headers={"If-None-Match": plain.headers["etag"], "Accept-Encoding": "identity"})
+    assert revalidated.status_code == 304
+    # Chaque encodage a son propre ETag fort : pas de 304 croisé entre octets différents
+    assert response.headers["etag"] != plain.headers["etag"]
+    cross = client.get("/static/style.css", headers={"If-None-Match": plain.headers["etag"], "Accept-Encoding": "gzip"})
+    assert cross.status_code == 200 and cross.content == b"precompressed"
+
+
+def test_memory_asset_gzip_and_etag():
+    page = MemoryAsset(b"<html>" + b"a" * 4000 + b"</html>", "text/html")
+    response = page.response(Headers({"accept-encoding": "gzip, br"}))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] != page.etag
+    assert page.response(Headers({"if-none-match": page.etag})).status_code == 304
+    assert page.response(Headers({"if-none-match": page.etag, "accept-encoding": "gzip"})).status_code == 200
+
+
+def test_manifest_fingerprints_models_loaded_from_js(tmp_path):
+    (tmp_path / "models").mkdir()
+    (tmp_path / "models" / "bed.glb").write_bytes(b"glTF" * 100)
+    (tmp_path / "models" / "bed.glb.gz").write_bytes(gzip.compress(b"glTF" * 100))
+    static_files = FingerprintedStaticFiles(directory=str(tmp_path))
+    client = TestClient(Starlette(routes=[Mount("/static", static_files)]))
+
+    manifest = static_files.manifest("models")
+    assert list(manifest) == ["models/bed.glb"]
+    response = client.get(manifest["models/bed.glb"])
+    assert "immutable" in response.headers["cache-control"]
+    assert static_files.manifest("missing") == {}
@@ -0,0 +1,71 @@
+import asyncio
+
+from core.stats import StatsAggregator
+
+
+class FakeSession:
+    def __init__(self, calls, fail):
+        self.calls = calls
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, rows):
+        if self.fail:
+            raise ConnectionError("db down")
+        self.calls.append(rows)
+
+    async def commit(self):
+        pass
+
+
+def make_factory(calls, state):
+    return lambda: FakeSession(calls, state["fail"])
+
+
+def test_increments_are_flushed_in_one_bulk_update(tmp_path):
+    calls = []
+    aggregator = StatsAggregator(make_factory(calls, {"fail": False}), spill_path=tmp_path / "spill.json")
+
+    aggregator.increment("alice", games_played=1, cemantix_wins=1)
+    aggregator.increment("alice", games_played=1, cemantix_surrenders=1)
+    aggregator.increment("bob", games_played=1, hangman_wins=1)
+
+    assert asyncio.run(aggregator.flush()) == 2
+    assert len(calls) == 1
+    rows = {row["b_username"]: row for row in calls[0]}
+    assert rows["alice"]["b_games_played"] == 2
+    assert rows["alice"]["b_cemantix_surrenders"] == 1
+    assert rows["bob"]["b_hangman_wins"] == 1
+    assert rows["bob"]["b_cemantix_wins"] == 0
+    assert aggregator.pending == {}
+
+
+def test_failed_flush_spills_on_stop_and_reloads(tmp_path):
+    spill_path = tmp_path / "spill.json"
+    calls = []
+    state = {"fail": True}
+    aggregator = StatsAggregator(make_factory(calls, state), spill_path=spill_path)
+    aggregator.increment("alice", games_played=1, daily_challenges_validated=1)
+
+    asyncio.run(aggregator.stop())
+    assert spill_path.exists()
+
+    state["fail"] = False
+    restarted = StatsAggregator(make_factory(calls, state), flush_interval=60, spill_path=spill_path)
+
+    async def scenario():
+        restarted.start()
+        restarted.increment("alice", games_played=1)
+        await restarted.stop()
+
+    asyncio.run(scenario())
+    assert not spill_path.exists()
+    assert calls[0] == [{
+        "b_username": "alice", "b_games_played": 2, "b_cemantix_wins": 0, "b_cemantix_surrenders": 0,
+        "b_hangman_wins": 0, "b_daily_challenges_validated": 1,
+    }]
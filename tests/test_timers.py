@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from core.timers import TimerWheel
+
+
+def test_timer_wheel_fires_cancels_and_reschedules():
+    async def scenario():
+        wheel = TimerWheel(tick=1.0, slots=4)
+        fired = []
+
+        def record(name):
+            async def callback():
+                fired.append(name)
+            return callback
+
+        wheel.schedule("a", time.time() + 2, record("a"))
+        # La roue vide se cale sur l'heure du premier ajout
+        start = wheel.cursor_time
+        # Échéance au-delà d'un tour complet de la roue
+        wheel.schedule("b", start + 9, record("b"))
+        wheel.schedule("c", start + 3, record("c"))
+        wheel.cancel("c")
+        # Reprogrammer une clé remplace l'ancienne échéance
+        wheel.schedule("a", start + 3, record("a2"))
+        assert len(wheel) == 2
+
+        assert wheel.advance(start + 2) == 0
+        assert wheel.advance(start + 3) == 1
+        await asyncio.sleep(0)
+        assert fired == ["a2"]
+
+        # "b" partage la case de "a" mais attend deux tours de plus
+        assert wheel.advance(start + 8) == 0
+        assert wheel.advance(start + 9) == 1
+        await asyncio.sleep(0)
+        assert fired == ["a2", "b"]
+        assert len(wheel) == 0
+        await wheel.stop()
+
+    asyncio.run(scenario())
+
+
+def test_empty_timer_wheel_parks_until_scheduled():
+    async def scenario():
+        wheel = TimerWheel(tick=0.01, slots=8)
+        fired = []
+        advances = []
+        advance = wheel.advance
+        wheel.advance = lambda now: advances.append(now) or advance(now)
+
+        async def callback():
+            fired.append("a")
+
+        wheel.schedule("a", time.time(), callback)
+        await asyncio.sleep(0.05)
+        assert fired == ["a"]
+        # Roue vide : la tâche attend le prochain ajout au lieu de tourner à chaque tick
+        ticks = len(advances)
+        await asyncio.sleep(0.1)
+        assert len(advances) == ticks
+        assert not wheel.task.done()
+
+        wheel.schedule("b", time.time(), callback)
+        await asyncio.sleep(0.05)
+        assert fired == ["a", "a"]
+        await wheel.stop()
+
+    asyncio.run(scenario())
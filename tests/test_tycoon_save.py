@@ -0,0 +1,35 @@
+import pytest
+
+from core import tycoon_save
+
+
+def test_patch_and_compressed_envelope(monkeypatch):
+    document = {"money": 10, "rooms": [{"id": 1}], "flags": {"tuto": True}}
+    patched = tycoon_save.apply_patch(document, [
+        {"op": "replace", "path": "/money", "value": 25},
+        {"op": "add", "path": "/rooms/-", "value": {"id": 2}},
+        {"op": "remove", "path": "/flags/tuto"},
+        {"op": "test", "path": "/rooms/0/id", "value": 1},
+    ])
+    assert patched == {"money": 25, "rooms": [{"id": 1}, {"id": 2}], "flags": {}}
+    assert document["money"] == 10
+
+    with pytest.raises(tycoon_save.PatchError):
+        tycoon_save.apply_patch(document, [{"op": "remove", "path": "/missing"}])
+
+    monkeypatch.setattr(tycoon_save, "TYCOON_SAVE_COMPRESS_MIN", 0)
+    stored = tycoon_save.pack(3, patched)
+    assert "z" in stored
+    assert tycoon_save.unpack(stored) == (3, patched)
+    # Ancienne sauvegarde brute, sans version
+    assert tycoon_save.unpack({"money": 5}) == (0, {"money": 5})
+
+
+def test_raw_save_with_v_key_is_not_read_as_envelope():
+    # Ancienne sauvegarde brute dont les champs ressemblent à une enveloppe
+    legacy = {"v": 2, "data": {"level": 1}, "money": 40}
+    assert tycoon_save.unpack(legacy) == (0, legacy)
+    assert tycoon_save.unpack({"v": "beta", "data": {}}) == (0, {"v": "beta", "data": {}})
+    # Premières enveloppes "v" toujours lues
+    assert tycoon_save.unpack({"v": 4, "data": {"money": 1}}) == (4, {"money": 1})
+    assert "__tycoon_v" in tycoon_save.pack(1, {"money": 1})
@@ -0,0 +1,96 @@
+"""Calcule la difficulté de chaque mot cible possible (Cémantix, Pendu).
+
+Pour chaque candidat : rang de fréquence et densité du voisinage (nombre de mots du
+vocabulaire au-dessus de 0.5 et de 0.3 de similarité). Les candidats sont traités par
+blocs (un produit matriciel par bloc) dans un pool de processus qui projettent en
+mémoire les vecteurs normalisés. Les tables produites (difficulty/<jeu>.npy) sont
+triées par niveau, pour un tirage en O(1) (core/difficulty.py).
+
+    python tools/build_difficulty_tables.py --model model/frWac.bin [--workers 4] [--block-size 64]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.difficulty import DENSITY_THRESHOLDS, DIFFICULTY_DIR, DIFFICULTY_LEVELS, TABLE_FILES, build_table  # noqa: E402
+from core.embeddings import load_word2vec_binary  # noqa: E402
+from core.games import is_cemantix_target, is_hangman_target  # noqa: E402
+from core.puzzle_packs import save_pack  # noqa: E402
+
+TARGET_FILTERS = {"cemantix": is_cemantix_target, "hangman": is_hangman_target}
+
+# Vecteurs projetés en mémoire, propres à chaque processus du pool
+_vectors = None
+
+
+def _init_worker(vectors_path: str):
+    global _vectors
+    _vectors = np.load(vectors_path, mmap_mode="r")
+
+
+def _density_block(indexes):
+    """Densités d'un bloc de candidats : (nombre au-dessus de 0.5, nombre au-dessus de 0.3)."""
+    scores = _vectors[indexes] @ _vectors.T
+    high, low = DENSITY_THRESHOLDS
+    # Le mot lui-même (similarité 1) ne compte pas
+    return (np.count_nonzero(scores > high, axis=1) - 1, np.count_nonzero(scores > low, axis=1) - 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True, help="Fichier word2vec binaire")
+    parser.add_argument("--out", default=str(DIFFICULTY_DIR), help="Dossier des tables")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limit", type=int, default=None, help="Ne lire que les N premiers mots du modèle")
+    parser.add_argument("--block-size", type=int, default=64, help="Candidats par produit matriciel")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    model = load_word2vec_binary(args.model, limit=args.limit)
+    words = model.index_to_key
+    print(f"[DIFFICULTY] Modèle : {len(words)} mots, {model.vector_size} dimensions")
+
+    members = {game: [i for i, word in enumerate(words) if accept(model, word)] for game, accept in TARGET_FILTERS.items()}
+    # Un mot candidat pour plusieurs jeux n'est mesuré qu'une fois
+    candidates = sorted(set().union(*members.values()))
+    dense_05 = np.zeros(len(words), dtype=np.int32)
+    dense_03 = np.zeros(len(words), dtype=np.int32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vectors_path = os.path.join(tmp, "vectors.npy")
+        np.save(vectors_path, model.vectors)
+        del model.vectors
+        blocks = [candidates[start:start + args.block_size] for start in range(0, len(candidates), args.block_size)]
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(vectors_path,)) as pool:
+            for block, (high, low) in zip(blocks, pool.map(_density_block, blocks)):
+                dense_05[block] = high
+                dense_03[block] = low
+    print(f"[DIFFICULTY] {len(candidates)} candidats mesurés en {time.perf_counter() - started:.1f}s")
+
+    out = Path(args.out)
+    for game, indexes in members.items():
+        if not indexes:
+            print(f"[DIFFICULTY] {game} : aucun candidat")
+            continue
+        indexes = np.asarray(indexes)
+        # L'index dans le modèle est le rang de fréquence (mots fréquents en tête du fichier)
+        records = build_table([words[i] for i in indexes], indexes, dense_05[indexes], dense_03[indexes])
+        save_pack(out / TABLE_FILES[game], records)
+        sizes = ", ".join(f"{level} {int(np.count_nonzero(records['level'] == n))}" for n, level in enumerate(DIFFICULTY_LEVELS))
+        print(f"[DIFFICULTY] {game} : {len(records)} mots ({sizes})")
+
+    print(f"[DIFFICULTY] Terminé en {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
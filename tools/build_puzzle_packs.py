@@ -0,0 +1,182 @@
+"""Prégénère des packs de puzzles Intrus et Duel à partir du modèle word2vec.
+
+Les vecteurs normalisés sont écrits une fois dans un .npy temporaire que chaque
+processus du pool projette en mémoire : les pages sont partagées, pas copiées.
+Les packs produits (packs/intruder.npy, packs/duel.npy) sont lus par les moteurs
+sans chargement complet (core/puzzle_packs.py).
+
+    python tools/build_puzzle_packs.py --model model/frWac.bin [--intruder 20000] [--duel 5000] [--workers 4]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.embeddings import load_word2vec_binary  # noqa: E402
+from core.games import is_duel_theme, is_intruder_theme  # noqa: E402
+from core.puzzle_packs import (  # noqa: E402
+    INTRUDER_NEIGHBOURS, PACK_FILES, PUZZLE_PACK_DIR, duel_dtype, intruder_dtype, save_pack,
+)
+
+# Bornes de similarité de l'intrus avec le thème (même consigne que la génération à la volée)
+INTRUDER_MIN_SIMILARITY = 0.2
+INTRUDER_MAX_SIMILARITY = 0.4
+# Un voisin moins proche que ça rendrait l'intrus ambigu
+NEIGHBOUR_MIN_SIMILARITY = 0.45
+DUEL_DENSITY_THRESHOLD = 0.3
+# Un thème de duel avec trop peu de mots proches laisse peu de marge aux joueurs
+DUEL_MIN_DENSITY = 50
+
+# État propre à chaque processus du pool
+_vectors = None
+_words = None
+_playable = None
+
+
+def _init_worker(vectors_path: str, words, playable):
+    global _vectors, _words, _playable
+    _vectors = np.load(vectors_path, mmap_mode="r")
+    _words = words
+    _playable = playable
+
+
+def _same_family(word: str, other: str) -> bool:
+    """Singulier/pluriel, masculin/féminin : trop proche pour être un voisin intéressant."""
+    return word.rstrip("sxe") == other.rstrip("sxe")
+
+
+def _intruder_chunk(theme_indexes, seed: int):
+    rng = random.Random(seed)
+    puzzles = []
+    for theme_index in theme_indexes:
+        theme = _words[theme_index]
+        scores = _vectors @ _vectors[theme_index]
+        scores[theme_index] = -np.inf
+
+        top = min(20, len(scores) - 1)
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        neighbours, neighbour_indexes = [], []
+        for index in best:
+            word = _words[index]
+            if _playable[index] and not _same_family(theme, word) \
+                    and not any(_same_family(word, other) for other in neighbours):
+                neighbours.append(word)
+                neighbour_indexes.append(index)
+                if len(neighbours) == INTRUDER_NEIGHBOURS:
+                    break
+        if len(neighbours) < INTRUDER_NEIGHBOURS or scores[neighbour_indexes].min() < NEIGHBOUR_MIN_SIMILARITY:
+            continue
+
+        band = np.flatnonzero((scores >= INTRUDER_MIN_SIMILARITY) & (scores <= INTRUDER_MAX_SIMILARITY) & _playable)
+        if not len(band):
+            continue
+        # L'intrus ne doit pas non plus être trop proche d'un des voisins
+        for index in (band[rng.randrange(len(band))] for _ in range(20)):
+            if np.max(_vectors[neighbour_indexes] @ _vectors[index]) <= INTRUDER_MAX_SIMILARITY:
+                puzzles.append((theme, neighbours, _words[index],
+                                float(scores[neighbour_indexes].mean()), float(scores[index])))
+                break
+    return puzzles
+
+
+def _duel_chunk(theme_indexes, seed: int):
+    themes = []
+    for theme_index in theme_indexes:
+        density = int(np.count_nonzero(_vectors @ _vectors[theme_index] > DUEL_DENSITY_THRESHOLD)) - 1
+        if density >= DUEL_MIN_DENSITY:
+            themes.append((_words[theme_index], theme_index, density))
+    return themes
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _run(pool, function, candidates, wanted, chunk_size, rng):
+    """Soumet les candidats par lots jusqu'à obtenir `wanted` puzzles retenus."""
+    rng.shuffle(candidates)
+    results = []
+    futures = [pool.submit(function, chunk, rng.randrange(1 << 30)) for chunk in _chunks(candidates, chunk_size)]
+    for future in futures:
+        results.extend(future.result())
+        if len(results) >= wanted:
+            for pending in futures:
+                pending.cancel()
+            break
+    return results[:wanted]
+
+
+def _width(words) -> int:
+    return max((len(word.encode("utf-8")) for word in words), default=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True, help="Fichier word2vec binaire")
+    parser.add_argument("--out", default=str(PUZZLE_PACK_DIR), help="Dossier des packs")
+    parser.add_argument("--intruder", type=int, default=20000, help="Nombre de puzzles Intrus (0 : aucun)")
+    parser.add_argument("--duel", type=int, default=5000, help="Nombre de thèmes Duel (0 : aucun)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limit", type=int, default=None, help="Ne lire que les N premiers mots du modèle")
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    model = load_word2vec_binary(args.model, limit=args.limit)
+    words = model.index_to_key
+    print(f"[PACKS] Modèle : {len(words)} mots, {model.vector_size} dimensions")
+    playable = np.array([len(word) >= 4 and word.isalpha() for word in words], dtype=bool)
+    rng = random.Random(args.seed)
+    out = Path(args.out)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vectors_path = os.path.join(tmp, "vectors.npy")
+        np.save(vectors_path, model.vectors)
+        del model.vectors
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                 initargs=(vectors_path, words, playable)) as pool:
+            if args.intruder > 0:
+                candidates = [i for i, word in enumerate(words) if is_intruder_theme(model, word)]
+                puzzles = _run(pool, _intruder_chunk, candidates, args.intruder, args.chunk_size, rng)
+                width = _width(w for theme, neighbours, intruder, *_ in puzzles for w in (theme, intruder, *neighbours))
+                records = np.zeros(len(puzzles), dtype=intruder_dtype(width))
+                for row, (theme, neighbours, intruder, neighbour_sim, intruder_sim) in zip(records, puzzles):
+                    row["theme"] = theme.encode("utf-8")
+                    row["neighbours"] = [word.encode("utf-8") for word in neighbours]
+                    row["intruder"] = intruder.encode("utf-8")
+                    row["neighbour_similarity"] = neighbour_sim
+                    row["intruder_similarity"] = intruder_sim
+                if len(records):
+                    save_pack(out / PACK_FILES["intruder"], records)
+                print(f"[PACKS] Intrus : {len(records)} puzzles sur {len(candidates)} thèmes candidats")
+
+            if args.duel > 0:
+                candidates = [i for i, word in enumerate(words) if is_duel_theme(model, word)]
+                themes = _run(pool, _duel_chunk, candidates, args.duel, args.chunk_size, rng)
+                records = np.zeros(len(themes), dtype=duel_dtype(_width(theme for theme, *_ in themes)))
+                for row, (theme, theme_index, density) in zip(records, themes):
+                    row["theme"] = theme.encode("utf-8")
+                    row["count"] = model.get_vecattr(theme, "count")
+                    row["density"] = density
+                if len(records):
+                    save_pack(out / PACK_FILES["duel"], records)
+                print(f"[PACKS] Duel : {len(records)} thèmes sur {len(candidates)} candidats")
+
+    print(f"[PACKS] Terminé en {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Précompresse les fichiers statiques (gzip, et brotli si le module est installé).
+
+Les variantes .gz/.br sont écrites à côté des originaux et servies directement
+par FingerprintedStaticFiles quand le navigateur les accepte.
+
+    python tools/build_static.py [--min-size 1024]
+"""
+import argparse
+import gzip
+import os
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGETS = [ROOT / "static", ROOT / "favicon.ico"]
+# Formats déjà compressés : rien à gagner
+SKIPPED_SUFFIXES = {".gz", ".br", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".ogg", ".woff2", ".zip"}
+
+
+def iter_files(targets):
+    for target in targets:
+        if target.is_file():
+            yield target
+        elif target.is_dir():
+            yield from (path for path in sorted(target.rglob("*")) if path.is_file())
+
+
+def write_variant(path: Path, suffix: str, data: bytes, original_size: int) -> bool:
+    variant = path.with_name(path.name + suffix)
+    # Une variante qui ne fait pas gagner au moins 5 % ne vaut pas un fichier de plus
+    if len(data) > original_size * 0.95:
+        if variant.exists():
+            variant.unlink()
+        return False
+    variant.write_bytes(data)
+    return True
+
+
+def build(min_size: int) -> int:
+    total_before = total_after = 0
+    for path in iter_files(TARGETS):
+        if path.suffix.lower() in SKIPPED_SUFFIXES:
+            continue
+        raw = path.read_bytes()
+        if len(raw) < min_size:
+            continue
+
+        best = len(raw)
+        gz = gzip.compress(raw, 9, mtime=0)
+        if write_variant(path, ".gz", gz, len(raw)):
+            best = min(best, len(gz))
+        if brotli is not None:
+            br = brotli.compress(raw, quality=11)
+            if write_variant(path, ".br", br, len(raw)):
+                best = min(best, len(br))
+
+        total_before += len(raw)
+        total_after += best
+        print(f"{path.relative_to(ROOT)}: {len(raw)} -> {best} octets")
+
+    if brotli is None:
+        print("Module brotli absent : seules les variantes gzip ont été produites.")
+    print(f"Total : {total_before} -> {total_after} octets")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-size", type=int, default=1024, help="Taille minimale (octets) pour compresser un fichier")
+    args = parser.parse_args(argv)
+    return build(args.min_size)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""Test de charge : N rooms, M joueurs WebSocket par room, essais / chat / resets à débit fixé.
+
+Par défaut, un serveur est lancé dans un processus séparé avec un modèle synthétique
+en mémoire (vecteurs aléatoires, comme les FakeModel des tests) : aucun fichier de
+modèle ni base de données n'est nécessaire. Le rapport donne le débit, les latences
+p50/p99 entre l'envoi d'un essai et la réception de sa diffusion, et la mémoire
+consommée par room (RSS du serveur, Linux).
+
+    python tools/loadtest.py --rooms 50 --players 4 --duration 30 [--guess-rate 0.5] [--json]
+    python tools/loadtest.py --serve --port 8100          # serveur synthétique seul
+    python tools/loadtest.py --url http://127.0.0.1:8100  # vise un serveur déjà lancé avec --serve
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import string
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.embeddings import WordVectors  # noqa: E402
+
+LETTERS = string.ascii_lowercase
+
+
+def synthetic_words(vocab: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    words, seen = [], set()
+    while len(words) < vocab:
+        word = "".join(rng.choice(LETTERS) for _ in range(rng.randint(4, 8)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def synthetic_model(vocab: int, dim: int, seed: int) -> WordVectors:
+    vectors = np.random.default_rng(seed).standard_normal((vocab, dim)).astype(np.float32)
+    # Effectifs gonflés : tous les mots passent les seuils de fréquence des moteurs
+    return WordVectors(synthetic_words(vocab, seed), vectors, vocab_size=vocab + 1_000_000)
+
+
+def serve(args):
+    import uvicorn
+    import app as app_module
+    from core.rooms import RoomManager
+
+    model = synthetic_model(args.vocab, args.dim, args.seed)
+    app_module.model = model
+    app_module.room_manager = RoomManager(model)
+    print(f"[LOADTEST] Serveur synthétique : {args.vocab} mots, {args.dim} dimensions, port {args.port}", flush=True)
+    # Pas de lifespan : ni base de données ni tâches de fond liées au stockage
+    uvicorn.run(app_module.app, host="127.0.0.1", port=args.port, lifespan="off", log_level="warning")
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Stats:
+    def __init__(self):
+        self.guesses_sent = 0
+        self.chats_sent = 0
+        self.resets_sent = 0
+        self.events_received = 0
+        self.errors = 0
+        self.latencies: List[float] = []
+
+
+class Player:
+    """Un joueur WebSocket : envoie ses actions selon des arrivées de Poisson et mesure ses diffusions."""
+
+    def __init__(self, ws_url: str, room_id: str, name: str, words: List[str], args, stats: Stats, rng: random.Random):
+        self.url = f"{ws_url}/rooms/{room_id}/ws?player_name={name}"
+        self.name = name
+        self.words = words
+        self.args = args
+        self.stats = stats
+        self.rng = rng
+        self.sent: Dict[str, List[float]] = {}
+        self.ready = asyncio.Event()
+        self.websocket = None
+
+    async def connect(self):
+        self.websocket = await websockets.connect(self.url, max_size=None)
+
+    async def receive(self):
+        async for raw in self.websocket:
+            message = json.loads(raw)
+            events = message.get("events", []) if message.get("type") == "batch" else [message]
+            for event in events:
+                self.stats.events_received += 1
+                kind = event.get("type")
+                if kind in ("state_sync", "state_resume"):
+                    self.ready.set()
+                elif kind == "ping":
+                    await self.websocket.send('{"type":"pong"}')
+                elif kind == "guess" and event.get("player_name") == self.name:
+                    pending = self.sent.get(event.get("word"))
+                    if pending:
+                        self.stats.latencies.append(time.perf_counter() - pending.pop(0))
+                elif kind == "ack" and not event.get("ok"):
+                    self.stats.errors += 1
+
+    async def drive(self, stop_at: float):
+        actions = [(self.args.guess_rate, self.guess), (self.args.chat_rate, self.chat), (self.args.reset_rate, self.reset)]
+        await asyncio.gather(*(self._loop(rate, action, stop_at) for rate, action in actions if rate > 0))
+
+    async def _loop(self, rate: float, action, stop_at: float):
+        while True:
+            # Un intervalle tiré au-delà de la fin du test n'allonge pas la mesure
+            delay = self.rng.expovariate(rate)
+            remaining = stop_at - time.perf_counter()
+            if delay >= remaining:
+                await asyncio.sleep(max(remaining, 0))
+                return
+            await asyncio.sleep(delay)
+            await action()
+
+    async def guess(self):
+        word = self.rng.choice(self.words)
+        self.sent.setdefault(word, []).append(time.perf_counter())
+        self.stats.guesses_sent += 1
+        await self.websocket.send(json.dumps({"type": "guess", "word": word}))
+
+    async def chat(self):
+        self.stats.chats_sent += 1
+        await self.websocket.send(json.dumps({"type": "chat", "content": f"message {self.stats.chats_sent}"}))
+
+    async def reset(self):
+        self.stats.resets_sent += 1
+        await self.websocket.send(json.dumps({"type": "reset"}))
+
+
+async def wait_for_server(base_url: str, process: Optional[subprocess.Popen], timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError("Le serveur s'est arrêté au démarrage")
+            try:
+                if (await client.get(f"{base_url}/metrics")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Serveur injoignable : {base_url}")
+
+
+async def create_rooms(base_url: str, args) -> List[str]:
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def create(client, index):
+        async with semaphore:
+            response = await client.post(f"{base_url}/rooms", json={
+                "player_name": f"p{index}_0", "game_type": args.game_type, "mode": "coop",
+            })
+            response.raise_for_status()
+            return response.json()["room_id"]
+
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        return await asyncio.gather(*(create(client, index) for index in range(args.rooms)))
+
+
+async def run(args) -> Dict:
+    if websockets is None:
+        raise SystemExit("Le module websockets est requis (installé avec uvicorn[standard])")
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        command = [sys.executable, str(Path(__file__).resolve()), "--serve", "--port", str(port),
+                   "--vocab", str(args.vocab), "--dim", str(args.dim), "--seed", str(args.seed)]
+        output = None if args.verbose else subprocess.DEVNULL
+        process = subprocess.Popen(command, cwd=ROOT, stdout=output, stderr=output)
+        base_url = f"http://127.0.0.1:{port}"
+    server_pid = process.pid if process is not None else args.server_pid
+
+    try:
+        await wait_for_server(base_url, process)
+        words = synthetic_words(args.vocab, args.seed)
+        if args.game_type == "hangman":
+            words = list(LETTERS)
+        rss_start = rss_bytes(server_pid) if server_pid else None
+
+        started = time.perf_counter()
+        room_ids = await create_rooms(base_url, args)
+        create_seconds = time.perf_counter() - started
+
+        stats = Stats()
+        rng = random.Random(args.seed)
+        ws_url = base_url.replace("http", "ws", 1)
+        players = [
+            Player(ws_url, room_id, f"p{index}_{slot}", words, args, stats, random.Random(rng.random()))
+            for index, room_id in enumerate(room_ids) for slot in range(args.players)
+        ]
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def connect(player):
+            async with semaphore:
+                await player.connect()
+
+        await asyncio.gather(*(connect(player) for player in players))
+        receivers = [asyncio.ensure_future(player.receive()) for player in players]
+        await asyncio.wait_for(asyncio.gather(*(player.ready.wait() for player in players)), 60)
+        rss_loaded = rss_bytes(server_pid) if server_pid else None
+
+        traffic_started = time.perf_counter()
+        await asyncio.gather(*(player.drive(traffic_started + args.duration) for player in players))
+        # Débits calculés sur la seule fenêtre de trafic, sans l'attente des dernières diffusions
+        elapsed = time.perf_counter() - traffic_started
+        await asyncio.sleep(1.0)
+
+        for player in players:
+            await player.websocket.close()
+        for receiver in receivers:
+            receiver.cancel()
+        await asyncio.gather(*receivers, return_exceptions=True)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    per_room = None
+    if rss_start is not None and rss_loaded is not None:
+        per_room = (rss_loaded - rss_start) / max(len(room_ids), 1)
+    return {
+        "rooms": len(room_ids),
+        "players": len(players),
+        "room_creation_seconds": round(create_seconds, 3),
+        "duration_seconds": round(elapsed, 3),
+        "guesses_sent": stats.guesses_sent,
+        "guesses_per_second": round(stats.guesses_sent / elapsed, 1),
+        "chats_sent": stats.chats_sent,
+        "resets_sent": stats.resets_sent,
+        "events_received": stats.events_received,
+        "events_per_second": round(stats.events_received / elapsed, 1),
+        "errors": stats.errors,
+        "latency_samples": len(stats.latencies),
+        "latency_p50_ms": _ms(percentile(stats.latencies, 0.5)),
+        "latency_p99_ms": _ms(percentile(stats.latencies, 0.99)),
+        "server_rss_mb": round(rss_loaded / 1e6, 1) if rss_loaded else None,
+        "memory_per_room_kb": round(per_room / 1024, 1) if per_room is not None else None,
+    }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 2) if value is not None else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--players", type=int, default=4, help="Joueurs WebSocket par room")
+    parser.add_argument("--duration", type=float, default=20.0, help="Durée du trafic (secondes)")
+    parser.add_argument("--guess-rate", type=float, default=0.5, help="Essais par joueur et par seconde")
+    parser.add_argument("--chat-rate", type=float, default=0.1, help="Messages de chat par joueur et par seconde")
+    parser.add_argument("--reset-rate", type=float, default=0.01, help="Votes de reset par joueur et par seconde")
+    parser.add_argument("--game-type", choices=("cemantix", "hangman"), default="cemantix")
+    parser.add_argument("--concurrency", type=int, default=50, help="Créations de rooms / connexions simultanées")
+    parser.add_argument("--vocab", type=int, default=20000, help="Taille du vocabulaire synthétique")
+    parser.add_argument("--dim", type=int, default=100, help="Dimension des vecteurs synthétiques")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=None, help="Serveur déjà lancé (avec --serve et les mêmes --vocab/--seed)")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID du serveur visé par --url, pour la mémoire")
+    parser.add_argument("--serve", action="store_true", help="Lance seulement le serveur synthétique")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--json", action="store_true", help="Rapport en JSON")
+    parser.add_argument("--verbose", action="store_true", help="Affiche la sortie du serveur")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args)
+        return 0
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:>24} : {value if value is not None else 'n/a'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())